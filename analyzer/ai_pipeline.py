@@ -0,0 +1,189 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+# Respostas que valem uma nova tentativa: limite de taxa e falhas do servidor
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Caracteres por token na estimativa usada pelo limite de tokens por minuto
+CHARS_PER_TOKEN = 4
+
+
+class TokenBucket:
+    """
+    Balde de fichas para limites "por minuto" (requisições ou tokens).
+
+    Enche `per_minute / 60` fichas por segundo até `capacity` (por padrão, um
+    minuto inteiro, como os limites da API). reserve() retira as fichas na
+    hora, mesmo que o saldo fique negativo, e devolve quanto esperar até que
+    elas existam: quem pede primeiro sai primeiro, sem lock (as corrotinas do
+    asyncio não se interrompem no meio da chamada).
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self, amount: float = 1) -> float:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        # Um pedido maior que o balde passaria a esperar para sempre: vale o balde cheio
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self, amount: float = 1):
+        delay = self.reserve(amount)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+def estimate_tokens(data: Dict[str, Any]) -> int:
+    """Tokens que a requisição consome do limite: o prompt estimado mais o máximo da resposta."""
+    chars = sum(len(message["content"]) for message in data["messages"])
+    return chars // CHARS_PER_TOKEN + data.get("max_tokens", 0)
+
+
+def backoff_delay(attempt: int, base: float, maximum: float, retry_after: Optional[str] = None) -> float:
+    """
+    Espera antes da tentativa `attempt` + 1: exponencial com jitter completo
+    (sorteada entre 0 e base * 2^attempt), para que as requisições recusadas
+    juntas não voltem juntas; um Retry-After do servidor é respeitado.
+    """
+    delay = random.uniform(0, min(maximum, base * 2 ** attempt))
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+class AIRequestPipeline:
+    """
+    Analisa vários arquivos com o BugPredictorAI em paralelo, com asyncio.
+
+    - `concurrency` requisições, no máximo, em andamento ao mesmo tempo;
+    - baldes de fichas para `requests_per_minute` e `tokens_per_minute`
+      (0 desliga o limite), para não estourar a cota da conta;
+    - novas tentativas, com espera exponencial e jitter, em 429 e 5xx e em
+      falhas de conexão, até `max_retries`;
+    - os resultados saem de run() assim que cada arquivo termina.
+
+    O `requests` não tem API assíncrona: cada requisição roda em uma thread
+    de um pool do tamanho de `concurrency` (com uma sessão HTTP reaproveitada
+    por thread), e o asyncio coordena a fila, os limites e as esperas.
+    """
+
+    def __init__(self, predictor, concurrency: int = 4, requests_per_minute: float = 0,
+                 tokens_per_minute: float = 0, max_retries: int = 5, language: str = "python",
+                 use_cache: bool = True, backoff_base: float = 1.0, backoff_max: float = 60.0):
+        self.predictor = predictor
+        self.concurrency = max(1, concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self.language = language
+        self.use_cache = use_cache
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = {"files": 0, "cached": 0, "requests": 0, "retries": 0, "errors": 0}
+        self._local = threading.local()
+        self._executor = None
+        self._request_bucket = None
+        self._token_bucket = None
+
+    async def run(self, paths: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Produz um registro por arquivo ({"file", "attempts", "cached", análise ou "error"}), na ordem de conclusão."""
+        if self.requests_per_minute:
+            self._request_bucket = TokenBucket(self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._token_bucket = TokenBucket(self.tokens_per_minute)
+        pending = asyncio.Queue()
+        for path in paths:
+            pending.put_nowait(path)
+        finished = asyncio.Queue()
+
+        async def worker():
+            while not pending.empty():
+                path = pending.get_nowait()
+                try:
+                    record = await self.analyze_file(path)
+                except Exception as e:
+                    # Uma falha inesperada vira o registro do arquivo: run() espera um por caminho
+                    record = {"file": path, "attempts": 0, "cached": False, "error": f"Erro inesperado: {e}"}
+                await finished.put(record)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(self.concurrency, len(paths)))]
+        try:
+            for _ in range(len(paths)):
+                record = await finished.get()
+                self.stats["files"] += 1
+                if "error" in record:
+                    self.stats["errors"] += 1
+                yield record
+        finally:
+            for task in workers:
+                task.cancel()
+            self._executor.shutdown(wait=False)
+
+    async def analyze_file(self, path: str) -> Dict[str, Any]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                code = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            return {"file": path, "attempts": 0, "cached": False, "error": f"Erro ao ler arquivo: {e}"}
+
+        if self.use_cache:
+            cached = self.predictor._load_from_cache(self.predictor._get_cache_key(code, self.language))
+            if cached:
+                self.stats["cached"] += 1
+                return {"file": path, "attempts": 0, "cached": True, **cached}
+
+        headers, data = self.predictor._build_request(code, self.language)
+        tokens = estimate_tokens(data)
+        loop = asyncio.get_event_loop()
+        for attempt in range(self.max_retries + 1):
+            if self._request_bucket is not None:
+                await self._request_bucket.acquire()
+            if self._token_bucket is not None:
+                await self._token_bucket.acquire(tokens)
+            self.stats["requests"] += 1
+            retry_after = None
+            try:
+                status, retry_after, body = await loop.run_in_executor(self._executor, self._post, headers, data)
+                error = f"Erro na requisição: HTTP {status}"
+            except requests.exceptions.RequestException as e:
+                status, error = None, f"Erro na requisição: {e}"
+
+            record = {"file": path, "attempts": attempt + 1, "cached": False}
+            if status == 200:
+                try:
+                    return {**record, **self.predictor._parse_response(body, code, self.language, self.use_cache)}
+                except (KeyError, IndexError, TypeError) as e:
+                    return {**record, "error": f"Resposta inesperada da API: {e}"}
+            if (status is not None and status not in RETRYABLE_STATUS) or attempt == self.max_retries:
+                return {**record, "error": error}
+            self.stats["retries"] += 1
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max, retry_after))
+
+    def _post(self, headers: Dict[str, str], data: Dict[str, Any]) -> Tuple[int, Optional[str], Any]:
+        """Requisição bloqueante, na thread do pool: (status, Retry-After, corpo JSON se 200)."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        response = session.post(self.predictor.api_url, headers=headers, json=data, timeout=self.predictor.timeout)
+        if response.status_code != 200:
+            return response.status_code, response.headers.get("Retry-After"), None
+        try:
+            return 200, None, response.json()
+        except ValueError:
+            return 502, None, None
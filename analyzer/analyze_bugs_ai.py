@@ -27,6 +27,7 @@ class BugPredictorAI:
         """
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.api_url = api_url or "https://api.openai.com/v1/chat/completions"
+        self.timeout = 30  # segundos por requisição
         
         # Modelo configurável
         self.model = model or os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
@@ -165,51 +166,60 @@ Responda em formato JSON com a seguinte estrutura:
                 return cached_result
         
         try:
-            prompt = self._create_prompt(code, language)
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": "Você é um analisador de código especializado em identificar bugs e problemas de qualidade."},
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": self.model_configs[self.model]['temperature'],
-                "max_tokens": self.model_configs[self.model]['max_tokens']
-            }
+            headers, data = self._build_request(code, language)
             
             print("Fazendo requisição para a API da OpenAI...")
-            response = requests.post(self.api_url, headers=headers, json=data, timeout=30)
+            response = requests.post(self.api_url, headers=headers, json=data, timeout=self.timeout)
             response.raise_for_status()
             
             result = response.json()
-            content = result['choices'][0]['message']['content']
-            
-            # Tenta fazer parse do JSON
-            try:
-                analysis = json.loads(content)
-                # Salva no cache se bem-sucedido
-                if use_cache:
-                    cache_key = self._get_cache_key(code, language)
-                    self._save_to_cache(cache_key, analysis)
-                return analysis
-            except json.JSONDecodeError:
-                # Se não conseguir fazer parse, retorna o texto como está
-                return {
-                    "raw_analysis": content,
-                    "error": "Não foi possível processar a resposta como JSON"
-                }
+            return self._parse_response(result, code, language, use_cache)
                 
         except requests.exceptions.RequestException as e:
             return {"error": f"Erro na requisição: {str(e)}"}
         except Exception as e:
             return {"error": f"Erro inesperado: {str(e)}"}
 
-def analyze_bugs_ai(file: str, language: str = "python", api_key: str = None, no_cache: bool = False, model: str = None):
+    def _build_request(self, code: str, language: str = "python"):
+        """Cabeçalhos e corpo da requisição de chat completions para o código."""
+        prompt = self._create_prompt(code, language)
+        
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "Você é um analisador de código especializado em identificar bugs e problemas de qualidade."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": self.model_configs[self.model]['temperature'],
+            "max_tokens": self.model_configs[self.model]['max_tokens']
+        }
+        return headers, data
+
+    def _parse_response(self, result: Dict[str, Any], code: str, language: str, use_cache: bool) -> Dict[str, Any]:
+        """Extrai a análise da resposta da API, guardando-a no cache quando é um JSON válido."""
+        content = result['choices'][0]['message']['content']
+        
+        # Tenta fazer parse do JSON
+        try:
+            analysis = json.loads(content)
+            # Salva no cache se bem-sucedido
+            if use_cache:
+                cache_key = self._get_cache_key(code, language)
+                self._save_to_cache(cache_key, analysis)
+            return analysis
+        except json.JSONDecodeError:
+            # Se não conseguir fazer parse, retorna o texto como está
+            return {
+                "raw_analysis": content,
+                "error": "Não foi possível processar a resposta como JSON"
+            }
+
+def analyze_bugs_ai(file: str, language: str = "python", api_key: str = None, no_cache: bool = False, model: str = None, api_url: str = None):
     """
     Função CLI para análise de bugs usando IA.
     
@@ -219,6 +229,7 @@ def analyze_bugs_ai(file: str, language: str = "python", api_key: str = None, no
         api_key: Chave da API (opcional)
         no_cache: Se deve ignorar o cache (padrão: False)
         model: Modelo a ser usado (opcional)
+        api_url: URL de uma API compatível com a OpenAI (opcional)
     """
     try:
         with open(file, 'r', encoding='utf-8') as f:
@@ -234,7 +245,7 @@ def analyze_bugs_ai(file: str, language: str = "python", api_key: str = None, no
     print(f"Arquivo: {file}")
     print(f"Linguagem: {language}")
     
-    predictor = BugPredictorAI(api_key=api_key, model=model)
+    predictor = BugPredictorAI(api_key=api_key, api_url=api_url, model=model)
     print(f"Modelo: {predictor.model}")
     
     result = predictor.analyze_code(code, language, use_cache=not no_cache)
@@ -277,7 +288,7 @@ def analyze_bugs_ai(file: str, language: str = "python", api_key: str = None, no
         print("\nNenhum problema crítico identificado!")
         print("   O código parece estar bem estruturado.")
 
-def analyze_bugs_ai_simple(file: str, language: str = "python", api_key: str = None, no_cache: bool = False, model: str = None):
+def analyze_bugs_ai_simple(file: str, language: str = "python", api_key: str = None, no_cache: bool = False, model: str = None, api_url: str = None):
     """
     Versão simplificada da análise de bugs.
     """
@@ -293,7 +304,7 @@ def analyze_bugs_ai_simple(file: str, language: str = "python", api_key: str = N
     
     print(f"Analisando {file} com IA...")
     
-    predictor = BugPredictorAI(api_key=api_key, model=model)
+    predictor = BugPredictorAI(api_key=api_key, api_url=api_url, model=model)
     print(f"Modelo: {predictor.model}")
     
     result = predictor.analyze_code(code, language, use_cache=not no_cache)
@@ -316,6 +327,85 @@ def analyze_bugs_ai_simple(file: str, language: str = "python", api_key: str = N
     else:
         print("\nNenhum problema identificado!")
 
+def analyze_bugs_ai_dir(directory: str, language: str = "python", api_key: str = None, no_cache: bool = False,
+                        model: str = None, api_url: str = None, concurrency: int = 4, requests_per_minute: float = 0,
+                        tokens_per_minute: float = 0, max_retries: int = 5, include: List[str] = None,
+                        exclude: List[str] = None, format: str = "cli", output: str = None,
+                        backoff_base: float = 1.0) -> Optional[Dict[str, Any]]:
+    """
+    Análise de bugs com IA de todos os arquivos de um diretório, com várias
+    requisições em paralelo (ver ai_pipeline.AIRequestPipeline).
+
+    Cada arquivo é exibido (cli) ou gravado (ndjson) assim que termina; com
+    json, o relatório completo sai no final. Devolve o resumo da execução.
+    """
+    import asyncio
+
+    from analyzer.ai_pipeline import AIRequestPipeline
+    from analyzer.file_walker import iter_python_files
+    from analyzer.output_formatter import NDJSONWriter, format_output
+
+    if not os.path.isdir(directory):
+        print(f"❌ Diretório não encontrado: {directory}")
+        return None
+    predictor = BugPredictorAI(api_key=api_key, api_url=api_url, model=model)
+    if not predictor.api_key:
+        print("❌ Erro: API key não configurada. Configure OPENAI_API_KEY no arquivo .env, variável de ambiente ou passe via parâmetro.")
+        return None
+
+    paths = list(iter_python_files(directory, include, exclude))
+    pipeline = AIRequestPipeline(predictor, concurrency, requests_per_minute, tokens_per_minute, max_retries,
+                                 language, use_cache=not no_cache, backoff_base=backoff_base)
+    severities = {"critical": 0, "high": 0, "medium": 0, "low": 0}
+    files = {}
+    writer = NDJSONWriter(output) if format == "ndjson" else None
+    if format == "cli":
+        print(f"Analisando {len(paths)} arquivo(s) com IA ({predictor.model}, {pipeline.concurrency} em paralelo)...")
+
+    async def consume():
+        async for record in pipeline.run(paths):
+            record["file"] = os.path.relpath(record["file"], directory).replace(os.sep, "/")
+            problems = record.get("problems") or []
+            for problem in problems:
+                if problem.get("severity") in severities:
+                    severities[problem["severity"]] += 1
+            if writer is not None:
+                writer.write({"type": "file", **record})
+            elif format == "json":
+                files[record.pop("file")] = record
+            elif "error" in record:
+                print(f"❌ {record['file']}: {record['error']}")
+            else:
+                origin = " (cache)" if record["cached"] else ""
+                print(f"✅ {record['file']}: {len(problems)} problema(s){origin}")
+
+    started = time.perf_counter()
+    try:
+        asyncio.run(consume())
+    finally:
+        summary = {
+            "directory_analyzed": directory,
+            "model": predictor.model,
+            "severities": severities,
+            **pipeline.stats,
+            "elapsed_s": round(time.perf_counter() - started, 2),
+        }
+        if writer is not None:
+            writer.write({"type": "summary", **summary})
+            writer.close()
+
+    if format == "json":
+        print(format_output({"files": files, "summary": summary}, "json", output))
+    elif format == "cli":
+        print(f"\nRESUMO: {summary['files']} arquivo(s), {summary['errors']} erro(s), "
+              f"{summary['requests']} requisição(ões), {summary['retries']} nova(s) tentativa(s), "
+              f"{summary['cached']} do cache, em {summary['elapsed_s']} s")
+        print(f"   Críticos: {severities['critical']}  Altos: {severities['high']}  "
+              f"Médios: {severities['medium']}  Baixos: {severities['low']}")
+    elif output:
+        print(f"✅ Resultados salvos em: {output}")
+    return summary
+
 def clear_cache():
     """Limpa o cache de análises."""
     cache_dir = Path(".cache")
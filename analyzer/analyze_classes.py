@@ -1,14 +1,15 @@
 import typer
-import ast
+from typing import Optional
+from analyzer.metrics_engine import get_analysis
 
 def count_classes(code: str) -> int:
     """Conta o número de classes no código."""
-    tree = ast.parse(code)
-    return sum(1 for node in ast.walk(tree) if isinstance(node, ast.ClassDef))
+    return get_analysis(code).classes
 
-def analyze_classes(file: str):
-    """Comando CLI para contar classes."""
-    with open(file, "r", encoding="utf-8") as f:
-        code = f.read()
-    class_count = count_classes(code)
+def analyze_classes(file: str, class_count: Optional[int] = None):
+    """Comando CLI para contar classes (`class_count`: contagem já calculada, pelo daemon)."""
+    if class_count is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+        class_count = count_classes(code)
     typer.echo(f"Classes: {class_count}")
@@ -1,21 +1,15 @@
 import typer
-import re
+from typing import Optional
+from analyzer.metrics_engine import get_analysis
 
 def count_comments(code: str) -> int:
     """Conta o número de comentários no código."""
-    comment_lines = 0
-    for line in code.split("\n"):
-        stripped_line = line.strip()
-        if "#" in stripped_line:
-            comment_lines += 1
-            stripped_line = stripped_line.split("#")[0].strip()  # Remove o comentário
-            if not stripped_line:
-                continue  # Se só tinha um comentário, não conta como código
-    return comment_lines
+    return get_analysis(code).comments
 
-def analyze_comments(file: str):
-    """Comando CLI para contar comentários."""
-    with open(file, "r", encoding="utf-8") as f:
-        code = f.read()
-    comment_count = count_comments(code)
+def analyze_comments(file: str, comment_count: Optional[int] = None):
+    """Comando CLI para contar comentários (`comment_count`: contagem já calculada, pelo daemon)."""
+    if comment_count is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+        comment_count = count_comments(code)
     typer.echo(f"Comentários: {comment_count}")
\ No newline at end of file
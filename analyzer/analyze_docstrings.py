@@ -1,14 +1,15 @@
 import typer
-import ast
+from typing import Optional
+from analyzer.metrics_engine import get_analysis
 
 def count_docstrings(code: str) -> int:
     """Conta a quantidade de docstrings no código."""
-    tree = ast.parse(code)
-    return sum(1 for node in ast.walk(tree) if isinstance(node, ast.Expr) and isinstance(node.value, ast.Str))
+    return get_analysis(code).docstrings
 
-def analyze_docstrings(file: str):
-    """Comando CLI para contar docstrings."""
-    with open(file, "r", encoding="utf-8") as f:
-        code = f.read()
-    docstring_count = count_docstrings(code)
+def analyze_docstrings(file: str, docstring_count: Optional[int] = None):
+    """Comando CLI para contar docstrings (`docstring_count`: contagem já calculada, pelo daemon)."""
+    if docstring_count is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+        docstring_count = count_docstrings(code)
     typer.echo(f"Docstrings: {docstring_count}")
@@ -1,7 +1,13 @@
 import typer
 import hashlib
 from collections import defaultdict
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from analyzer import profiling
+
+# Parâmetros do hash polinomial usado nas janelas deslizantes
+_HASH_BASE = 1000003
+_HASH_MOD = (1 << 61) - 1
 
 def is_comment_or_blank(line: str) -> bool:
     """Verifica se uma linha é comentário ou em branco."""
@@ -43,17 +49,169 @@ def find_duplicate_blocks(code: str, block_size: int = 5) -> List[Tuple[int, int
                 duplicates.append((start, start+block_size-1, h))
     return duplicates
 
-def find_all_duplicates(code: str, min_size: int = 2, max_size: int = 10) -> dict:
+def normalize_lines(code: str) -> Tuple[List[int], List[int], List[str]]:
+    """
+    Normaliza o código uma única vez para a detecção de clones.
+
+    Linhas em branco e comentários são descartados e cada linha restante (sem
+    espaços à direita) é trocada por um identificador inteiro.
+    Retorna (identificadores, número_original_de_cada_linha, texto_de_cada_identificador).
+    """
+    ids = []
+    line_numbers = []
+    texts = []
+    table = {}
+    for number, line in enumerate(code.split('\n'), start=1):
+        if is_comment_or_blank(line):
+            continue
+        text = line.rstrip()
+        line_id = table.get(text)
+        if line_id is None:
+            line_id = table[text] = len(texts)
+            texts.append(text)
+        ids.append(line_id)
+        line_numbers.append(number)
+    return ids, line_numbers, texts
+
+def rolling_hashes(values: List[int], k: int) -> List[int]:
+    """Hash polinomial deslizante de cada janela de `k` valores consecutivos."""
+    power = pow(_HASH_BASE, k - 1, _HASH_MOD)
+    hashes = []
+    h = 0
+    for i, value in enumerate(values):
+        if i >= k:
+            h = (h - (values[i - k] + 1) * power) % _HASH_MOD
+        h = (h * _HASH_BASE + value + 1) % _HASH_MOD
+        if i >= k - 1:
+            hashes.append(h)
+    return hashes
+
+def _far_occurrence(i: int, links: List[Optional[int]], k: int) -> Optional[int]:
+    """Primeira ocorrência na cadeia `links` (próximas ou anteriores) que não se sobrepõe à janela `i`."""
+    j = links[i]
+    while j is not None and abs(j - i) < k:
+        j = links[j]
+    return j
+
+def find_maximal_clones(ids: List[int], min_size: int = 2) -> List[Tuple[int, int, int]]:
     """
-    Encontra duplicações em múltiplos tamanhos de bloco.
-    Retorna um dicionário com os resultados por tamanho.
+    Encontra pares de trechos repetidos máximos em uma sequência de linhas normalizadas.
+
+    Cada janela de `min_size` linhas recebe um hash deslizante e é ligada à
+    próxima ocorrência do mesmo hash que não se sobrepõe a ela (ocorrências
+    sobrepostas, como em linhas idênticas seguidas, são puladas na cadeia).
+    Percorrendo as posições em ordem, cada semente é estendida para a esquerda e
+    para a direita na sua diagonal (distância entre as ocorrências); o fim de
+    cada extensão é registrado, então nenhuma linha é comparada duas vezes na
+    mesma diagonal e o custo total é linear no tamanho da entrada mais o
+    tamanho dos clones, inclusive em entradas periódicas.
+
+    Por fim, cada janela repetida que ainda não está coberta por um clone
+    (ex.: a última cópia de uma cadeia, cuja ocorrência anterior se sobrepõe a
+    ela) é pareada com a ocorrência anterior mais próxima que não se sobrepõe.
+
+    Retorna tuplas (início_a, início_b, comprimento) em índices da sequência,
+    com início_a < início_b e trechos que não se sobrepõem; um trecho que se
+    sobrepõe à própria cópia vira uma sequência de cópias consecutivas.
     """
-    results = {}
-    for size in range(min_size, max_size + 1):
-        duplicates = find_duplicate_blocks(code, size)
-        if duplicates:
-            results[size] = duplicates
-    return results
+    n = len(ids)
+    k = min_size
+    if k < 1 or n < 2 * k:
+        return []
+
+    hashes = rolling_hashes(ids, k)
+
+    # Próxima e anterior ocorrência de cada janela
+    next_occurrence: List[Optional[int]] = [None] * len(hashes)
+    previous_occurrence: List[Optional[int]] = [None] * len(hashes)
+    last = {}
+    for i in range(len(hashes) - 1, -1, -1):
+        j = next_occurrence[i] = last.get(hashes[i])
+        if j is not None:
+            previous_occurrence[j] = i
+        last[hashes[i]] = i
+
+    clones = []
+    covered_end: Dict[int, int] = {}  # diagonal -> fim (exclusivo) do último clone
+    for i in range(len(hashes)):
+        j = _far_occurrence(i, next_occurrence, k)
+        if j is None:
+            continue
+        d = j - i
+        limit = covered_end.get(d, 0)
+        if limit > i or ids[i:i + k] != ids[j:j + k]:
+            continue
+
+        start = i
+        while start > limit and ids[start - 1] == ids[start - 1 + d]:
+            start -= 1
+        end = i + k
+        while end + d < n and ids[end] == ids[end + d]:
+            end += 1
+
+        covered_end[d] = end
+        if end - start <= d:
+            clones.append((start, start + d, end - start))
+            continue
+        # Trechos que se sobrepõem (código periódico, como linhas idênticas
+        # seguidas): o intervalo todo repete um período de d linhas (d >= k),
+        # então é dividido em cópias consecutivas de d linhas, sem sobreposição.
+        copies = (end + d - start) // d
+        for m in range(copies - 1):
+            clones.append((start + m * d, start + (m + 1) * d, d))
+
+    covered = bytearray(n)
+    for first, second, length in clones:
+        covered[first:first + length] = covered[second:second + length] = b"\x01" * length
+    for i in range(len(hashes)):
+        if all(covered[i:i + k]):
+            continue
+        j = _far_occurrence(i, previous_occurrence, k)
+        if j is None:
+            j = _far_occurrence(i, next_occurrence, k)
+        if j is None:
+            continue
+        first, second = min(i, j), max(i, j)
+        if ids[first:first + k] != ids[second:second + k]:
+            continue
+        d = second - first
+        start, end = first, first + k
+        while start > 0 and end - start < d and ids[start - 1] == ids[start - 1 + d]:
+            start -= 1
+        while end + d < n and end - start < d and ids[end] == ids[end + d]:
+            end += 1
+        clones.append((start, start + d, end - start))
+        covered[start:end] = covered[start + d:end + d] = b"\x01" * (end - start)
+    return clones
+
+def find_all_duplicates(code: str, min_size: int = 2, max_size: Optional[int] = None) -> Dict[int, List[Tuple[int, int, str]]]:
+    """
+    Encontra os clones máximos do código, sem limite de tamanho.
+
+    Um trecho duplicado de 10 linhas é reportado uma única vez, e não como
+    vários trechos menores contidos nele.
+    Retorna um dicionário {tamanho_em_linhas_de_código: [(linha_inicial, linha_final, hash)]},
+    com uma entrada por ocorrência de cada clone.
+    """
+    with profiling.stage("duplicates"):
+        return _find_all_duplicates(code, min_size, max_size)
+
+def _find_all_duplicates(code: str, min_size: int, max_size: Optional[int]) -> Dict[int, List[Tuple[int, int, str]]]:
+    ids, line_numbers, texts = normalize_lines(code)
+    groups = defaultdict(set)
+    for first, second, length in find_maximal_clones(ids, min_size):
+        if max_size is not None and length > max_size:
+            continue
+        block_str = '\n'.join(texts[i] for i in ids[first:first + length])
+        h = hashlib.sha1(block_str.encode('utf-8')).hexdigest()
+        for start in (first, second):
+            groups[(length, h)].add((line_numbers[start], line_numbers[start + length - 1]))
+
+    results = defaultdict(list)
+    for (length, h), occurrences in sorted(groups.items()):
+        for start, end in sorted(occurrences):
+            results[length].append((start, end, h))
+    return dict(results)
 
 def analyze_duplicate_code(file: str, block_size: int = None, auto: bool = False):
     """
@@ -63,18 +221,18 @@ def analyze_duplicate_code(file: str, block_size: int = None, auto: bool = False
         code = f.read()
     
     if auto or block_size is None:
-        # Modo automático: testa múltiplos tamanhos
-        print("Analisando duplicações em múltiplos tamanhos de bloco...")
+        # Modo automático: clones máximos de qualquer tamanho
+        print("Analisando duplicações (clones máximos, mínimo de 2 linhas)...")
         print("Ignorando comentários e linhas em branco")
-        all_duplicates = find_all_duplicates(code, min_size=2, max_size=10)
+        all_duplicates = find_all_duplicates(code, min_size=2)
         
         if not all_duplicates:
-            print("Nenhum bloco duplicado encontrado em nenhum tamanho (2-10 linhas).")
+            print("Nenhum bloco duplicado encontrado (mínimo de 2 linhas).")
             return
         
         print(f"\nResultados encontrados:")
         for size, duplicates in all_duplicates.items():
-            print(f"\nBlocos de {size} linhas ({len(duplicates)} duplicações):")
+            print(f"\nBlocos de {size} linhas de código ({len(duplicates)} duplicações):")
             for start, end, h in duplicates:
                 print(f"   Linhas {start}-{end} (hash: {h[:8]}...)")
     else:
@@ -1,6 +1,7 @@
 import typer
 import ast
 from typing import Tuple
+from analyzer.metrics_engine import get_analysis
 
 def calculate_function_sizes(code: str, debug: bool = False) -> Tuple[int, float]:
     """
@@ -8,27 +9,28 @@ def calculate_function_sizes(code: str, debug: bool = False) -> Tuple[int, float
     Retorna uma tupla (número_de_funções, tamanho_médio).
     Linhas em branco NÃO são contadas.
     """
-    tree = ast.parse(code)
+    analysis = get_analysis(code)
+    # Linhas não vazias acumuladas: o tamanho de cada função sai em O(1)
+    nonblank = analysis.lexical.nonblank_prefix()
+    last_code_line = len(nonblank) - 1
     function_count = 0
     total_lines = 0
-    code_lines = code.split('\n')
-    
-    for node in ast.walk(tree):
+    code_lines = code.split('\n') if debug else None
+
+    for node in ast.walk(analysis.tree):
         if isinstance(node, ast.FunctionDef):
             function_count += 1
             first_line = node.lineno
             last_line = node.end_lineno if hasattr(node, 'end_lineno') else first_line
             first_line = max(1, first_line)
-            last_line = min(len(code_lines), last_line)
-            # Pega o intervalo correto
-            lines_in_func = code_lines[first_line-1:last_line]
-            non_blank = [line for line in lines_in_func if line.strip()]
+            last_line = min(last_code_line, last_line)
+            size = nonblank[last_line] - nonblank[first_line - 1]
             if debug:
                 print(f'Função {node.name}:')
-                for idx, line in enumerate(lines_in_func, start=first_line):
+                for idx, line in enumerate(code_lines[first_line-1:last_line], start=first_line):
                     print(f'{idx:3}: {repr(line)}')
-                print(f'Linhas não em branco: {len(non_blank)}\n')
-            total_lines += len(non_blank)
+                print(f'Linhas não em branco: {size}\n')
+            total_lines += size
     if function_count == 0:
         return 0, 0.0
     return function_count, total_lines / function_count
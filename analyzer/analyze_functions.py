@@ -1,14 +1,15 @@
 import typer
-import ast
+from typing import Optional
+from analyzer.metrics_engine import get_analysis
 
 def count_functions(code: str) -> int:
     """Conta o número de funções no código."""
-    tree = ast.parse(code)
-    return sum(1 for node in ast.walk(tree) if isinstance(node, ast.FunctionDef))
+    return get_analysis(code).functions
 
-def analyze_functions(file: str):
-    """Comando CLI para contar funções."""
-    with open(file, "r", encoding="utf-8") as f:
-        code = f.read()
-    function_count = count_functions(code)
+def analyze_functions(file: str, function_count: Optional[int] = None):
+    """Comando CLI para contar funções (`function_count`: contagem já calculada, pelo daemon)."""
+    if function_count is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+        function_count = count_functions(code)
     typer.echo(f"Funções: {function_count}")
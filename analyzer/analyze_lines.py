@@ -1,12 +1,15 @@
 import typer
+from typing import Optional
+from analyzer.metrics_engine import get_analysis
 
 def count_lines(code: str) -> int:
     """Conta o número total de linhas no código."""
-    return len(code.splitlines())
+    return get_analysis(code).lines
 
-def analyze_lines(file: str):
-    """Comando CLI para contar linhas de código."""
-    with open(file, "r", encoding="utf-8") as f:
-        code = f.read()
-    line_count = count_lines(code)
+def analyze_lines(file: str, line_count: Optional[int] = None):
+    """Comando CLI para contar linhas de código (`line_count`: contagem já calculada, pelo daemon)."""
+    if line_count is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+        line_count = count_lines(code)
     typer.echo(f"Total de linhas: {line_count}")
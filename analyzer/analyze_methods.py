@@ -1,37 +1,22 @@
 import typer
-import ast
-from typing import Tuple
+from analyzer.metrics_engine import get_analysis
+from typing import Optional, Tuple
 
 def count_methods(code: str) -> Tuple[int, int]:
     """
     Conta o número de métodos públicos e privados nas classes do código.
     Retorna uma tupla (métodos_públicos, métodos_privados).
     """
-    tree = ast.parse(code)
-    public_methods = 0
-    private_methods = 0
-    
-    for node in ast.walk(tree):
-        if isinstance(node, ast.ClassDef):
-            for item in node.body:
-                if isinstance(item, ast.FunctionDef):
-                    # Métodos que começam com __ são considerados privados
-                    if item.name.startswith('__') and item.name.endswith('__'):
-                        # Ignora métodos especiais como __init__, __str__, etc
-                        continue
-                    elif item.name.startswith('_'):
-                        private_methods += 1
-                    else:
-                        public_methods += 1
-    
-    return public_methods, private_methods
+    return get_analysis(code).methods
 
-def analyze_methods(file: str):
-    """Comando CLI para analisar métodos públicos e privados."""
-    with open(file, "r", encoding="utf-8") as f:
-        code = f.read()
-    
-    public_count, private_count = count_methods(code)
+def analyze_methods(file: str, counts: Optional[Tuple[int, int]] = None):
+    """Comando CLI para analisar métodos públicos e privados (`counts`: contagens já calculadas, pelo daemon)."""
+    if counts is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+        counts = count_methods(code)
+
+    public_count, private_count = counts
     total_methods = public_count + private_count
     
     typer.echo(f"Análise de Métodos:")
@@ -0,0 +1,170 @@
+import ast
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from analyzer.defaults import DEFAULT_MIN_NODES
+from analyzer.metrics_engine import CONSTANT_NODES, end_line
+
+# Valor que substitui identificadores e constantes na normalização
+_PLACEHOLDER = "_"
+
+
+class SubtreeHasher:
+    """
+    Atribui a cada subárvore normalizada um identificador estrutural.
+
+    Identificadores e constantes são abstraídos: `total = a + 1` e
+    `soma = b + 2` recebem o mesmo identificador. Cada nó é visitado uma única
+    vez, em pós-ordem, e sua assinatura (tipo, campos primitivos normalizados e
+    identificadores dos filhos) é internada em um dicionário, então subárvores
+    iguais recebem o mesmo número sem nenhuma comparação entre árvores.
+    A tabela é compartilhada entre arquivos, permitindo encontrar clones entre eles.
+    """
+
+    def __init__(self):
+        self._table: Dict[tuple, int] = {}
+
+    def _normalize(self, node: ast.AST, value):
+        if isinstance(value, str) or isinstance(node, CONSTANT_NODES):
+            return _PLACEHOLDER
+        return value
+
+    def hash_tree(self, tree: ast.AST):
+        """
+        Percorre a árvore em pós-ordem (sem recursão) e produz, para cada nó,
+        (nó, pai, identificador_estrutural, número_de_nós).
+        """
+        ids: Dict[ast.AST, int] = {}
+        sizes: Dict[ast.AST, int] = {}
+        stack = [(tree, None, False)]
+        while stack:
+            node, parent, ready = stack.pop()
+            if not ready:
+                stack.append((node, parent, True))
+                for child in ast.iter_child_nodes(node):
+                    stack.append((child, node, False))
+                continue
+
+            signature = [type(node).__name__]
+            size = 1
+            for _, value in ast.iter_fields(node):
+                if isinstance(value, ast.AST):
+                    signature.append(ids[value])
+                    size += sizes[value]
+                elif isinstance(value, list):
+                    items = []
+                    for item in value:
+                        if isinstance(item, ast.AST):
+                            items.append(ids[item])
+                            size += sizes[item]
+                        else:
+                            items.append(self._normalize(node, item))
+                    signature.append(tuple(items))
+                else:
+                    signature.append(self._normalize(node, value))
+
+            signature = tuple(signature)
+            structural_id = self._table.get(signature)
+            if structural_id is None:
+                structural_id = self._table[signature] = len(self._table)
+            ids[node] = structural_id
+            sizes[node] = size
+            yield node, parent, structural_id, size
+
+
+def _line_range(node: ast.AST) -> Tuple[int, int]:
+    # Módulos não têm posição: usam a primeira e a última instrução
+    if isinstance(node, ast.Module):
+        if not node.body:
+            return 1, 1
+        return node.body[0].lineno, end_line(node.body[-1])
+    return node.lineno, end_line(node)
+
+
+def find_ast_clones(sources: Iterable[Tuple[str, str]], min_nodes: int = DEFAULT_MIN_NODES):
+    """
+    Encontra grupos de instruções (funções, classes, laços...) ou arquivos
+    inteiros com a mesma estrutura, ignorando nomes e valores de constantes.
+
+    As subárvores são agrupadas pelo identificador estrutural (e, portanto,
+    pelo tamanho); um grupo cujos membros estão todos dentro de pais que também
+    se repetem é omitido, pois já está contido em um grupo maior.
+
+    Args:
+        sources: Pares (caminho, código)
+        min_nodes: Tamanho mínimo da subárvore, em nós da AST
+
+    Returns:
+        (grupos, erros). Cada grupo é {"kind", "nodes", "occurrences"}, com
+        ocorrências (caminho, linha_inicial, linha_final, nome_ou_None).
+    """
+    hasher = SubtreeHasher()
+    buckets: Dict[int, List[tuple]] = defaultdict(list)
+    counts: Dict[int, int] = defaultdict(int)
+    errors = []
+    for path, code in sources:
+        try:
+            tree = ast.parse(code, filename=path)
+        except (SyntaxError, ValueError) as e:
+            errors.append((path, str(e)))
+            continue
+        node_ids: Dict[ast.AST, int] = {}
+        candidates = []
+        for node, parent, structural_id, size in hasher.hash_tree(tree):
+            node_ids[node] = structural_id
+            if size >= min_nodes:
+                counts[structural_id] += 1
+                if isinstance(node, (ast.stmt, ast.Module)):
+                    candidates.append((node, parent, structural_id, size))
+        # Filhos são produzidos antes dos pais: os pais são resolvidos ao final do arquivo
+        for node, parent, structural_id, size in candidates:
+            buckets[structural_id].append((path, node, node_ids.get(parent), size))
+
+    groups = []
+    for structural_id, entries in buckets.items():
+        if len(entries) < 2 or all(counts.get(parent_id, 0) > 1 for _, _, parent_id, _ in entries):
+            continue
+        first = entries[0][1]
+        groups.append({
+            "kind": type(first).__name__,
+            "nodes": entries[0][3],
+            "occurrences": sorted(
+                (path, *_line_range(node), getattr(node, "name", None))
+                for path, node, _, _ in entries
+            ),
+        })
+    groups.sort(key=lambda g: (-g["nodes"], g["occurrences"]))
+    return groups, errors
+
+
+def analyze_ast_duplicates(path: str, is_dir: bool = False, exclude=None, min_nodes: int = DEFAULT_MIN_NODES):
+    """
+    Função CLI para identificar clones estruturais (AST) em um arquivo ou diretório.
+    """
+    from analyzer.file_walker import iter_python_files
+
+    paths = list(iter_python_files(path, exclude=exclude)) if is_dir else [path]
+    prefix = os.path.join(path, "") if is_dir else ""
+
+    def sources():
+        for file_path in paths:
+            with open(file_path, "r", encoding="utf-8") as f:
+                yield file_path[len(prefix):].replace(os.sep, "/"), f.read()
+
+    groups, errors = find_ast_clones(sources(), min_nodes)
+    print(f"Analisando clones estruturais (AST, mínimo de {min_nodes} nós)...")
+    print("Ignorando nomes de variáveis, funções e valores de constantes")
+    for file_path, error in errors:
+        print(f"Erro em {file_path}: {error}")
+    if not groups:
+        print("Nenhum clone estrutural encontrado.")
+        return
+
+    print(f"\n{len(groups)} grupos de clones encontrados:")
+    for number, group in enumerate(groups, start=1):
+        print(f"\nGrupo {number}: {group['kind']} ({group['nodes']} nós, {len(group['occurrences'])} ocorrências):")
+        for file_path, start, end, name in group["occurrences"]:
+            label = f" ({name})" if name else ""
+            where = f"{file_path}: linhas" if is_dir else "Linhas"
+            print(f"   {where} {start}-{end}{label}")
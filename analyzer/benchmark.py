@@ -0,0 +1,198 @@
+import os
+import platform
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from analyzer import __version__
+from analyzer.analyze_classes import count_classes
+from analyzer.analyze_comment_ratio import ProporcaoComentarioCodigo
+from analyzer.analyze_comments import count_comments
+from analyzer.analyze_complexity import analyze_complexity_code
+from analyzer.analyze_dead_code import analyze_dead_code
+from analyzer.analyze_docstrings import count_docstrings
+from analyzer.analyze_duplicate_code import find_all_duplicates
+from analyzer.analyze_functions import count_functions
+from analyzer.analyze_lines import count_lines
+from analyzer.analyze_methods import count_methods
+from analyzer.defaults import BENCHMARKS, DEFAULT_REPEAT, DEFAULT_THRESHOLD
+from analyzer.dependency_analyzer import analyze_repository
+from analyzer.file_walker import iter_python_files
+from analyzer.large_files import MB, large_file_threshold
+from analyzer.metrics_engine import get_analysis
+
+# Versão do formato do relatório JSON
+BENCH_FORMAT = 1
+
+# Quantos arquivos (os maiores) o comando `all` analisa em cada repetição
+ALL_SAMPLE = 20
+
+# Analisadores públicos aplicados a cada arquivo: nome -> função(código, caminho).
+# Os nomes, na mesma ordem, estão em defaults.FILE_BENCHMARKS (usado pela CLI)
+FILE_ANALYZERS: Dict[str, Callable[[str, str], Any]] = {
+    "count_lines": lambda code, path: count_lines(code),
+    "count_comments": lambda code, path: count_comments(code),
+    "count_docstrings": lambda code, path: count_docstrings(code),
+    "count_classes": lambda code, path: count_classes(code),
+    "count_functions": lambda code, path: count_functions(code),
+    "count_methods": lambda code, path: count_methods(code),
+    "find_all_duplicates": lambda code, path: find_all_duplicates(code),
+    "analyze_complexity_code": lambda code, path: analyze_complexity_code(code),
+    "analyze_dead_code": lambda code, path: analyze_dead_code(code),
+    "comment_ratio": lambda code, path: ProporcaoComentarioCodigo(path, source=code).analisar(),
+}
+
+
+def load_sources(root: str, exclude: Optional[Sequence[str]] = None) -> Tuple[List[Tuple[str, str]], List[str]]:
+    """
+    Lê os arquivos Python do repositório uma única vez, antes das medições.
+
+    Arquivos grandes (que o analyzer trataria em streaming) e ilegíveis ficam
+    de fora dos analisadores por arquivo. Retorna ([(caminho, código)], ignorados).
+    """
+    threshold = large_file_threshold()
+    sources, skipped = [], []
+    for path in iter_python_files(root, exclude=exclude):
+        try:
+            if os.path.getsize(path) >= threshold:
+                skipped.append(path)
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                sources.append((path, f.read()))
+        except (OSError, UnicodeDecodeError):
+            skipped.append(path)
+    return sources, skipped
+
+
+def _throughput(seconds: float, files: int, size: int) -> Dict[str, Any]:
+    return {
+        "seconds": round(seconds, 4),
+        "files": files,
+        "bytes": size,
+        "files_per_s": round(files / seconds, 1) if seconds else None,
+        "mb_per_s": round(size / MB / seconds, 3) if seconds else None,
+    }
+
+
+def best_time(function: Callable[[], int], repeat: int) -> Tuple[float, int]:
+    """Menor tempo entre `repeat` execuções e o número de erros da última."""
+    best, errors = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        errors = function()
+        best = min(best, time.perf_counter() - start)
+    return best, errors
+
+
+def time_file_analyzer(analyzer: Callable[[str, str], Any], sources: List[Tuple[str, str]]) -> int:
+    """Aplica o analisador a cada arquivo, sem reaproveitar análises anteriores; retorna os erros."""
+    errors = 0
+    for path, code in sources:
+        get_analysis.cache_clear()
+        try:
+            analyzer(code, path)
+        except Exception:
+            errors += 1
+    return errors
+
+
+def _run_cli(args: List[str]) -> int:
+    # Importado aqui: o main importa este módulo para o comando bench
+    from typer.testing import CliRunner
+    from analyzer.main import app
+    return 0 if CliRunner().invoke(app, args).exit_code == 0 else 1
+
+
+def run_benchmarks(
+    root: str,
+    repeat: int = DEFAULT_REPEAT,
+    jobs: int = 1,
+    only: Optional[Iterable[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Mede o tempo de cada analisador público sobre os arquivos de `root`.
+
+    Cada medição é o melhor tempo de `repeat` execuções; o throughput é dado
+    em arquivos e em MB por segundo. `only` restringe as medições pelo nome
+    (ver BENCHMARKS). Os comandos `all` e `all-dir` são executados pela CLI,
+    sem cache; `all-dir` e `analyze_repository` usam `jobs` processos.
+    """
+    names = [name for name in BENCHMARKS if only is None or name in set(only)]
+    sources, skipped = load_sources(root, exclude)
+    total_bytes = sum(len(code.encode("utf-8")) for _, code in sources)
+    sample = sorted(sources, key=lambda item: (-len(item[1]), item[0]))[:ALL_SAMPLE]
+    sample_bytes = sum(len(code.encode("utf-8")) for _, code in sample)
+
+    results = {}
+    for name in names:
+        if progress is not None:
+            progress(name)
+        if name in FILE_ANALYZERS:
+            seconds, errors = best_time(lambda: time_file_analyzer(FILE_ANALYZERS[name], sources), repeat)
+            result = _throughput(seconds, len(sources), total_bytes)
+        elif name == "analyze_repository":
+            def repository():
+                analyze_repository(root, jobs=jobs, exclude=exclude)
+                return 0
+            seconds, errors = best_time(repository, repeat)
+            result = _throughput(seconds, len(sources), total_bytes)
+        elif name == "all":
+            seconds, errors = best_time(
+                lambda: sum(_run_cli(["all", path, "--format", "json"]) for path, _ in sample), repeat)
+            result = _throughput(seconds, len(sample), sample_bytes)
+        else:
+            args = ["all-dir", root, "--format", "json", "--no-cache", "--jobs", str(jobs)]
+            for pattern in exclude or []:
+                args += ["--exclude", pattern]
+            seconds, errors = best_time(lambda: _run_cli(args), repeat)
+            result = _throughput(seconds, len(sources), total_bytes)
+        result["errors"] = errors
+        results[name] = result
+
+    return {
+        "format": BENCH_FORMAT,
+        "analyzer_version": __version__,
+        "python": platform.python_version(),
+        "path": root,
+        "files": len(sources),
+        "bytes": total_bytes,
+        "skipped_files": len(skipped),
+        "repeat": repeat,
+        "jobs": jobs,
+        "results": results,
+    }
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Lê um relatório salvo (diretamente ou dentro da saída da CLI, em qualquer formato)."""
+    from analyzer.output_formatter import load_output
+
+    data = load_output(path)
+    if "results" not in data and isinstance(data.get("metrics"), dict):
+        data = data["metrics"]
+    return data
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compara o throughput (MB/s) de cada medição com a linha de base.
+
+    Retorna uma entrada por medição presente nos dois relatórios, com a
+    variação relativa e `regression=True` quando a queda passa de `threshold`.
+    """
+    comparison = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("mb_per_s") or not result.get("mb_per_s"):
+            continue
+        change = result["mb_per_s"] / base["mb_per_s"] - 1
+        comparison.append({
+            "benchmark": name,
+            "baseline_mb_per_s": base["mb_per_s"],
+            "mb_per_s": result["mb_per_s"],
+            "change": round(change, 3),
+            "regression": change < -threshold,
+        })
+    return comparison
@@ -0,0 +1,391 @@
+import hashlib
+import io
+import os
+import sqlite3
+import tokenize
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from analyzer.analyze_duplicate_code import rolling_hashes
+from analyzer.result_cache import DEFAULT_CACHE_DIR
+
+INDEX_FILE = "clone_index.sqlite3"
+DEFAULT_KGRAM = 30
+DEFAULT_WINDOW = 10
+
+# Tokens que não fazem parte do conteúdo normalizado
+_SKIPPED_TOKENS = frozenset({
+    tokenize.ENCODING, tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE,
+    tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER,
+})
+
+# (hash, posição_do_token, linha_inicial, linha_final)
+Fingerprint = Tuple[int, int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    file_id INTEGER NOT NULL,
+    hash INTEGER NOT NULL,
+    pos INTEGER NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_hash ON fingerprints (hash);
+CREATE INDEX IF NOT EXISTS fingerprints_file ON fingerprints (file_id);
+"""
+
+
+def normalized_tokens(code: str) -> List[Tuple[str, int, int]]:
+    """
+    Tokeniza o código e descarta comentários, quebras de linha e indentação.
+    Retorna (texto, linha_inicial, linha_final) de cada token restante.
+    """
+    tokens = []
+    for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+        if tok.type in _SKIPPED_TOKENS:
+            continue
+        tokens.append((tok.string, tok.start[0], tok.end[0]))
+    return tokens
+
+
+def _token_value(text: str, table: Dict[str, int]) -> int:
+    # Valor estável entre execuções (hash() do Python é aleatorizado por processo)
+    value = table.get(text)
+    if value is None:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=7).digest()
+        value = table[text] = int.from_bytes(digest, "big")
+    return value
+
+
+def winnow(hashes: List[int], window: int) -> List[Tuple[int, int]]:
+    """
+    Seleciona as impressões digitais pelo algoritmo de winnowing.
+
+    Em cada janela de `window` hashes consecutivos é escolhido o menor (o mais à
+    direita em caso de empate); posições repetidas entre janelas vizinhas são
+    registradas uma única vez. Usa uma fila monotônica, em tempo linear.
+    Retorna (posição, hash) das impressões selecionadas.
+    """
+    if not hashes:
+        return []
+    window = max(1, min(window, len(hashes)))
+    selected = []
+    candidates = deque()  # posições com hashes crescentes
+    last = -1
+    for i, h in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= h:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 and candidates[0] != last:
+            last = candidates[0]
+            selected.append((last, hashes[last]))
+    return selected
+
+
+def fingerprint_code(code: str, kgram: int = DEFAULT_KGRAM, window: int = DEFAULT_WINDOW) -> List[Fingerprint]:
+    """
+    Calcula as impressões digitais de um código: hashes de k-gramas de tokens
+    normalizados, selecionados por winnowing. Qualquer trecho comum de pelo
+    menos `kgram + window - 1` tokens gera ao menos uma impressão em comum.
+    """
+    tokens = normalized_tokens(code)
+    table: Dict[str, int] = {}
+    hashes = rolling_hashes([_token_value(text, table) for text, _, _ in tokens], kgram)
+    return [
+        (h, pos, tokens[pos][1], tokens[pos + kgram - 1][2])
+        for pos, h in winnow(hashes, window)
+    ]
+
+
+class CloneIndex:
+    """
+    Índice invertido persistente (SQLite) de impressões digitais por arquivo.
+
+    Apenas arquivos novos ou alterados (tamanho/mtime e hash do conteúdo) são
+    tokenizados novamente; os demais reaproveitam as impressões guardadas. Os
+    pares de clones entre arquivos saem de uma consulta pelo hash, sem comparar
+    cada arquivo com todos os outros.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 kgram: int = DEFAULT_KGRAM, window: int = DEFAULT_WINDOW):
+        self.kgram = kgram
+        self.window = window
+        if cache_dir is None:
+            self.conn = sqlite3.connect(":memory:")
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.conn = sqlite3.connect(os.path.join(cache_dir, INDEX_FILE))
+        self.conn.executescript(_SCHEMA)
+
+        # Parâmetros diferentes produzem impressões incompatíveis: recomeça o índice
+        options = f"{kgram}:{window}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'options'").fetchone()
+        if row is None or row[0] != options:
+            self.clear()
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('options', ?)", (options,))
+        self.fingerprinted = 0
+
+    def clear(self):
+        """Remove todos os arquivos e impressões do índice."""
+        self.conn.execute("DELETE FROM fingerprints")
+        self.conn.execute("DELETE FROM files")
+
+    def _forget(self, file_id: int):
+        self.conn.execute("DELETE FROM fingerprints WHERE file_id = ?", (file_id,))
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def update(self, paths: Iterable[str], root: Optional[str] = None) -> Tuple[Dict[int, str], List[Tuple[str, str]]]:
+        """
+        Atualiza o índice com os arquivos informados.
+
+        Arquivos sob `root` que estavam no índice e não foram informados
+        (removidos ou agora ignorados) são descartados.
+        Retorna ({id: caminho} dos arquivos indexados, [(caminho, erro)]).
+        """
+        known = {
+            path: (file_id, size, mtime_ns, content_hash)
+            for file_id, path, size, mtime_ns, content_hash in self.conn.execute(
+                "SELECT id, path, size, mtime_ns, content_hash FROM files")
+        }
+        current: Dict[int, str] = {}
+        errors = []
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                st = os.stat(path)
+                entry = known.get(path)
+                if entry and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+                    current[entry[0]] = path
+                    continue
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError as e:
+                errors.append((path, str(e)))
+                continue
+
+            content_hash = hashlib.sha256(data).hexdigest()
+            if entry and entry[3] == content_hash:
+                self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                  (st.st_size, st.st_mtime_ns, entry[0]))
+                current[entry[0]] = path
+                continue
+
+            if entry:
+                self._forget(entry[0])
+            try:
+                fingerprints = fingerprint_code(data.decode("utf-8"), self.kgram, self.window)
+            except (UnicodeDecodeError, tokenize.TokenError, SyntaxError) as e:
+                errors.append((path, str(e)))
+                continue
+
+            file_id = self.conn.execute(
+                "INSERT INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, content_hash)).lastrowid
+            self.conn.executemany(
+                "INSERT INTO fingerprints (file_id, hash, pos, start_line, end_line) VALUES (?, ?, ?, ?, ?)",
+                [(file_id, h, pos, start, end) for h, pos, start, end in fingerprints])
+            current[file_id] = path
+            self.fingerprinted += 1
+
+        if root is not None:
+            prefix = os.path.join(os.path.abspath(root), "")
+            for path, (file_id, *_) in known.items():
+                if path.startswith(prefix) and file_id not in current:
+                    self._forget(file_id)
+        self.conn.commit()
+        return current, errors
+
+    def shared_fingerprints(self, file_ids: Iterable[int]):
+        """
+        Consulta o índice invertido: produz, agrupadas por hash, as impressões
+        que aparecem em mais de um dos arquivos informados.
+        """
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_files (id INTEGER PRIMARY KEY)")
+        self.conn.execute("DELETE FROM current_files")
+        self.conn.executemany("INSERT INTO current_files (id) VALUES (?)", [(i,) for i in file_ids])
+        rows = self.conn.execute("""
+            SELECT f.hash, f.file_id, f.pos, f.start_line, f.end_line
+            FROM fingerprints f JOIN current_files c ON f.file_id = c.id
+            WHERE f.hash IN (
+                SELECT fp.hash FROM fingerprints fp JOIN current_files cf ON fp.file_id = cf.id
+                GROUP BY fp.hash
+                HAVING COUNT(DISTINCT fp.file_id) > 1
+            )
+            ORDER BY f.hash, f.file_id, f.pos
+        """)
+        group = []
+        current_hash = None
+        for h, file_id, pos, start, end in rows:
+            if h != current_hash and group:
+                yield group
+                group = []
+            current_hash = h
+            group.append((file_id, pos, start, end))
+        if group:
+            yield group
+
+    def clone_classes(self, files: Dict[int, str]) -> List[Dict]:
+        """
+        Agrupa os clones entre arquivos em classes.
+
+        As ocorrências de cada hash, ordenadas por arquivo, são ligadas em
+        cadeia (cada uma à seguinte de outro arquivo), então o número de pares
+        é linear mesmo para trechos copiados em muitos arquivos; a classe
+        completa é reconstruída pela união dos pares.
+        Impressões comuns a um par de arquivos na mesma diagonal (mesma
+        distância entre as posições) e próximas entre si formam um trecho
+        clonado; trechos que se sobrepõem no mesmo arquivo ficam na mesma classe.
+        Retorna [{"tokens": int, "fragments": [(caminho, linha_inicial, linha_final)]}],
+        das classes maiores para as menores.
+        """
+        matches = defaultdict(list)
+        for group in self.shared_fingerprints(files):
+            for a, b in zip(group, group[1:]):
+                if a[0] != b[0]:
+                    matches[(a[0], b[0])].append((a[1:], b[1:]))
+
+        # Trechos clonados: (arquivo_a, início, fim, arquivo_b, início, fim, tokens)
+        regions = []
+        gap = self.kgram + self.window
+        for (file_a, file_b), pairs in matches.items():
+            pairs.sort(key=lambda p: (p[1][0] - p[0][0], p[0][0]))
+            region = None
+            for a, b in pairs:
+                diagonal = b[0] - a[0]
+                if region and region[0] == diagonal and a[0] - region[2] <= gap:
+                    region[2] = a[0]
+                    region[3] = min(region[3], a[1])
+                    region[4] = max(region[4], a[2])
+                    region[5] = min(region[5], b[1])
+                    region[6] = max(region[6], b[2])
+                    continue
+                if region:
+                    regions.append((file_a, file_b, region))
+                # [diagonal, primeira_pos, última_pos, início_a, fim_a, início_b, fim_b]
+                region = [diagonal, a[0], a[0], a[1], a[2], b[1], b[2]]
+            if region:
+                regions.append((file_a, file_b, region))
+
+        # União de fragmentos: pares clonados e sobreposições no mesmo arquivo
+        fragments: List[Tuple[int, int, int]] = []
+        parent: List[int] = []
+        tokens: List[int] = []
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def union(i, j):
+            i, j = find(i), find(j)
+            if i != j:
+                parent[j] = i
+                tokens[i] = max(tokens[i], tokens[j])
+
+        for file_a, file_b, (_, first, last, start_a, end_a, start_b, end_b) in regions:
+            size = last - first + self.kgram
+            index = len(fragments)
+            fragments += [(file_a, start_a, end_a), (file_b, start_b, end_b)]
+            parent += [index, index + 1]
+            tokens += [size, size]
+            union(index, index + 1)
+
+        by_file = defaultdict(list)
+        for i, (file_id, start, end) in enumerate(fragments):
+            by_file[file_id].append((start, end, i))
+        for entries in by_file.values():
+            entries.sort()
+            reach, owner = -1, None
+            for start, end, i in entries:
+                if owner is not None and start <= reach:
+                    union(owner, i)
+                    reach = max(reach, end)
+                else:
+                    reach, owner = end, i
+
+        classes = defaultdict(lambda: defaultdict(list))
+        for i, (file_id, start, end) in enumerate(fragments):
+            classes[find(i)][file_id].append((start, end))
+
+        result = []
+        for root, per_file in classes.items():
+            merged = []
+            for file_id, ranges in per_file.items():
+                ranges.sort()
+                current = list(ranges[0])
+                for start, end in ranges[1:]:
+                    if start <= current[1]:
+                        current[1] = max(current[1], end)
+                    else:
+                        merged.append((files[file_id], current[0], current[1]))
+                        current = [start, end]
+                merged.append((files[file_id], current[0], current[1]))
+            result.append({"tokens": tokens[root], "fragments": sorted(merged)})
+        result.sort(key=lambda c: (-c["tokens"], c["fragments"]))
+        return result
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+
+def find_cross_file_clones(paths: Iterable[str], root: Optional[str] = None,
+                           cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                           kgram: int = DEFAULT_KGRAM, window: int = DEFAULT_WINDOW):
+    """
+    Atualiza o índice com os arquivos e retorna (classes_de_clones, erros, arquivos_reprocessados).
+    Com cache_dir=None o índice fica apenas em memória.
+    """
+    index = CloneIndex(cache_dir, kgram, window)
+    try:
+        files, errors = index.update(paths, root)
+        return index.clone_classes(files), errors, index.fingerprinted
+    finally:
+        index.close()
+
+
+def analyze_cross_file_duplicates(directory: str, exclude=None, use_cache: bool = True,
+                                  cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    Função CLI para identificar clones entre os arquivos de um diretório.
+    """
+    from analyzer.file_walker import iter_python_files
+
+    paths = list(iter_python_files(directory, exclude=exclude))
+    classes, errors, fingerprinted = find_cross_file_clones(
+        paths, root=directory, cache_dir=cache_dir if use_cache else None)
+
+    prefix = os.path.join(os.path.abspath(directory), "")
+
+    def relative(path):
+        return path[len(prefix):].replace(os.sep, "/") if path.startswith(prefix) else path
+
+    print(f"Analisando duplicações entre {len(paths)} arquivos ({fingerprinted} reprocessados)...")
+    print("Ignorando comentários, linhas em branco e indentação")
+    for path, error in errors:
+        print(f"Erro em {relative(path)}: {error}")
+    if not classes:
+        print("Nenhum clone entre arquivos encontrado.")
+        return
+
+    print(f"\n{len(classes)} classes de clones encontradas:")
+    for number, clone_class in enumerate(classes, start=1):
+        fragments = clone_class["fragments"]
+        print(f"\nClasse {number} (~{clone_class['tokens']} tokens, {len(fragments)} ocorrências):")
+        for path, start, end in fragments:
+            print(f"   {relative(path)}: linhas {start}-{end}")
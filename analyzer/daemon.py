@@ -0,0 +1,201 @@
+import json
+import os
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from analyzer import __version__
+from analyzer.daemon_client import request, socket_path
+from analyzer.defaults import DEFAULT_DAEMON_ENTRIES, DEFAULT_IDLE_TIMEOUT
+
+# Intervalo (s) entre as verificações de ociosidade do daemon
+_IDLE_CHECK = 1.0
+
+
+class ReportCache:
+    """
+    LRU em memória com o relatório de cada arquivo (ver file_report), já
+    serializado em JSON, com chave no caminho e validado pelo mtime e pelo
+    tamanho: um arquivo alterado é analisado de novo na consulta seguinte.
+
+    Guarda os resultados e não as ASTs, que ocupam cerca de cem vezes o
+    tamanho do arquivo. Pode ser usado por várias threads ao mesmo tempo.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_DAEMON_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> str:
+        """Relatório (JSON) do arquivo, do cache ou de uma nova análise."""
+        from analyzer.file_report import file_report
+        from analyzer.large_files import large_file_threshold
+
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        if stat.st_size >= large_file_threshold():
+            # Arquivos grandes ficam com o modo streaming do próprio cliente
+            raise ValueError(f"arquivo grande demais para o daemon: {path}")
+
+        # A análise fica fora do lock: outras requisições seguem em paralelo
+        report = json.dumps(file_report(path), ensure_ascii=False)
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            self._entries[path] = (version, report)
+            self.size += len(report)
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "size_kb": round(self.size / 1024, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0.0,
+            }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Uma requisição JSON por linha, respondida com uma linha JSON."""
+
+    def handle(self):
+        for line in self.rfile:
+            self.server.begin_request()
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = json.dumps({"ok": False, "error": str(e)}, ensure_ascii=False)
+            finally:
+                self.server.end_request()
+            self.wfile.write(response.encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if self.server.stopping:
+                # Só depois de responder: o cliente do `serve --stop` espera a confirmação
+                self.server.shutdown()
+                return
+
+
+class AnalysisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Daemon de análise: atende cada conexão em uma thread e encerra sozinho
+    depois de `idle_timeout` segundos sem requisições (0: nunca).
+    """
+
+    daemon_threads = True
+    # Conexões aguardando o accept: o padrão (5) recusaria rajadas de comandos
+    request_queue_size = 128
+
+    def __init__(self, path: str, cache: ReportCache, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.path = path
+        self.cache = cache
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.requests = 0
+        self.active = 0
+        self.stopping = False
+        self.last_activity = time.monotonic()
+        self._activity_lock = threading.Lock()
+        # Só o dono acessa o socket
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def begin_request(self):
+        with self._activity_lock:
+            self.active += 1
+            self.requests += 1
+
+    def end_request(self):
+        with self._activity_lock:
+            self.active -= 1
+            self.last_activity = time.monotonic()
+
+    def idle_for(self) -> float:
+        """Segundos sem requisições (zero enquanto alguma está em andamento)."""
+        with self._activity_lock:
+            return 0.0 if self.active else time.monotonic() - self.last_activity
+
+    def dispatch(self, message: Dict[str, Any]) -> str:
+        op = message.get("op")
+        if op == "report":
+            if message.get("version") != __version__:
+                raise ValueError(f"versão do daemon ({__version__}) diferente da do cliente ({message.get('version')})")
+            return '{"ok":true,"report":' + self.cache.get(message["path"]) + "}"
+        if op == "status":
+            return json.dumps({"ok": True, "status": self.status()}, ensure_ascii=False)
+        if op == "stop":
+            self.stopping = True
+            return json.dumps({"ok": True})
+        raise ValueError(f"operação desconhecida: {op}")
+
+    def status(self) -> Dict[str, Any]:
+        with self._activity_lock:
+            requests, active = self.requests, self.active
+        return {
+            "pid": os.getpid(),
+            "version": __version__,
+            "socket": self.path,
+            "uptime_s": round(time.time() - self.started, 1),
+            "idle_timeout_s": self.idle_timeout,
+            "requests": requests,
+            "active_requests": active,
+            "cache": self.cache.stats(),
+        }
+
+    def watch_idle(self):
+        """Encerra o servidor quando passa do tempo ocioso (roda em uma thread própria)."""
+        while True:
+            time.sleep(min(_IDLE_CHECK, self.idle_timeout))
+            if self.idle_for() >= self.idle_timeout:
+                self.shutdown()
+                return
+
+
+def serve(path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+          max_entries: int = DEFAULT_DAEMON_ENTRIES, on_ready=None):
+    """
+    Roda o daemon em primeiro plano até `stop`, ociosidade ou Ctrl+C.
+
+    Um socket que sobrou de um daemon encerrado à força é removido; se houver
+    outro daemon respondendo no mesmo caminho, levanta RuntimeError.
+    `on_ready(server)` é chamado quando o socket já aceita conexões.
+    """
+    path = path or socket_path()
+    if os.path.exists(path):
+        if request({"op": "status"}, path) is not None:
+            raise RuntimeError(f"já existe um daemon em execução em {path}")
+        os.unlink(path)
+    server = AnalysisServer(path, ReportCache(max_entries), idle_timeout)
+    try:
+        if idle_timeout:
+            threading.Thread(target=server.watch_idle, daemon=True).start()
+        if on_ready is not None:
+            on_ready(server)
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
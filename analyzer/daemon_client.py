@@ -0,0 +1,79 @@
+import os
+from typing import Any, Dict, Optional
+
+from analyzer import __version__, profiling
+
+# Lado cliente do daemon (analyzer serve), usado pelos comandos. O json e o
+# socket só são importados quando há um socket do daemon: sem daemon, o
+# comando paga apenas um os.path.exists.
+
+# Variável de ambiente com o caminho do socket (padrão: um por usuário)
+SOCKET_ENV = "ANALYZER_SOCKET"
+
+# Esperas do cliente (s): a conexão com um daemon vivo é imediata; a resposta
+# inclui a análise do arquivo quando ele não está no cache
+CONNECT_TIMEOUT = 0.5
+RESPONSE_TIMEOUT = 60
+
+# Desligado pela opção global --no-daemon: os comandos analisam no próprio processo
+_client_enabled = True
+
+
+def socket_path() -> str:
+    """Caminho do socket do daemon: $ANALYZER_SOCKET ou um socket por usuário."""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if not directory:
+        import tempfile
+        directory = tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "")
+    return os.path.join(directory, f"analyzer-{user}.sock")
+
+
+def request(message: Dict[str, Any], path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Envia uma mensagem ao daemon; None se não houver daemon rodando ou ele não responder."""
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return None
+    import json
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(CONNECT_TIMEOUT)
+            client.connect(path)
+            client.settimeout(RESPONSE_TIMEOUT)
+            client.sendall(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            with client.makefile("rb") as stream:
+                return json.loads(stream.readline())
+    except (OSError, ValueError):
+        return None
+
+
+def fetch_report(file: str, path: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Relatório do arquivo (ver file_report) calculado pelo daemon, ou None
+    quando o comando deve analisar no próprio processo: sem daemon, com
+    --no-daemon, com --profile ou se o daemon não conseguir analisar o arquivo.
+    """
+    if not _client_enabled or profiling.enabled():
+        return None
+    response = request({"op": "report", "path": os.path.abspath(file), "version": __version__}, path)
+    if not response or not response.get("ok"):
+        return None
+    return response["report"]
+
+
+def disable_client():
+    """Faz os comandos analisarem no próprio processo, mesmo com um daemon rodando."""
+    global _client_enabled
+    _client_enabled = False
+
+
+def enable_client():
+    global _client_enabled
+    _client_enabled = True
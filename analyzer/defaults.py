@@ -0,0 +1,47 @@
+import os
+
+# Valores padrão das opções da CLI. Ficam neste módulo, sem dependências,
+# porque o main precisa deles para declarar os comandos: importar os módulos
+# que os usam (sqlite3, concurrent.futures, a AST...) atrasaria a partida de
+# qualquer comando, mesmo dos que não precisam deles.
+
+# Cache de resultados por arquivo (result_cache)
+DEFAULT_CACHE_DIR = ".cache"
+DEFAULT_MAX_SIZE_MB = 256
+
+# Orçamento de memória padrão de cada processo de análise (large_files)
+DEFAULT_MAX_MEMORY_MB = 1024
+
+# Tamanho mínimo, em nós da AST, dos clones estruturais (ast_clones)
+DEFAULT_MIN_NODES = 25
+
+# Métricas do all-dir quando `--metrics` não é informado; o all usa todas
+# as do registro (metric_registry)
+DEFAULT_DIRECTORY_METRICS = ("lines", "comments", "docstrings", "classes", "functions", "methods")
+
+# Daemon (daemon): encerra após este tempo sem requisições (s) e guarda no
+# máximo este número de arquivos em memória
+DEFAULT_IDLE_TIMEOUT = 900
+DEFAULT_DAEMON_ENTRIES = 4096
+
+# Análise de bugs com IA em diretórios (ai_pipeline): requisições em paralelo,
+# limites da conta por minuto (0 desliga) e novas tentativas em 429/5xx
+DEFAULT_AI_CONCURRENCY = 4
+DEFAULT_AI_REQUESTS_PER_MINUTE = 500
+DEFAULT_AI_TOKENS_PER_MINUTE = 60000
+DEFAULT_AI_MAX_RETRIES = 5
+
+# Benchmarks (benchmark): repetições, queda de throughput aceita e medições
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2
+FILE_BENCHMARKS = [
+    "count_lines", "count_comments", "count_docstrings", "count_classes", "count_functions",
+    "count_methods", "find_all_duplicates", "analyze_complexity_code", "analyze_dead_code",
+    "comment_ratio",
+]
+REPOSITORY_BENCHMARKS = ["analyze_repository", "all", "all-dir"]
+BENCHMARKS = FILE_BENCHMARKS + REPOSITORY_BENCHMARKS
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
@@ -1,42 +1,62 @@
-import ast
 import os
 from collections import defaultdict
+from typing import Dict, FrozenSet, Optional, Sequence
 
-# Módulos padrões do Python (parcialmente listados)
-STANDARD_LIBS = {
-    'os', 'sys', 'math', 'json', 're', 'datetime', 'time', 'typing', 'functools',
-    'collections', 'subprocess', 'pathlib', 'itertools', 'random', 'threading',
-    'http', 'shutil', 'tempfile', 'csv', 'glob', 'logging', 'unittest'
-}
+from analyzer.directory_analysis import analyze_files
+from analyzer.file_walker import iter_python_files
+from analyzer.import_origin import count_external_imports, first_party_modules
+from analyzer.metrics_engine import SourceAnalysis
 
-def get_external_imports(filepath, counter):
+
+def extract_import_names(code, filename="<unknown>"):
+    """Pacotes de primeiro nível importados pelo código (imports relativos são ignorados)."""
+    return SourceAnalysis(code, filename).imports
+
+
+def extract_file_import_names(file_path):
+    """Lê um arquivo e extrai os pacotes importados (executado nos processos de trabalho)."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return extract_import_names(f.read(), filename=file_path)
+
+
+def get_external_imports(filepath, counter, first_party: FrozenSet[str] = frozenset()):
     """Adiciona os nomes dos pacotes externos importados no arquivo ao contador."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            tree = ast.parse(f.read(), filename=filepath)
+        imports = extract_file_import_names(filepath)
     except (FileNotFoundError, SyntaxError):
         return
+    count_external_imports(imports, counter, first_party)
+
+
+def analyze_repository(path=".", jobs: int = 1, per_file: bool = False,
+                       exclude: Optional[Sequence[str]] = None):
+    """
+    Percorre todos os arquivos .py e conta os imports externos.
+
+    Os arquivos são analisados em paralelo com `jobs` processos. Os módulos do
+    próprio projeto são descobertos uma vez, pela varredura da raiz.
+
+    Returns:
+        Por padrão, {pacote: ocorrências} somado no repositório. Com
+        `per_file=True`, (por_arquivo, total), onde por_arquivo mapeia o
+        caminho relativo de cada arquivo às suas próprias contagens.
+    """
+    first_party = first_party_modules(path)
+    total = defaultdict(int)
+    files: Dict[str, Dict[str, int]] = {}
+    prefix = os.path.join(path, "")
+    paths = iter_python_files(path, exclude=exclude)
+    for filepath, imports, error in analyze_files(paths, jobs, analyze=extract_file_import_names):
+        if error is not None:
+            continue
+        counter = defaultdict(int)
+        count_external_imports(imports, counter, first_party)
+        for name, count in counter.items():
+            total[name] += count
+        if per_file:
+            relative = filepath[len(prefix):] if filepath.startswith(prefix) else filepath
+            files[relative.replace(os.sep, "/")] = dict(counter)
 
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Import):
-            for alias in node.names:
-                name = alias.name.split('.')[0]
-                if name not in STANDARD_LIBS:
-                    counter[name] += 1
-        elif isinstance(node, ast.ImportFrom):
-            if node.module:
-                name = node.module.split('.')[0]
-                if name not in STANDARD_LIBS:
-                    counter[name] += 1
-
-def analyze_repository(path="."):
-    """Percorre todos os arquivos .py e conta os imports externos únicos."""
-    import_counter = defaultdict(int)
-
-    for subdir, _, files in os.walk(path):
-        for file in files:
-            if file.endswith(".py"):
-                filepath = os.path.join(subdir, file)
-                get_external_imports(filepath, import_counter)
-
-    return dict(import_counter)
+    if per_file:
+        return dict(sorted(files.items())), dict(total)
+    return dict(total)
@@ -0,0 +1,277 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from analyzer import profiling
+from analyzer.defaults import default_jobs
+from analyzer.large_files import (
+    is_large_file, large_file_marker, large_file_threshold, stream_file_metrics
+)
+from analyzer.metric_registry import DEFAULT_DIRECTORY_METRICS, Metric, required_inputs, select_metrics
+from analyzer.metrics_engine import SourceAnalysis
+
+# (caminho, métricas do arquivo, mensagem de erro)
+FileResult = Tuple[str, Optional[Dict[str, Any]], Optional[str]]
+
+# Versão do formato das métricas por arquivo guardadas no cache
+METRICS_FORMAT = 2
+
+# Quantas partes de trabalho, em média, cada processo recebe
+CHUNKS_PER_JOB = 4
+
+# Quantos arquivos da varredura são agendados de cada vez no modo paralelo
+WINDOW_SIZE = 2048
+
+
+# Arquivos a partir deste tamanho são analisados em streaming (sem a AST)
+LARGE_FILE_BYTES = large_file_threshold()
+
+
+def analyze_dir_file(file_path: str, large_file_bytes: Optional[int] = LARGE_FILE_BYTES,
+                     metrics: Sequence[str] = DEFAULT_DIRECTORY_METRICS,
+                     first_party: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """
+    Calcula as métricas de um arquivo no formato usado pelo comando all-dir.
+
+    `metrics` são os nomes das métricas do registro (metric_registry) a
+    calcular; só as passadas que elas exigem (varredura léxica, AST) são feitas.
+    `first_party` são os módulos do projeto, calculados uma vez por execução
+    (None: cada arquivo descobre os seus).
+
+    Arquivos com `large_file_bytes` ou mais são lidos em streaming: linhas e
+    comentários são contados com memória limitada, as métricas da AST ficam
+    zeradas e o resultado recebe o marcador `large_file`.
+    """
+    selected = select_metrics(metrics)
+    if large_file_bytes is not None and is_large_file(file_path, large_file_bytes):
+        return _large_dir_file(file_path, selected)
+
+    with profiling.stage("read"):
+        with open(file_path, "r", encoding="utf-8") as f:
+            code = f.read()
+    return analyze_source(code, file_path, selected, first_party)
+
+
+def analyze_source(code: str, file_path: str, metrics: Sequence[Metric],
+                   first_party: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """Métricas de um código já lido, no formato do all-dir (usado também pelo history)."""
+    analysis = SourceAnalysis(code, filename=file_path, inputs=required_inputs(metrics))
+    file_metrics = {"metrics": {}}
+    for metric in metrics:
+        metric.directory_entry(metric.report(analysis, file_path, first_party), file_metrics)
+    return file_metrics
+
+
+def _large_dir_file(file_path: str, selected: List[Metric]) -> Dict[str, Any]:
+    streamed = None
+    if any(metric.streaming for metric in selected):
+        with profiling.stage("streaming"):
+            streamed = stream_file_metrics(file_path, duplicates=False)
+
+    file_metrics = {"metrics": {}}
+    skipped = []
+    for metric in selected:
+        if metric.streaming:
+            metric.streamed_entry(streamed, file_metrics)
+        else:
+            metric.empty_entry(file_metrics)
+            skipped.append(metric.name)
+    file_metrics["large_file"] = large_file_marker(file_path, skipped)
+    return file_metrics
+
+
+def _directory_metrics(metrics: Optional[Sequence[Metric]]) -> Sequence[Metric]:
+    return select_metrics(DEFAULT_DIRECTORY_METRICS) if metrics is None else metrics
+
+
+def new_summary(total_files: int, metrics: Optional[Sequence[Metric]] = None) -> Dict[str, Any]:
+    """Cria o bloco summary vazio do comando all-dir (por padrão, com as métricas padrão)."""
+    summary = {"total_files": total_files}
+    for metric in _directory_metrics(metrics):
+        metric.start_summary(summary)
+    return summary
+
+
+def add_to_summary(summary: Dict[str, Any], file_metrics: Dict[str, Any], sign: int = 1,
+                   metrics: Optional[Sequence[Metric]] = None):
+    """Soma (ou, com sign=-1, subtrai) a contribuição de um arquivo aos totais."""
+    for metric in _directory_metrics(metrics):
+        metric.add_to_summary(summary, file_metrics, sign)
+
+
+def remove_from_summary(summary: Dict[str, Any], file_metrics: Dict[str, Any],
+                        metrics: Optional[Sequence[Metric]] = None):
+    """Subtrai a contribuição de um arquivo dos totais."""
+    add_to_summary(summary, file_metrics, sign=-1, metrics=metrics)
+
+
+def merge_summary(summary: Dict[str, Any], other: Dict[str, Any], metrics: Optional[Sequence[Metric]] = None):
+    """Soma aos totais de `summary` os de outro resumo ainda não concluído (com finalize_summary)."""
+    summary["total_files"] += other["total_files"]
+    for metric in _directory_metrics(metrics):
+        metric.merge_summary(summary, other)
+
+
+def finalize_summary(summary: Dict[str, Any], metrics: Optional[Sequence[Metric]] = None):
+    """Conclui os totais (como a proporção total de métodos públicos/privados)."""
+    for metric in _directory_metrics(metrics):
+        metric.finalize_summary(summary)
+
+
+def analyze_one(file_path: str, analyze: Callable[[str], Any] = analyze_dir_file) -> FileResult:
+    """Analisa um arquivo, devolvendo o erro como texto em vez de propagá-lo."""
+    try:
+        with profiling.file(file_path):
+            return file_path, analyze(file_path), None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def _analyze_chunk(paths: List[str], analyze: Callable[[str], Any],
+                   profile: Optional[Dict[str, bool]] = None) -> Tuple[List[FileResult], Optional[Dict]]:
+    """Analisa uma parte do trabalho no processo de trabalho; devolve também o perfil medido (com --profile)."""
+    collected = []
+    with profiling.worker(profile, collected):
+        results = [analyze_one(path, analyze) for path in paths]
+    return results, (collected[0] if collected else None)
+
+
+def _chunk_results(future) -> List[FileResult]:
+    results, profile = future.result()
+    profiling.merge_worker(profile)
+    return results
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def plan_chunks(paths: List[str], jobs: int) -> List[List[str]]:
+    """
+    Divide os arquivos em partes de trabalho, maiores primeiro.
+
+    Os arquivos são ordenados por tamanho decrescente e agrupados até atingir
+    uma fração do total de bytes: arquivos grandes ficam sozinhos e são
+    distribuídos primeiro, enquanto os pequenos seguem em lotes, evitando que
+    um único arquivo enorme deixe os demais processos ociosos no final.
+    """
+    sized = sorted(((_file_size(p), p) for p in paths), key=lambda item: -item[0])
+    total_bytes = sum(size for size, _ in sized)
+    target = max(1, total_bytes // max(1, jobs * CHUNKS_PER_JOB))
+    max_files = max(1, len(paths) // max(1, jobs * CHUNKS_PER_JOB))
+
+    chunks = []
+    current, current_bytes = [], 0
+    for size, path in sized:
+        current.append(path)
+        current_bytes += size
+        if current_bytes >= target or len(current) >= max_files:
+            chunks.append(current)
+            current, current_bytes = [], 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def analyze_files(paths: Iterable[str], jobs: int = 1,
+                  analyze: Callable[[str], Any] = analyze_dir_file) -> Iterator[FileResult]:
+    """
+    Analisa os arquivos, distribuindo o trabalho em `jobs` processos.
+
+    `analyze` é a análise aplicada a cada arquivo (por padrão, as métricas do
+    all-dir); precisa ser uma função de módulo, para poder ir aos processos.
+
+    `paths` pode ser um gerador (como o da varredura de diretórios): os arquivos
+    são agendados em janelas de WINDOW_SIZE, então a análise começa antes de a
+    varredura terminar. Os resultados são produzidos na ordem em que ficam
+    prontos; com jobs=1 a análise acontece no próprio processo, na ordem recebida.
+    """
+    paths = iter(paths)
+    if jobs <= 1:
+        for path in paths:
+            yield analyze_one(path, analyze)
+        return
+
+    window = list(islice(paths, WINDOW_SIZE))
+    if len(window) <= 1:
+        for path in window:
+            yield analyze_one(path, analyze)
+        return
+
+    profile = profiling.worker_options()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        while window:
+            for chunk in plan_chunks(window, jobs):
+                pending.add(executor.submit(_analyze_chunk, chunk, analyze, profile))
+            # Entrega o que já terminou enquanto a varredura continua
+            done = {future for future in pending if future.done()}
+            pending -= done
+            for future in done:
+                yield from _chunk_results(future)
+            window = list(islice(paths, WINDOW_SIZE))
+
+        for future in as_completed(pending):
+            yield from _chunk_results(future)
+
+
+def analyze_files_cached(paths: Iterable[str], jobs: int = 1, cache=None,
+                         analyze: Callable[[str], Any] = analyze_dir_file) -> Iterator[FileResult]:
+    """
+    Igual a analyze_files, mas serve do cache os arquivos inalterados.
+
+    Apenas os arquivos ausentes do cache são enviados para análise; os
+    resultados novos são gravados no cache à medida que ficam prontos.
+    """
+    if cache is None:
+        yield from analyze_files(paths, jobs, analyze)
+        return
+
+    hits = deque()
+
+    def misses():
+        for path in paths:
+            with profiling.stage("cache"):
+                cached = cache.get(path)
+            if cached is None:
+                yield path
+            else:
+                hits.append((path, cached, None))
+
+    for result in analyze_files(misses(), jobs, analyze):
+        while hits:
+            yield hits.popleft()
+        if result[2] is None:
+            with profiling.stage("cache"):
+                cache.put(result[0], result[1])
+        yield result
+    yield from hits
+
+
+def cached_results(paths: Iterable[str], cache, skip: Iterable[str] = ()) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Resultados guardados no cache para os arquivos de `paths` fora de `skip`,
+    sem analisar nenhum arquivo. Devolve também quantos não estavam no cache.
+    """
+    skip = set(skip)
+    results, missing = [], 0
+    for path in paths:
+        if path in skip:
+            continue
+        cached = cache.get(path)
+        if cached is None:
+            missing += 1
+        else:
+            results.append(cached)
+    return results, missing
+
+
+def ordered_results(paths: List[str], results: Iterable[FileResult]) -> List[FileResult]:
+    """Reordena os resultados conforme a lista original de arquivos."""
+    by_path = {result[0]: result for result in results}
+    return [by_path[path] for path in paths if path in by_path]
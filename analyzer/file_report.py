@@ -0,0 +1,25 @@
+from typing import Any, Dict, Iterable, Optional
+
+from analyzer.metric_registry import required_inputs, select_metrics
+from analyzer.metrics_engine import SourceAnalysis
+
+
+def file_report(file: str, code: Optional[str] = None, metrics: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Métricas de um arquivo no formato do bloco `metrics` do comando all.
+
+    O mesmo relatório atende os comandos de contagem (lines, classes...) e é o
+    que o daemon (`analyzer serve`) guarda em memória para cada arquivo.
+    `metrics` restringe o relatório a essas métricas do registro (padrão:
+    todas); só as passadas de que elas precisam são feitas.
+    """
+    if code is None:
+        with open(file, "r", encoding="utf-8") as f:
+            code = f.read()
+    # Arquivo lido e analisado uma única vez, só com as passadas que as métricas declaram
+    selected = select_metrics(metrics)
+    analysis = SourceAnalysis(code, filename=file, inputs=required_inputs(selected))
+    report = {}
+    for metric in selected:
+        report.update(metric.report(analysis, file))
+    return report
@@ -0,0 +1,242 @@
+import os
+import re
+from fnmatch import fnmatch
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+# Diretórios que nunca contêm código do projeto analisado. Nomes genéricos
+# (env, build, dist) ficam de fora: podem ser pacotes do projeto e, quando são
+# saída de build, costumam estar no .gitignore (ou use --exclude).
+DEFAULT_EXCLUDED_DIRS = frozenset({
+    '.git', '.hg', '.svn', 'venv', '.venv', 'node_modules', '__pycache__',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache', '.eggs',
+    'site-packages',
+})
+
+# Arquivo que identifica um virtualenv, qualquer que seja o nome do diretório
+VIRTUALENV_MARKER = 'pyvenv.cfg'
+
+
+def is_virtualenv(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, VIRTUALENV_MARKER))
+
+
+def _translate(pattern: str) -> str:
+    """Converte um padrão do .gitignore em expressão regular."""
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '/.*'
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+            continue
+        if c == '*':
+            regex += '[^/]*'
+        elif c == '?':
+            regex += '[^/]'
+        elif c == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex += re.escape(c)
+            else:
+                body = pattern[i + 1:end].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = end
+        else:
+            regex += re.escape(c)
+        i += 1
+    return regex
+
+
+class GitIgnore:
+    """Regras de um arquivo .gitignore, relativas ao diretório onde ele está."""
+
+    def __init__(self, lines: Sequence[str]):
+        # (regex, negado, apenas_diretórios, ancorado)
+        self.rules: List[Tuple[re.Pattern, bool, bool, bool]] = []
+        for raw in lines:
+            line = raw.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negated = line.startswith('!')
+            if negated:
+                line = line[1:]
+            if line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+            self.rules.append((re.compile(_translate(line) + r'\Z'), negated, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'GitIgnore':
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.readlines())
+        except OSError:
+            return cls([])
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """
+        Retorna True se o caminho é ignorado, False se foi reincluído com `!`
+        e None se nenhuma regra se aplica. A última regra correspondente vence.
+        """
+        result = None
+        name = rel_path.rsplit('/', 1)[-1]
+        for regex, negated, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            target = rel_path if anchored else name
+            if regex.match(target):
+                result = not negated
+        return result
+
+
+def _matches_any(rel_path: str, patterns: Sequence[str]) -> bool:
+    name = rel_path.rsplit('/', 1)[-1]
+    return any(fnmatch(rel_path, p) or fnmatch(name, p) for p in patterns)
+
+
+def iter_python_files(
+    root: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    use_gitignore: bool = True,
+    on_directory: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+    """
+    Percorre `root` recursivamente e produz, sob demanda, os arquivos Python.
+
+    - Usa os.scandir, aproveitando o tipo de entrada já lido do diretório.
+    - Diretórios ignorados (padrões, .gitignore ou --exclude) são podados antes
+      de serem percorridos.
+    - Links simbólicos para diretórios já visitados são ignorados, evitando laços.
+    - Cada diretório é listado em ordem alfabética, então a ordem é determinística.
+
+    Args:
+        root: Diretório raiz
+        include: Globs que os arquivos devem satisfazer (padrão: *.py)
+        exclude: Globs de arquivos ou diretórios a ignorar
+        use_gitignore: Se deve respeitar os arquivos .gitignore encontrados
+        on_directory: Chamada com cada diretório percorrido (inclusive a raiz)
+    """
+    include = list(include) if include else ['*.py']
+    exclude = list(exclude) if exclude else []
+
+    try:
+        root_stat = os.stat(root)
+    except OSError:
+        return
+    visited = {(root_stat.st_dev, root_stat.st_ino)}
+
+    # Pilha de (diretório, caminho relativo, regras de .gitignore ativas)
+    stack = [(root, '', [])]
+    while stack:
+        directory, rel_dir, ignores = stack.pop()
+        if on_directory is not None:
+            on_directory(directory)
+        if use_gitignore:
+            gitignore_path = os.path.join(directory, '.gitignore')
+            if os.path.isfile(gitignore_path):
+                ignores = ignores + [(rel_dir, GitIgnore.from_file(gitignore_path))]
+
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            if is_dir and (entry.name in DEFAULT_EXCLUDED_DIRS or is_virtualenv(entry.path)):
+                continue
+            if _is_ignored(rel_path, is_dir, ignores) or _matches_any(rel_path, exclude):
+                continue
+
+            if is_dir:
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                key = (st.st_dev, st.st_ino)
+                if key in visited:
+                    continue
+                visited.add(key)
+                subdirs.append((entry.path, rel_path, ignores))
+            elif _matches_any(rel_path, include):
+                yield entry.path
+
+        # Empilha em ordem reversa para visitar os subdiretórios em ordem alfabética
+        stack.extend(reversed(subdirs))
+
+
+def _is_ignored(rel_path: str, is_dir: bool, ignores) -> bool:
+    # O .gitignore mais profundo tem precedência sobre os dos diretórios acima
+    for base, gitignore in reversed(ignores):
+        local = rel_path[len(base) + 1:] if base else rel_path
+        result = gitignore.match(local, is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def is_path_included(
+    root: str,
+    path: str,
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    use_gitignore: bool = True,
+    is_dir: bool = False,
+    skip_virtualenvs: bool = True,
+) -> bool:
+    """
+    Aplica a um único caminho as mesmas regras usadas por iter_python_files.
+
+    Com is_dir=True, indica se o diretório seria percorrido. Com
+    skip_virtualenvs=False, os diretórios não são consultados no disco em
+    busca do pyvenv.cfg (para caminhos que não existem nele, como os do git).
+    """
+    include = list(include) if include else ['*.py']
+    exclude = list(exclude) if exclude else []
+    rel = os.path.relpath(path, root).replace(os.sep, '/')
+    if rel == '.':
+        return is_dir
+    if rel.startswith('../'):
+        return False
+
+    parts = rel.split('/')
+    ignores = []
+    for i, part in enumerate(parts):
+        rel_dir = '/'.join(parts[:i])
+        if use_gitignore:
+            gitignore_path = os.path.join(root, *parts[:i], '.gitignore')
+            if os.path.isfile(gitignore_path):
+                ignores.append((rel_dir, GitIgnore.from_file(gitignore_path)))
+        rel_path = '/'.join(parts[:i + 1])
+        part_is_dir = is_dir or i < len(parts) - 1
+        if part_is_dir and part in DEFAULT_EXCLUDED_DIRS:
+            return False
+        if part_is_dir and skip_virtualenvs and is_virtualenv(os.path.join(root, *parts[:i + 1])):
+            return False
+        if _is_ignored(rel_path, part_is_dir, ignores) or _matches_any(rel_path, exclude):
+            return False
+    return is_dir or _matches_any(rel, include)
@@ -0,0 +1,53 @@
+import os
+import subprocess
+from typing import List, Optional, Sequence
+
+from analyzer.file_walker import is_path_included
+
+
+def git(directory: str, *args: str) -> str:
+    """Executa um comando git no repositório de `directory` e devolve a saída."""
+    try:
+        process = subprocess.run(["git", "-C", directory, *args], capture_output=True, text=True)
+    except FileNotFoundError:
+        raise RuntimeError("git não encontrado no PATH")
+    if process.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)}: {process.stderr.strip()}")
+    return process.stdout
+
+
+def changed_files(directory: str, since: Optional[str] = None, staged: bool = False) -> List[str]:
+    """
+    Arquivos de `directory` alterados segundo um `git diff --name-only` local
+    (caminhos absolutos, em ordem alfabética; arquivos removidos ficam de fora).
+
+    Com `since`, a comparação é com o ponto em que o HEAD saiu de `since`
+    (o merge-base, como na aba de arquivos de um pull request), incluindo as
+    alterações locais ainda não commitadas. Com `staged`, só o que está no
+    índice (`git diff --cached`) conta; os dois juntos comparam o índice com
+    o merge-base.
+    """
+    root = git(directory, "rev-parse", "--show-toplevel").strip()
+    args = ["diff", "--name-only", "-z", "--diff-filter=d"]
+    if staged:
+        args.append("--cached")
+    if since:
+        args.append(git(directory, "merge-base", since, "HEAD").strip())
+    names = git(directory, *args, "--", ".").split("\0")
+    return sorted(os.path.join(root, *name.split("/")) for name in names if name)
+
+
+def changed_python_files(directory: str, since: Optional[str] = None, staged: bool = False,
+                         include: Optional[Sequence[str]] = None,
+                         exclude: Optional[Sequence[str]] = None) -> List[str]:
+    """
+    Arquivos alterados que o all-dir analisaria (mesmos filtros da varredura:
+    `--include`, `--exclude`, .gitignore), com caminhos iniciados por
+    `directory`, como os de iter_python_files.
+    """
+    real_directory = os.path.realpath(directory)
+    paths = []
+    for path in changed_files(directory, since, staged):
+        if os.path.isfile(path) and is_path_included(real_directory, path, include, exclude):
+            paths.append(os.path.join(directory, os.path.relpath(path, real_directory)))
+    return paths
@@ -0,0 +1,241 @@
+import copy
+import os
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from analyzer.directory_analysis import (
+    FileResult, add_to_summary, analyze_dir_file, analyze_source, finalize_summary, merge_summary, new_summary
+)
+from analyzer.file_walker import VIRTUALENV_MARKER, is_path_included
+from analyzer.git_changes import git
+from analyzer.metric_registry import DEFAULT_DIRECTORY_METRICS, SUM, Metric, MethodsMetric, select_metrics
+
+# Modos das entradas de uma árvore do git que viram arquivos no checkout
+TREE_MODE = b"40000"
+BLOB_MODES = (b"100644", b"100755", b"100664")
+
+# Tamanho dos pedaços copiados ao gravar um blob grande em arquivo temporário
+COPY_CHUNK = 1 << 20
+
+# Um `git cat-file --batch` por repositório em cada processo de trabalho
+_CAT_FILES: Dict[str, "CatFile"] = {}
+
+
+class CatFile:
+    """
+    Leitor de objetos do git via um único `git cat-file --batch` persistente:
+    cada leitura é uma linha no stdin, sem um processo por objeto e sem checkout.
+    """
+
+    def __init__(self, repo: str):
+        try:
+            self.process = subprocess.Popen(["git", "-C", repo, "cat-file", "--batch"],
+                                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        except FileNotFoundError:
+            raise RuntimeError("git não encontrado no PATH")
+
+    def header(self, sha: str) -> Tuple[str, int]:
+        """Pede o objeto `sha` e devolve (tipo, tamanho); o conteúdo deve ser lido em seguida."""
+        self.process.stdin.write(sha.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+        fields = self.process.stdout.readline().split()
+        if len(fields) != 3:
+            raise RuntimeError(f"objeto do git não encontrado: {sha}")
+        return fields[1].decode("ascii"), int(fields[2])
+
+    def body(self, size: int) -> bytes:
+        data = self.process.stdout.read(size)
+        self.process.stdout.read(1)  # quebra de linha após o conteúdo
+        return data
+
+    def copy_body(self, size: int, f):
+        """Copia o conteúdo para `f` em pedaços, sem carregá-lo inteiro na memória."""
+        while size:
+            data = self.process.stdout.read(min(size, COPY_CHUNK))
+            f.write(data)
+            size -= len(data)
+        self.process.stdout.read(1)
+
+    def read(self, sha: str) -> Tuple[str, bytes]:
+        kind, size = self.header(sha)
+        return kind, self.body(size)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+        self.process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _cat_file(repo: str) -> CatFile:
+    if repo not in _CAT_FILES:
+        _CAT_FILES[repo] = CatFile(repo)
+    return _CAT_FILES[repo]
+
+
+def close_cat_files():
+    while _CAT_FILES:
+        _CAT_FILES.popitem()[1].close()
+
+
+def parse_tree(data: bytes):
+    """Entradas (modo, nome, sha) de um objeto árvore: `<modo> <nome>\\0<20 bytes do sha>`."""
+    pos = 0
+    while pos < len(data):
+        space = data.index(b" ", pos)
+        nul = data.index(b"\0", space)
+        yield data[pos:space], data[space + 1:nul].decode("utf-8", "surrogateescape"), data[nul + 1:nul + 21].hex()
+        pos = nul + 21
+
+
+def unsupported_metrics(metrics: Sequence[Metric]) -> List[str]:
+    """
+    Métricas que não entram no history: as sem total no summary e as
+    dependências, cuja separação entre módulos do projeto e externos olha os
+    arquivos vizinhos no disco, que não existem sem checkout.
+    """
+    return [metric.name for metric in metrics if metric.aggregate != SUM and not isinstance(metric, MethodsMetric)]
+
+
+def list_commits(directory: str, rev_range: str, first_parent: bool = False) -> List[Dict[str, str]]:
+    """Commits de `rev_range` (ex.: v1.0..v2.0), do mais antigo para o mais recente."""
+    args = ["log", "--reverse", "--format=%H%x09%cI%x09%s"]
+    if first_parent:
+        args.append("--first-parent")
+    commits = []
+    for line in git(directory, *args, rev_range, "--").splitlines():
+        sha, date, subject = line.split("\t", 2)
+        commits.append({"commit": sha, "date": date, "subject": subject})
+    return commits
+
+
+def analyze_blob(sha: str, repo: str, large_file_bytes: Optional[int] = None,
+                 metrics: Sequence[str] = DEFAULT_DIRECTORY_METRICS) -> Dict[str, Any]:
+    """
+    Métricas do all-dir para o conteúdo de um blob, lido do repositório sem
+    checkout. O texto é normalizado como na leitura do all-dir (UTF-8, quebras
+    de linha universais); blobs grandes vão para um arquivo temporário e
+    seguem o modo streaming de analyze_dir_file.
+    """
+    cat_file = _cat_file(repo)
+    _, size = cat_file.header(sha)
+    if large_file_bytes is not None and size >= large_file_bytes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"{sha}.py")
+            with open(path, "wb") as f:
+                cat_file.copy_body(size, f)
+            return analyze_dir_file(path, large_file_bytes, metrics)
+    code = cat_file.body(size).decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+    return analyze_source(code, sha, select_metrics(metrics))
+
+
+class HistoryScan:
+    """
+    Árvores dos commits de um intervalo, com os arquivos que o all-dir
+    analisaria em cada uma.
+
+    Árvores e blobs são identificados pelo sha: uma subárvore que não mudou
+    entre dois commits é lida e somada uma única vez, e cada conteúdo
+    distinto de arquivo (`blobs`) é analisado uma única vez no histórico todo.
+    """
+
+    def __init__(self, directory: str, include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None):
+        self.repo = git(directory, "rev-parse", "--show-toplevel").strip()
+        # Caminho de `directory` dentro do repositório: a análise fica restrita a ele
+        self.scope = [part for part in git(directory, "rev-parse", "--show-prefix").strip().split("/") if part]
+        self.include = include
+        self.exclude = exclude
+        self.cat_file = CatFile(self.repo)
+        # sha do blob -> primeiro caminho em que apareceu
+        self.blobs: Dict[str, str] = {}
+        self.file_versions = 0
+        self._trees: Dict[Tuple[str, str], Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]] = {}
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._summaries: Dict[Tuple[str, str], Tuple[Dict[str, Any], int]] = {}
+
+    def add_commit(self, commit: str) -> Optional[str]:
+        """Lê a árvore do commit (no escopo) e devolve o seu sha; None se o escopo não existe no commit."""
+        _, data = self.cat_file.read(commit)
+        tree = data.split(b"\n", 1)[0].split(b" ")[1].decode("ascii")
+        for part in self.scope:
+            _, data = self.cat_file.read(tree)
+            tree = next((sha for mode, name, sha in parse_tree(data) if mode == TREE_MODE and name == part), None)
+            if tree is None:
+                return None
+        self.file_versions += self._count(tree, "")
+        return tree
+
+    def _count(self, tree: str, prefix: str) -> int:
+        key = (tree, prefix)
+        if key not in self._counts:
+            files, subtrees = self._tree(tree, prefix)
+            self._counts[key] = len(files) + sum(self._count(sha, path) for sha, path in subtrees)
+        return self._counts[key]
+
+    def _tree(self, tree: str, prefix: str):
+        key = (tree, prefix)
+        if key in self._trees:
+            return self._trees[key]
+        _, data = self.cat_file.read(tree)
+        entries = list(parse_tree(data))
+        files, subtrees = [], []
+        # Um virtualenv versionado é ignorado como na varredura do disco (pyvenv.cfg)
+        if prefix and any(name == VIRTUALENV_MARKER for _, name, _ in entries):
+            entries = []
+        for mode, name, sha in entries:
+            path = f"{prefix}/{name}" if prefix else name
+            if mode == TREE_MODE:
+                if is_path_included("/", "/" + path, self.include, self.exclude, use_gitignore=False, is_dir=True,
+                                    skip_virtualenvs=False):
+                    subtrees.append((sha, path))
+                    self._tree(sha, path)
+            elif mode in BLOB_MODES and is_path_included("/", "/" + path, self.include, self.exclude,
+                                                         use_gitignore=False, skip_virtualenvs=False):
+                files.append((path, sha))
+                self.blobs.setdefault(sha, path)
+        self._trees[key] = files, subtrees
+        return files, subtrees
+
+    def summary(self, tree: Optional[str], results: Dict[str, FileResult],
+                metrics: Sequence[Metric]) -> Tuple[Dict[str, Any], int]:
+        """
+        Resumo do all-dir para a árvore (já concluído com finalize_summary) e
+        quantos arquivos falharam; `results` são os resultados por sha do blob.
+        """
+        if tree is None:
+            summary, failed = new_summary(0, metrics), 0
+        else:
+            summary, failed = self._summary(tree, "", results, metrics)
+            summary = copy.deepcopy(summary)
+        finalize_summary(summary, metrics)
+        return summary, failed
+
+    def _summary(self, tree: str, prefix: str, results: Dict[str, FileResult], metrics: Sequence[Metric]):
+        key = (tree, prefix)
+        if key in self._summaries:
+            return self._summaries[key]
+        files, subtrees = self._tree(tree, prefix)
+        summary, failed = new_summary(len(files), metrics), 0
+        for _, sha in files:
+            file_metrics = results[sha][1]
+            if file_metrics is None:
+                failed += 1
+            else:
+                add_to_summary(summary, file_metrics, metrics=metrics)
+        for sha, path in subtrees:
+            other, other_failed = self._summary(sha, path, results, metrics)
+            merge_summary(summary, other, metrics)
+            failed += other_failed
+        self._summaries[key] = summary, failed
+        return summary, failed
+
+    def close(self):
+        self.cat_file.close()
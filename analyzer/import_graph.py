@@ -0,0 +1,284 @@
+import ast
+import hashlib
+import os
+from collections import Counter, defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from analyzer.directory_analysis import analyze_files_cached
+from analyzer.file_walker import iter_python_files
+from analyzer.import_origin import is_standard_lib
+from analyzer.result_cache import ResultCache
+
+# Versão do formato dos imports (e do grafo) guardados no cache
+IMPORTS_FORMAT = 2
+
+# (módulo ou None, nomes importados, nível relativo)
+RawImport = Tuple[Optional[str], List[str], int]
+
+
+def extract_imports(code: str, filename: str = "<unknown>") -> List[RawImport]:
+    """Lista todos os imports do módulo, inclusive os relativos e os aninhados em funções."""
+    tree = ast.parse(code, filename=filename)
+    imports = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append((alias.name, [], 0))
+        elif isinstance(node, ast.ImportFrom):
+            imports.append((node.module, [alias.name for alias in node.names], node.level))
+    return imports
+
+
+def extract_file_imports(file_path: str) -> List[RawImport]:
+    """Lê um arquivo e extrai seus imports (executado nos processos de trabalho)."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return extract_imports(f.read(), filename=file_path)
+
+
+def module_name(relative_path: str) -> str:
+    """Converte `pacote/sub/modulo.py` em `pacote.sub.modulo` (e `pacote/__init__.py` em `pacote`)."""
+    parts = relative_path[:-3].split("/") if relative_path.endswith(".py") else relative_path.split("/")
+    if parts[-1] == "__init__" and len(parts) > 1:
+        parts.pop()
+    # Layout src/: os imports não mencionam o diretório src
+    if parts[0] == "src" and len(parts) > 1:
+        parts.pop(0)
+    return ".".join(parts)
+
+
+def strongly_connected_components(edges: Dict[str, Set[str]]) -> List[List[str]]:
+    """Componentes fortemente conexas pelo algoritmo de Tarjan, em versão iterativa."""
+    index: Dict[str, int] = {}
+    lowlink: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    components = []
+    counter = 0
+
+    for start in sorted(edges):
+        if start in index:
+            continue
+        # Cada quadro guarda o nó e um iterador sobre seus vizinhos ainda não vistos
+        work = [(start, iter(sorted(edges.get(start, ()))))]
+        index[start] = lowlink[start] = counter
+        counter += 1
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            node, neighbors = work[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = lowlink[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(sorted(edges.get(neighbor, ())))))
+                    advanced = True
+                    break
+                if neighbor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[neighbor])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(sorted(component))
+    return components
+
+
+class ImportGraph:
+    """
+    Grafo de imports entre os módulos de um repositório.
+
+    Cada import é resolvido para um módulo do próprio repositório (arestas do
+    grafo), para a biblioteca padrão ou para um pacote de terceiros. As arestas
+    reversas são mantidas junto, então "quem depende deste módulo" é uma busca
+    em largura, sem reanalisar nenhum arquivo.
+    """
+
+    def __init__(self, modules: Dict[str, str], imports: Dict[str, List[RawImport]]):
+        self.modules = modules  # módulo -> caminho relativo
+        self.paths = {path: name for name, path in modules.items()}
+        self.edges: Dict[str, Set[str]] = {name: set() for name in modules}
+        self.reverse: Dict[str, Set[str]] = {name: set() for name in modules}
+        self.third_party: Dict[str, Counter] = defaultdict(Counter)
+        self.stdlib: Dict[str, Counter] = defaultdict(Counter)
+        self._cycles: Optional[List[List[str]]] = None
+        for name, raw_imports in imports.items():
+            for raw in raw_imports:
+                self._add_import(name, *raw)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Grafo já resolvido, com os ciclos, em formato JSON (guardado no cache)."""
+        return {
+            "modules": self.modules,
+            "edges": {name: sorted(targets) for name, targets in self.edges.items() if targets},
+            "stdlib": {name: dict(counter) for name, counter in self.stdlib.items()},
+            "third_party": {name: dict(counter) for name, counter in self.third_party.items()},
+            "cycles": self.cycles(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ImportGraph":
+        """Reconstrói o grafo de to_dict sem resolver imports nem recalcular os ciclos."""
+        graph = cls(data["modules"], {})
+        for source, targets in data["edges"].items():
+            for target in targets:
+                graph._add_edge(source, target)
+        graph.stdlib.update((name, Counter(counter)) for name, counter in data["stdlib"].items())
+        graph.third_party.update((name, Counter(counter)) for name, counter in data["third_party"].items())
+        graph._cycles = data["cycles"]
+        return graph
+
+    def _is_package(self, name: str) -> bool:
+        return self.modules.get(name, "").endswith("__init__.py")
+
+    def _longest_module(self, dotted: str) -> Optional[str]:
+        parts = dotted.split(".")
+        for end in range(len(parts), 0, -1):
+            candidate = ".".join(parts[:end])
+            if candidate in self.modules:
+                return candidate
+        return None
+
+    def _add_edge(self, source: str, target: Optional[str]):
+        if target is not None and target != source:
+            self.edges[source].add(target)
+            self.reverse[target].add(source)
+
+    def _add_import(self, source: str, module: Optional[str], names: List[str], level: int):
+        if level:
+            # Import relativo: sobe `level` pacotes a partir do pacote do módulo
+            package = source.split(".") if self._is_package(source) else source.split(".")[:-1]
+            if level - 1 > len(package):
+                return
+            base = package[:len(package) - (level - 1)]
+            absolute = ".".join(base + ([module] if module else []))
+        else:
+            absolute = module
+
+        if names and absolute is not None:
+            # `from pacote import submodulo` depende do submódulo; o pacote só
+            # entra como dependência pelos nomes que não são submódulos
+            all_submodules = True
+            for alias in names:
+                submodule = f"{absolute}.{alias}" if absolute else alias
+                if submodule in self.modules:
+                    self._add_edge(source, submodule)
+                else:
+                    all_submodules = False
+            if all_submodules:
+                return
+
+        target = self._longest_module(absolute) if absolute else None
+        if target is not None:
+            self._add_edge(source, target)
+        elif not level and absolute:
+            top = absolute.split(".")[0]
+            if is_standard_lib(top):
+                self.stdlib[source][top] += 1
+            else:
+                self.third_party[source][top] += 1
+
+    def fan_out(self, name: str) -> int:
+        return len(self.edges.get(name, ()))
+
+    def fan_in(self, name: str) -> int:
+        return len(self.reverse.get(name, ()))
+
+    def cycles(self) -> List[List[str]]:
+        """Ciclos de imports: componentes fortemente conexas com mais de um módulo."""
+        if self._cycles is None:
+            self._cycles = [c for c in strongly_connected_components(self.edges) if len(c) > 1]
+        return self._cycles
+
+    def dependents(self, names: Iterable[str]) -> Set[str]:
+        """Módulos afetados por uma mudança: os próprios módulos e todos os que dependem deles."""
+        seen = set(n for n in names if n in self.modules)
+        queue = deque(seen)
+        while queue:
+            for dependent in self.reverse.get(queue.popleft(), ()):
+                if dependent not in seen:
+                    seen.add(dependent)
+                    queue.append(dependent)
+        return seen
+
+    def impact(self, paths: Iterable[str]) -> List[str]:
+        """Caminhos relativos dos arquivos afetados pela mudança dos arquivos informados."""
+        names = [self.paths[p] for p in paths if p in self.paths]
+        return sorted(self.modules[name] for name in self.dependents(names))
+
+
+def build_import_graph(
+    root: str,
+    jobs: int = 1,
+    cache: Optional[ResultCache] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> Tuple[ImportGraph, List[Tuple[str, str]]]:
+    """
+    Extrai os imports de todos os arquivos em paralelo e monta o grafo.
+
+    Com `cache`, os imports de cada arquivo ficam guardados pelo hash do
+    conteúdo: arquivos inalterados não são lidos de novo. O grafo resolvido,
+    com os ciclos, fica guardado pelo conjunto de (caminho, hash) de todos os
+    arquivos: se nenhum arquivo mudou, entrou ou saiu, ele volta do cache sem
+    resolver imports nem rodar o Tarjan.
+    Retorna (grafo, [(caminho, erro)]).
+    """
+    prefix = os.path.join(root, "")
+
+    def relative(path: str) -> str:
+        return path[len(prefix):].replace(os.sep, "/") if path.startswith(prefix) else path
+
+    paths = iter_python_files(root, exclude=exclude)
+    fingerprint = None
+    if cache is not None:
+        paths = list(paths)
+        fingerprint = graph_fingerprint((relative(path), cache.content_hash(path)) for path in paths)
+        cached = cache.get_by_hash(fingerprint) if fingerprint else None
+        if cached is not None:
+            return ImportGraph.from_dict(cached["graph"]), [tuple(error) for error in cached["errors"]]
+
+    modules: Dict[str, str] = {}
+    imports: Dict[str, List[RawImport]] = {}
+    errors = []
+    for path, raw_imports, error in analyze_files_cached(paths, jobs, cache, analyze=extract_file_imports):
+        relative_path = relative(path)
+        name = module_name(relative_path)
+        modules[name] = relative_path
+        if error is not None:
+            errors.append((relative_path, error))
+        else:
+            imports[name] = raw_imports
+    graph = ImportGraph(modules, imports)
+    if fingerprint:
+        cache.put_by_hash(fingerprint, {"graph": graph.to_dict(), "errors": errors})
+    return graph, errors
+
+
+def graph_fingerprint(files: Iterable[Tuple[str, Optional[str]]]) -> Optional[str]:
+    """
+    Hash do conjunto de arquivos (caminho relativo, hash do conteúdo), em
+    qualquer ordem; None se algum arquivo não pôde ser lido.
+    """
+    digest = hashlib.sha256(b"import-graph")
+    for path, content_hash in sorted(files):
+        if content_hash is None:
+            return None
+        digest.update(f"\0{path}\0{content_hash}".encode("utf-8", "surrogateescape"))
+    return f"graph:{digest.hexdigest()}"
+
+
+def relative_to_root(root: str, path: str) -> str:
+    """Caminho de `path` relativo à raiz analisada, no formato usado pelo grafo."""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(root)).replace(os.sep, "/")
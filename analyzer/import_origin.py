@@ -0,0 +1,93 @@
+import os
+import sys
+from typing import FrozenSet, Iterable
+
+# Módulos de primeiro nível da biblioteca padrão, para interpretadores sem
+# `sys.stdlib_module_names` (anteriores ao Python 3.10)
+_FALLBACK_STDLIB = frozenset({
+    '__future__', '_thread',
+    'abc', 'aifc', 'antigravity', 'argparse', 'array', 'ast', 'asynchat', 'asyncio',
+    'asyncore', 'atexit', 'audioop', 'base64', 'bdb', 'binascii', 'binhex', 'bisect',
+    'builtins', 'bz2', 'cProfile', 'calendar', 'cgi', 'cgitb', 'chunk', 'cmath', 'cmd',
+    'code', 'codecs', 'codeop', 'collections', 'colorsys', 'compileall', 'concurrent',
+    'configparser', 'contextlib', 'contextvars', 'copy', 'copyreg', 'crypt', 'csv',
+    'ctypes', 'curses', 'dataclasses', 'datetime', 'dbm', 'decimal', 'difflib', 'dis',
+    'distutils', 'doctest', 'dummy_threading', 'email', 'encodings', 'ensurepip',
+    'enum', 'errno', 'faulthandler', 'fcntl', 'filecmp', 'fileinput', 'fnmatch',
+    'formatter', 'fractions', 'ftplib', 'functools', 'gc', 'genericpath', 'getopt',
+    'getpass', 'gettext', 'glob', 'graphlib', 'grp', 'gzip', 'hashlib', 'heapq', 'hmac',
+    'html', 'http', 'idlelib', 'imaplib', 'imghdr', 'imp', 'importlib', 'inspect', 'io',
+    'ipaddress', 'itertools', 'json', 'keyword', 'lib2to3', 'linecache', 'locale',
+    'logging', 'lzma', 'macpath', 'mailbox', 'mailcap', 'marshal', 'math', 'mimetypes',
+    'mmap', 'modulefinder', 'msilib', 'msvcrt', 'multiprocessing', 'netrc', 'nis',
+    'nntplib', 'nt', 'ntpath', 'nturl2path', 'numbers', 'opcode', 'operator',
+    'optparse', 'os', 'ossaudiodev', 'parser', 'pathlib', 'pdb', 'pickle',
+    'pickletools', 'pipes', 'pkgutil', 'platform', 'plistlib', 'poplib', 'posix',
+    'posixpath', 'pprint', 'profile', 'pstats', 'pty', 'pwd', 'py_compile', 'pyclbr',
+    'pydoc', 'pydoc_data', 'pyexpat', 'queue', 'quopri', 'random', 're', 'readline',
+    'reprlib', 'resource', 'rlcompleter', 'runpy', 'sched', 'secrets', 'select',
+    'selectors', 'shelve', 'shlex', 'shutil', 'signal', 'site', 'smtpd', 'smtplib',
+    'sndhdr', 'socket', 'socketserver', 'spwd', 'sqlite3', 'sre_compile',
+    'sre_constants', 'sre_parse', 'ssl', 'stat', 'statistics', 'string', 'stringprep',
+    'struct', 'subprocess', 'sunau', 'symbol', 'symtable', 'sys', 'sysconfig', 'syslog',
+    'tabnanny', 'tarfile', 'telnetlib', 'tempfile', 'termios', 'textwrap', 'this',
+    'threading', 'time', 'timeit', 'tkinter', 'token', 'tokenize', 'tomllib', 'trace',
+    'traceback', 'tracemalloc', 'tty', 'turtle', 'turtledemo', 'types', 'typing',
+    'unicodedata', 'unittest', 'urllib', 'uu', 'uuid', 'venv', 'warnings', 'wave',
+    'weakref', 'webbrowser', 'winreg', 'winsound', 'wsgiref', 'xdrlib', 'xml', 'xmlrpc',
+    'zipapp', 'zipfile', 'zipimport', 'zlib', 'zoneinfo',
+})
+
+# Biblioteca padrão do interpretador em execução, calculada uma única vez
+STANDARD_LIBS: FrozenSet[str] = frozenset(
+    getattr(sys, 'stdlib_module_names', _FALLBACK_STDLIB)
+) | frozenset(sys.builtin_module_names)
+
+
+def is_standard_lib(name):
+    """Indica se o pacote de primeiro nível pertence à biblioteca padrão."""
+    return name in STANDARD_LIBS
+
+
+def first_party_modules(root):
+    """
+    Módulos e pacotes de primeiro nível do próprio projeto, com uma única
+    varredura da raiz (e de `src/`, no layout src): arquivos `.py` e
+    diretórios com `__init__.py`.
+
+    Se a raiz for um arquivo ou um pacote, a varredura sobe até o primeiro
+    diretório que não é pacote, de onde os imports absolutos partem.
+    """
+    root = os.path.abspath(root)
+    if os.path.isfile(root):
+        root = os.path.dirname(root)
+    while os.path.isfile(os.path.join(root, "__init__.py")) and os.path.dirname(root) != root:
+        root = os.path.dirname(root)
+    names = set()
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_file() and entry.name.endswith(".py"):
+                names.add(entry.name[:-3])
+            elif entry.is_dir():
+                if entry.name == "src" and directory == root:
+                    pending.append(entry.path)
+                elif os.path.isfile(os.path.join(entry.path, "__init__.py")):
+                    names.add(entry.name)
+    names.discard("__init__")
+    return frozenset(names)
+
+
+def count_external_imports(imports: Iterable[str], counter, first_party: FrozenSet[str] = frozenset()):
+    """
+    Adiciona ao contador os nomes de pacotes que não pertencem à biblioteca
+    padrão nem ao próprio projeto.
+    """
+    for name in imports:
+        if name not in STANDARD_LIBS and name not in first_party:
+            counter[name] += 1
@@ -0,0 +1,218 @@
+import os
+import sys
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+from analyzer.defaults import DEFAULT_MAX_MEMORY_MB
+from analyzer.lexical import BLANK, CODE, COMMENT, StreamingLexicalScan
+from analyzer.metrics_engine import indentation_from_distribution
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MB = 1024 * 1024
+
+# Memória da análise completa (texto, linhas, tokens e AST) por byte do
+# arquivo: um arquivo de 6 MB chega a ~750 MB no Python 3.11
+AST_MEMORY_FACTOR = 128
+
+# Maior pedaço de linha lido de cada vez (linhas maiores chegam em vários pedaços)
+READ_CHUNK = 1 << 20
+
+# Tamanho (em linhas normalizadas) das janelas comparadas na busca de duplicatas
+DUPLICATE_WINDOW = 6
+MAX_DUPLICATE_EXAMPLES = 10
+
+# Fração do orçamento reservada ao índice de janelas e custo aproximado de cada entrada
+_DUPLICATE_BUDGET_SHARE = 4
+_DUPLICATE_ENTRY_BYTES = 120
+
+# Métricas que dependem da AST e não são calculadas no modo streaming
+SKIPPED_METRICS = [
+    "docstrings", "classes", "functions", "methods", "external_dependencies",
+    "comment_ratio_units", "complexity_analysis", "dead_code",
+]
+
+
+def large_file_threshold(large_file_mb: Optional[float] = None,
+                         max_memory_mb: int = DEFAULT_MAX_MEMORY_MB) -> int:
+    """
+    Tamanho, em bytes, a partir do qual um arquivo é analisado em streaming.
+
+    Sem um limite explícito, é o maior arquivo cuja análise completa cabe no
+    orçamento de memória.
+    """
+    if large_file_mb is not None:
+        return int(large_file_mb * MB)
+    return max_memory_mb * MB // AST_MEMORY_FACTOR
+
+
+def is_large_file(path: str, threshold: int) -> bool:
+    try:
+        return os.path.getsize(path) >= threshold
+    except OSError:
+        return False
+
+
+def iter_line_pieces(path: str, chunk: int = READ_CHUNK) -> Iterator[str]:
+    """Lê o arquivo linha a linha, em pedaços de no máximo `chunk` caracteres."""
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            piece = f.readline(chunk)
+            if not piece:
+                return
+            yield piece
+
+
+class DuplicateWindows:
+    """
+    Janelas de linhas repetidas, detectadas em uma única passada.
+
+    Cada linha normalizada (sem espaços à direita, ignorando linhas em branco e
+    só de comentário) vira um hash; cada janela de `window` linhas consecutivas
+    é procurada em um índice com a última ocorrência de cada janela. Janelas
+    repetidas na mesma diagonal são unidas em um bloco. O texto não é guardado:
+    a comparação é pelo hash de 64 bits. O índice tem no máximo `max_entries`
+    janelas; depois disso só as janelas já vistas são reconhecidas e o
+    resultado é marcado como truncado.
+    """
+
+    def __init__(self, window: int = DUPLICATE_WINDOW, max_entries: int = 1 << 20):
+        self.window = window
+        self.max_entries = max_entries
+        self.truncated = False
+        self.blocks = 0
+        self.duplicated_lines = 0
+        self.examples: List[Dict[str, int]] = []
+        self._index: Dict[int, int] = {}  # hash da janela -> (posição << 32) | linha inicial
+        self._values: deque = deque(maxlen=window)
+        self._lines: deque = deque(maxlen=window)
+        self._position = 0
+        self._run: Optional[List[int]] = None  # [linha, primeira linha, posição anterior, comprimento]
+
+    def add(self, line_number: int, value: int):
+        """Acrescenta a próxima linha normalizada (número original e hash do texto)."""
+        self._values.append(value)
+        self._lines.append(line_number)
+        position = self._position
+        self._position += 1
+        if len(self._values) < self.window:
+            return
+
+        key = hash(tuple(self._values))
+        start = self._lines[0]
+        previous = self._index.get(key)
+        if previous is not None or len(self._index) < self.max_entries:
+            self._index[key] = (position << 32) | start
+        else:
+            self.truncated = True
+
+        run = self._run
+        if previous is None:
+            self._close_run()
+            return
+        previous_position = previous >> 32
+        if run is not None and previous_position == run[2] + 1:
+            run[2] = previous_position
+            run[3] += 1
+        else:
+            self._close_run()
+            self._run = [start, previous & 0xFFFFFFFF, previous_position, self.window]
+
+    def _close_run(self):
+        run = self._run
+        if run is None:
+            return
+        self._run = None
+        self.blocks += 1
+        self.duplicated_lines += run[3]
+        if len(self.examples) < MAX_DUPLICATE_EXAMPLES:
+            self.examples.append({"line": run[0], "first_line": run[1], "length": run[3]})
+
+    def result(self) -> Dict[str, Any]:
+        self._close_run()
+        return {
+            "window_lines": self.window,
+            "duplicated_blocks": self.blocks,
+            "duplicated_lines": self.duplicated_lines,
+            "examples": self.examples,
+            "truncated": self.truncated,
+        }
+
+
+def stream_file_metrics(path: str, max_memory_mb: int = DEFAULT_MAX_MEMORY_MB,
+                        duplicates: bool = True) -> Dict[str, Any]:
+    """
+    Métricas orientadas a linhas de um arquivo grande, com memória limitada.
+
+    O arquivo é lido em pedaços de linha (nunca inteiro); linhas, comentários,
+    indentação e duplicatas são calculados na mesma passada. O resultado dos
+    comentários e da indentação é idêntico ao da análise completa.
+    """
+    scan = StreamingLexicalScan()
+    windows = None
+    if duplicates:
+        max_entries = max_memory_mb * MB // _DUPLICATE_BUDGET_SHARE // _DUPLICATE_ENTRY_BYTES
+        windows = DuplicateWindows(max_entries=max_entries)
+
+    line_number = 1
+    value = None  # hash das partes anteriores de uma linha longa
+    for piece in iter_line_pieces(path):
+        kind = scan.feed(piece)
+        if windows is not None:
+            value = hash(piece.rstrip()) if value is None else hash((value, piece.rstrip()))
+        if kind is None:
+            continue
+        if windows is not None and kind & CODE:
+            windows.add(line_number, value)
+        value = None
+        line_number += 1
+    kind = scan.finish()
+    if windows is not None and kind is not None and kind & CODE:
+        windows.add(line_number, value)
+
+    counts = scan.kind_counts
+    metrics = {
+        "lines": scan.line_count,
+        "comments": scan.comment_count,
+        "code_lines": counts[CODE] + counts[CODE | COMMENT],
+        "comment_lines": counts[COMMENT],
+        "blank_lines": counts[BLANK],
+        "indentation": indentation_from_distribution(scan.indent_counts),
+    }
+    if windows is not None:
+        metrics["duplicates"] = windows.result()
+    return metrics
+
+
+def large_file_marker(path: str, skipped: List[str]) -> Dict[str, Any]:
+    """Marcador incluído na saída dos arquivos analisados em streaming."""
+    return {
+        "size_mb": round(os.path.getsize(path) / MB, 1),
+        "mode": "streaming",
+        "skipped_metrics": skipped,
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    Pico de memória residente (MB) deste processo e dos processos de trabalho
+    já encerrados; None onde o módulo resource não existe.
+    """
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return round(peak / (MB if sys.platform == "darwin" else 1024), 1)
+
+
+def resource_report(max_memory_mb: int, threshold: int) -> Dict[str, Any]:
+    """Bloco `resources` da saída: pico de memória, limite e limiar de arquivo grande."""
+    return {
+        "peak_rss_mb": peak_rss_mb(),
+        "max_memory_mb": max_memory_mb,
+        "large_file_mb": round(threshold / MB, 1),
+    }
@@ -0,0 +1,235 @@
+import re
+import tokenize
+from array import array
+from collections import Counter
+from itertools import accumulate, compress
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Classificação de cada linha (bits combináveis): em branco, código, comentário
+BLANK = 0
+CODE = 1
+COMMENT = 2
+
+# Só comentários e strings importam para classificar as linhas: o restante do
+# código é pulado pelo próprio motor de expressões regulares. As strings seguem
+# a gramática do tokenize (aspas simples, duplas, triplas e escapes); uma
+# string sem fechamento termina no fim da linha (ou do arquivo, se tripla).
+# O tokenize puro em Python custa mais que o próprio ast.parse; esta expressão
+# acha os mesmos comentários (conferido nos testes) e também aceita texto que
+# o tokenize rejeita, então não precisa de um caminho alternativo.
+_LEXICAL_PATTERN = re.compile(r"""
+    (?P<comment>\#[^\r\n]*)
+  | '''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*(?:'''|\Z)
+  | \"\"\"[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*(?:\"\"\"|\Z)
+  | '[^'\\\n]*(?:\\.[^'\\\n]*)*(?:'|$)
+  | "[^"\\\n]*(?:\\.[^"\\\n]*)*(?:"|$)
+""", re.VERBOSE | re.DOTALL | re.MULTILINE)
+
+# Continuação de uma string aberta em um pedaço (ou linha) anterior
+_STRING_TAILS = {
+    "'''": re.compile(r"[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*(?:'''|\Z)", re.DOTALL),
+    '"""': re.compile(r'[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*(?:"""|\Z)', re.DOTALL),
+    "'": re.compile(r"[^'\\\n]*(?:\\.[^'\\\n]*)*(?:'|$)", re.DOTALL | re.MULTILINE),
+    '"': re.compile(r'[^"\\\n]*(?:\\.[^"\\\n]*)*(?:"|$)', re.DOTALL | re.MULTILINE),
+}
+
+# Escapes e delimitadores não podem ser partidos entre dois pedaços
+_SPLIT_SENSITIVE = "\\'\""
+
+# Tabelas para bytearray.translate: 1 onde o bit está ligado, 0 caso contrário
+_NONBLANK_TABLE = bytes(1 if kind else 0 for kind in range(256))
+_COMMENT_TABLE = bytes(1 if kind & COMMENT else 0 for kind in range(256))
+
+
+def _scan_comments(code: str) -> Iterator[Tuple[int, int, str]]:
+    """Produz (linha, coluna, texto) de cada comentário, ignorando `#` dentro de strings."""
+    row, position, line_start = 1, 0, 0
+    for match in _LEXICAL_PATTERN.finditer(code):
+        if match.lastgroup != 'comment':
+            continue
+        start = match.start()
+        newlines = code.count('\n', position, start)
+        if newlines:
+            row += newlines
+            line_start = code.rfind('\n', position, start) + 1
+        position = start
+        yield row, start - line_start, match.group()
+
+
+def _token_comments(tokens: Iterable[tokenize.TokenInfo]) -> Iterator[Tuple[int, int, str]]:
+    for toktype, tokstring, (row, col), _, _ in tokens:
+        if toktype == tokenize.COMMENT:
+            yield row, col, tokstring
+
+
+class LexicalScan:
+    """
+    Varredura léxica de um código em uma única passada.
+
+    Guarda, em arrays compactos indexados pela linha (a partir de 0), a
+    classificação de cada linha (bits CODE e COMMENT; BLANK quando vazia) e
+    sua indentação, além do texto de cada comentário. Um `#` dentro de uma
+    string não é comentário. Com `tokens` (já produzidos pelo tokenize), os
+    comentários são lidos deles em vez de varrer o texto.
+    """
+
+    def __init__(self, code: str, tokens: Optional[Iterable[tokenize.TokenInfo]] = None):
+        lines = code.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        count = len(lines)
+        self.kinds = bytearray(count)
+        self.indents = array('I', bytes(count * array('I').itemsize))
+        self.comment_text: Dict[int, str] = {}
+
+        kinds, indents = self.kinds, self.indents
+        for index, line in enumerate(lines):
+            if line.strip():
+                kinds[index] = CODE
+                spaces = len(line) - len(line.lstrip(' '))
+                indents[index] = spaces if spaces else (len(line) - len(line.lstrip('\t'))) * 4  # 1 tab = 4 espaços
+
+        comments = _scan_comments(code) if tokens is None else _token_comments(tokens)
+        for row, col, text in comments:
+            line = lines[row - 1]
+            kinds[row - 1] = COMMENT if not line[:col].strip() else CODE | COMMENT
+            self.comment_text[row] = text.strip()
+
+    @property
+    def line_count(self) -> int:
+        return len(self.kinds)
+
+    @property
+    def comment_count(self) -> int:
+        """Linhas com comentário (sozinho ou depois de código)."""
+        return len(self.comment_text)
+
+    def count(self, kind: int) -> int:
+        """Quantas linhas têm exatamente a classificação informada."""
+        return self.kinds.count(kind)
+
+    def indent_levels(self) -> List[int]:
+        """Indentação de cada linha que não está em branco."""
+        return list(compress(self.indents, self.kinds))
+
+    def nonblank_prefix(self) -> List[int]:
+        """prefix[i]: linhas não vazias entre 1 e i (o intervalo [a, b] é prefix[b] - prefix[a - 1])."""
+        return [0, *accumulate(self.kinds.translate(_NONBLANK_TABLE))]
+
+    def comment_prefix(self) -> List[int]:
+        """prefix[i]: linhas com comentário entre 1 e i."""
+        return [0, *accumulate(self.kinds.translate(_COMMENT_TABLE))]
+
+
+class StreamingLexicalScan:
+    """
+    A mesma classificação da LexicalScan, alimentada aos pedaços.
+
+    Guarda só contadores (linhas por classificação e distribuição da
+    indentação) e o estado léxico entre os pedaços, então a memória não
+    depende do tamanho do arquivo. Uma linha pode chegar em vários pedaços:
+    um pedaço que não termina em quebra de linha continua a mesma linha.
+    """
+
+    def __init__(self):
+        self.kind_counts = [0, 0, 0, 0]
+        self.indent_counts: Counter = Counter()
+        self._quote: Optional[str] = None  # delimitador da string aberta
+        self._carry = ""
+        self._start_line()
+
+    def _start_line(self):
+        self._started = False
+        self._nonblank = False
+        self._code_before_comment = False
+        self._comment = False
+        self._head = ""  # espaços e tabs do início da linha, que podem chegar em vários pedaços
+        self._head_done = False
+
+    @property
+    def line_count(self) -> int:
+        return sum(self.kind_counts)
+
+    @property
+    def comment_count(self) -> int:
+        return self.kind_counts[COMMENT] + self.kind_counts[CODE | COMMENT]
+
+    def feed(self, piece: str) -> Optional[int]:
+        """
+        Processa um pedaço de linha. Retorna a classificação da linha quando o
+        pedaço a completa (termina em quebra de linha) e None caso contrário.
+        """
+        if self._carry:
+            piece, self._carry = self._carry + piece, ""
+        if piece.endswith("\n"):
+            self._scan(piece)
+            return self._end_line()
+        kept = len(piece) - len(piece.rstrip(_SPLIT_SENSITIVE))
+        if kept:
+            piece, self._carry = piece[:-kept], piece[-kept:]
+        if piece:
+            self._scan(piece)
+        return None
+
+    def finish(self) -> Optional[int]:
+        """Fim do texto: fecha a última linha, quando ela não termina em quebra de linha."""
+        if self._carry:
+            piece, self._carry = self._carry, ""
+            self._scan(piece)
+        return self._end_line() if self._started else None
+
+    def _scan(self, piece: str):
+        self._started = True
+        if not self._head_done:
+            rest = piece.lstrip(' \t')
+            self._head += piece[:len(piece) - len(rest)]
+            self._head_done = bool(rest)
+        had_text = self._nonblank
+        self._nonblank = had_text or bool(piece.strip())
+        if self._comment:
+            return  # o restante da linha é comentário
+
+        position = 0
+        if self._quote is not None:
+            match = _STRING_TAILS[self._quote].match(piece)
+            if match is None:
+                return  # só um escape no fim do texto
+            position = match.end()
+            if not self._closes(match.group(), self._quote, 0, position, piece):
+                return
+            self._quote = None
+
+        for match in _LEXICAL_PATTERN.finditer(piece, position):
+            if match.lastgroup == 'comment':
+                self._comment = True
+                self._code_before_comment = had_text or bool(piece[:match.start()].strip())
+                return
+            text = match.group()
+            quote = text[:3] if text[:3] in ("'''", '"""') else text[0]
+            if not self._closes(text, quote, len(quote), match.end(), piece):
+                self._quote = quote
+                return
+
+    @staticmethod
+    def _closes(text: str, quote: str, opening: int, end: int, piece: str) -> bool:
+        """Indica se a string termina neste pedaço (strings simples também terminam no fim da linha)."""
+        if len(text) >= opening + len(quote) and text.endswith(quote):
+            return True
+        if end < len(piece):
+            return True  # string simples sem fechamento: termina no fim da linha
+        return len(quote) == 1 and piece.endswith("\n") and not text.endswith("\\\n")
+
+    def _end_line(self) -> int:
+        if not self._nonblank:
+            kind = BLANK
+        elif self._comment:
+            kind = CODE | COMMENT if self._code_before_comment else COMMENT
+        else:
+            kind = CODE
+        self.kind_counts[kind] += 1
+        if kind != BLANK:
+            head = self._head
+            spaces = len(head) - len(head.lstrip(' '))
+            self.indent_counts[spaces if spaces else (len(head) - len(head.lstrip('\t'))) * 4] += 1
+        self._start_line()
+        return kind
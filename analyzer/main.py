@@ -1,33 +1,20 @@
 import typer
 import os
-from analyzer.analyze_lines import analyze_lines, count_lines
-from analyzer.analyze_comments import analyze_comments, count_comments
-from analyzer.analyze_docstrings import analyze_docstrings, count_docstrings
-from analyzer.analyze_classes import analyze_classes, count_classes
-from analyzer.analyze_functions import analyze_functions, count_functions
-from analyzer.analyze_function_size import analyze_function_size, calculate_function_sizes
-from analyzer.analyze_indentation import analyze_indentation, count_indentation
-from analyzer.analyze_duplicate_code import analyze_duplicate_code, find_duplicate_blocks
-##from analyzer.analyze_bugs_ai import analyze_bugs_ai, analyze_bugs_ai_simple
-from analyzer.dependency_analyzer import get_external_imports, analyze_repository
-
-from analyzer.analyze_comment_ratio import ProporcaoComentarioCodigo
-from analyzer.analyze_methods import analyze_methods, count_methods
-
-from pathlib import Path
-import subprocess
-
-
-from rich.console import Console
-from rich.panel import Panel
-from rich.table import Table
-from rich.markdown import Markdown
-
-from analyzer.output_formatter import format_output
-import json
-from datetime import datetime
-from analyzer.analyze_complexity import analyze_complexity, analyze_complexity_code
-from analyzer.analyze_dead_code import analyze_dead_code, analyze_dead_code_cli
+import sys
+from typing import List
+
+from analyzer import __version__, profiling
+from analyzer.defaults import (
+    BENCHMARKS, DEFAULT_AI_CONCURRENCY, DEFAULT_AI_MAX_RETRIES, DEFAULT_AI_REQUESTS_PER_MINUTE,
+    DEFAULT_AI_TOKENS_PER_MINUTE, DEFAULT_CACHE_DIR, DEFAULT_DAEMON_ENTRIES, DEFAULT_DIRECTORY_METRICS, DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_MAX_MEMORY_MB, DEFAULT_MAX_SIZE_MB, DEFAULT_MIN_NODES, DEFAULT_REPEAT, DEFAULT_THRESHOLD, default_jobs
+)
+
+# Os analisadores, o rich e as demais dependências são importados dentro de
+# cada comando, que carrega só o que usa: a CLI é executada muitas vezes por
+# minuto pela integração com editores, e `analyzer lines arquivo.py` não deve
+# pagar pelo rich, pelo sqlite3 ou pelos processos de trabalho.
+# O tempo de partida é medido por benchmarks/bench_startup.py.
 
 app = typer.Typer(
     help="Ferramenta CLI para análise de código Python.",
@@ -35,20 +22,25 @@ app = typer.Typer(
     invoke_without_command=True
 )
 
-console = Console()
 
 # Callback para --version ou exibição personalizada de ajuda
 @app.callback()
 def main(
     ctx: typer.Context,
     version: bool = typer.Option(False, "--version", "-v", help="Mostra a versão e sai."),
-    help_: bool = typer.Option(False, "--help", is_eager=True, help="Mostra esta mensagem e sai.")
+    help_: bool = typer.Option(False, "--help", is_eager=True, help="Mostra esta mensagem e sai."),
+    profile: bool = typer.Option(False, "--profile", help="Mede o tempo de parede e de CPU de cada etapa da análise, por arquivo e no total."),
+    profile_output: str = typer.Option(None, "--profile-output", help="Grava as estatísticas do cProfile de toda a execução (formato pstats; implica --profile)."),
+    no_daemon: bool = typer.Option(False, "--no-daemon", help="Analisa no próprio processo, mesmo com o daemon (analyzer serve) rodando.")
 ):
     if version:
-        typer.secho("📦 Analyzer CLI - Versão 1.0.0", fg=typer.colors.GREEN, bold=True)
+        typer.secho(f"📦 Analyzer CLI - Versão {__version__}", fg=typer.colors.GREEN, bold=True)
         raise typer.Exit()
 
     if help_:
+        from rich.console import Console
+        from rich.markdown import Markdown
+
         console = Console()
         help_text = """
 # 🧠 Analyzer CLI
@@ -58,24 +50,41 @@ Ferramenta CLI para análise de código Python.
 ## 📦 Comandos principais
 - `all`                → Analisa todas as métricas de um arquivo
 - `all-dir`            → Analisa todas as métricas de arquivos Python em um diretório
+- `watch`              → Observa um diretório e reanalisa os arquivos alterados (NDJSON)
+- `history`            → Totais do all-dir em cada commit de um intervalo do git (`--rev-range`)
 - `lines`              → Conta o número total de linhas no código
 - `comments`           → Conta o número de comentários no código
 - `docstrings`         → Conta o número de docstrings no código
 - `classes`            → Conta o número de classes no código
 - `functions`          → Conta o número de funções no código
 - `function-size`      → Analisa o tamanho médio das funções no código
-- `duplicate-code`     → Identifica blocos de código duplicados
+- `duplicate-code`     → Identifica blocos de código duplicados (`--dir` entre arquivos, `--ast` por estrutura)
 - `methods`            → Analisa os métodos públicos e privados no código
 - `indent`             → Analisa os níveis de indentação
-- `dependencies`       → Analisa as dependências externas do código
+- `dependencies`       → Analisa as dependências externas do código (`--graph`, `--impact` para o grafo de imports)
 - `comment-ratio`      → Calcula o percentual de comentários por unidade de código
+- `serve`              → Inicia o daemon que mantém as análises em memória (`status` mostra o cache)
 - `bugs-ai`            → Analisa código usando IA para identificar bugs e problemas
 - `bugs-ai-simple`     → Versão simplificada da análise de bugs com IA
 
 ## 🔍 Opções de formato
 Os comandos `all` e `all-dir` aceitam as seguintes opções:
-- `--format` ou `-f`   → Formato de saída (cli ou json)
-- `--output` ou `-o`   → Arquivo de saída para formato json
+- `--format` ou `-f`   → Formato de saída (cli, json, msgpack ou ndjson no `all-dir`)
+- `--output` ou `-o`   → Arquivo de saída para formatos json/ndjson/msgpack (`.gz` comprime com gzip)
+- `--compact`          → JSON compacto, sem indentação
+- `--metrics` ou `-m`  → Métricas a calcular (ex.: `lines,functions,complexity`)
+- `--changed-since`/`--staged` → Só os arquivos alterados segundo o git no `all-dir`
+- `--jobs` ou `-j`     → Processos paralelos no `all-dir` (padrão: número de CPUs)
+- `--include`/`--exclude` → Globs de arquivos a incluir/ignorar no `all-dir` (respeita o .gitignore)
+- `--no-cache`/`--rebuild-cache` → Ignora ou recria o cache de resultados do `all-dir`
+
+## ⏱️ Perfil
+- `--profile`          → Tempo de parede e de CPU de cada etapa, por arquivo e no total (antes do comando)
+- `--profile-output`   → Grava as estatísticas do cProfile de toda a execução (formato pstats)
+
+## ⚡ Daemon
+- `analyzer serve &`   → Com o daemon rodando, `all`, `lines`, `classes` e os demais comandos de contagem usam o cache dele
+- `--no-daemon`        → Analisa no próprio processo, mesmo com o daemon rodando (antes do comando)
 
 ## 🤖 Comandos de IA
 Os comandos `bugs-ai` e `bugs-ai-simple` requerem uma chave de API da OpenAI:
@@ -120,12 +129,97 @@ analyzer bugs-ai examples/sample.py --api-key sua_chave_aqui
         typer.secho("⚠️ Nenhum comando fornecido. Use '--help' para ver os comandos disponíveis.", fg=typer.colors.YELLOW)
         raise typer.Exit(code=1)
 
+    if no_daemon:
+        from analyzer import daemon_client
+        daemon_client.disable_client()
+        ctx.call_on_close(daemon_client.enable_client)
+
+    if profile or profile_output:
+        profiling.enable(with_cprofile=profile_output is not None)
+        ctx.call_on_close(lambda: finish_profile(profile_output))
+
+
+def finish_profile(profile_output):
+    """
+    Fim de uma execução com --profile: grava o arquivo pstats e, se o perfil
+    não foi incluído na saída JSON do comando, mostra a tabela de tempos.
+    """
+    from rich.console import Console
+
+    err_console = Console(stderr=True)
+    if profile_output:
+        profiling.dump_cprofile(profile_output)
+        err_console.print(f"[dim]📄 Estatísticas do cProfile salvas em: {profile_output} "
+                          f"(python -m pstats {profile_output})[/]")
+    if not profiling.reported():
+        show_profile(profiling.report(), err_console)
+    profiling.disable()
+
+
+def show_profile(report, target, top_files: int = 10):
+    """Tabela de tempos por etapa (ordenada) e os arquivos mais lentos, no console `target`."""
+    from rich.table import Table
+
+    table = Table(title="⏱️  Perfil da Execução", title_style="bold cyan",
+                  caption=f"Tempo total: {report['total_wall_s']:.3f} s")
+    table.add_column("Etapa", style="bold yellow")
+    table.add_column("Parede (s)", justify="right", style="bold green")
+    table.add_column("CPU (s)", justify="right")
+    table.add_column("Chamadas", justify="right")
+    table.add_column("% do medido", justify="right")
+    for entry in report["stages"]:
+        table.add_row(entry["stage"], f"{entry['wall_s']:.4f}", f"{entry['cpu_s']:.4f}",
+                      str(entry["calls"]), f"{entry['share_pct']}%")
+    target.print(table)
+
+    if report["files"]:
+        files_table = Table(title="🐢 Arquivos Mais Lentos", title_style="bold magenta")
+        files_table.add_column("Arquivo", style="bold yellow")
+        files_table.add_column("Total (s)", justify="right", style="bold green")
+        files_table.add_column("Etapa principal", style="cyan")
+        for path, times in list(report["files"].items())[:top_files]:
+            stage, wall = next(((name, wall) for name, wall in times.items() if name != "total_s"), ("-", 0.0))
+            files_table.add_row(path, f"{times['total_s']:.4f}", f"{stage} ({wall:.4f} s)")
+        target.print(files_table)
+
+
+def parse_metrics(metrics: str, default=None):
+    """Métricas do registro pedidas em `--metrics`; encerra o comando se algum nome for desconhecido."""
+    from analyzer.metric_registry import select_metrics
+
+    try:
+        return select_metrics(metrics, default)
+    except ValueError as e:
+        typer.secho(f"❌ {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+
+def check_output_format(format: str, output: str):
+    """Interrompe o comando se o formato binário (msgpack) for pedido sem arquivo de saída."""
+    if format.lower() == "msgpack" and not output:
+        typer.secho("❌ O formato msgpack é binário: informe o arquivo com --output", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
 
 @app.command("all-dir", help="Analisa todas as métricas dos arquivos Python em um diretório.")
 def analyze_all_dir(
     directory: str = typer.Argument(..., help="Caminho para o diretório com arquivos Python."),
-    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli ou json)"),
-    output: str = typer.Option(None, "--output", "-o", help="Arquivo de saída (opcional, apenas para formato json)")
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli, json, msgpack ou ndjson)"),
+    output: str = typer.Option(None, "--output", "-o", help="Arquivo de saída (opcional para json e ndjson, obrigatório para msgpack; .gz comprime com gzip)"),
+    compact: bool = typer.Option(False, "--compact", help="JSON compacto, sem indentação"),
+    metrics: str = typer.Option(None, "--metrics", "-m", help=f"Métricas a calcular, separadas por vírgula (padrão: {','.join(DEFAULT_DIRECTORY_METRICS)})"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Número de processos paralelos (padrão: número de CPUs)"),
+    include: List[str] = typer.Option(None, "--include", help="Glob de arquivos a analisar (pode repetir; padrão: *.py)"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar (pode repetir)"),
+    changed_since: str = typer.Option(None, "--changed-since", help="Analisa só os arquivos alterados desde esta referência do git (branch, tag ou commit)"),
+    staged: bool = typer.Option(False, "--staged", help="Analisa só os arquivos com alterações no índice do git (git add)"),
+    merge_cached: bool = typer.Option(False, "--merge-cached", help="Com --changed-since/--staged, soma aos totais os resultados em cache dos demais arquivos"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Não usar o cache de resultados por arquivo"),
+    rebuild_cache: bool = typer.Option(False, "--rebuild-cache", help="Descarta o cache e analisa todos os arquivos novamente"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Diretório do cache de resultados"),
+    cache_size: int = typer.Option(DEFAULT_MAX_SIZE_MB, "--cache-size", help="Tamanho máximo do cache em MB"),
+    large_file_mb: float = typer.Option(None, "--large-file-mb", help="Arquivos a partir deste tamanho (MB) são analisados em streaming (padrão: derivado de --max-memory-mb)"),
+    max_memory_mb: int = typer.Option(DEFAULT_MAX_MEMORY_MB, "--max-memory-mb", help="Limite de memória por processo (MB)")
 ):
     """
     Analisa todas as métricas dos arquivos Python em um diretório.
@@ -133,29 +227,79 @@ def analyze_all_dir(
     Opções de formato:
     - cli: Exibe resultado formatado no terminal (padrão)
     - json: Gera saída em formato JSON
+    - msgpack: Mesmos dados do json no formato binário MessagePack (exige `--output`)
+    - ndjson: Uma linha JSON por arquivo, emitida assim que o arquivo termina,
+      e uma linha final com o resumo (memória constante, ordem de conclusão)
+
+    Em relatórios grandes, `--compact` gera JSON sem indentação (menor e mais
+    rápido de gravar) e um `--output` terminado em `.gz` é comprimido com gzip.
+
+    `--metrics` escolhe as métricas do registro (metric_registry) e só as
+    passadas que elas exigem são feitas: `--metrics lines,comments` nem gera
+    a AST. Métricas fora do padrão (indentation, dependencies, comment_ratio,
+    complexity, dead_code) entram no bloco `metrics` de cada arquivo.
+
+    O diretório é percorrido recursivamente, respeitando o .gitignore e as
+    opções `--include`/`--exclude`. Os arquivos são analisados em paralelo por
+    `--jobs` processos; o resultado é idêntico ao da execução serial (`--jobs 1`).
+
+    Resultados por arquivo ficam em um cache SQLite (`--cache-dir`): arquivos
+    inalterados não são analisados novamente. Use `--no-cache` para ignorá-lo e
+    `--rebuild-cache` para recriá-lo.
+
+    Com `--changed-since <ref>` ou `--staged`, só os arquivos alterados segundo
+    um `git diff --name-only` local são analisados (em CI, os arquivos do pull
+    request): `--changed-since` compara com o merge-base de `<ref>` e inclui as
+    alterações ainda não commitadas; `--staged` considera só o índice. O bloco
+    `changes` informa o escopo. Com `--merge-cached`, os resultados em cache
+    dos demais arquivos entram nos totais do `summary`, sem analisá-los; os que
+    não estão no cache ficam de fora e são contados em `uncached_files`.
+
+    Arquivos grandes (gerados, dumps de dados) são lidos em streaming, sem a
+    AST: linhas e comentários são contados com memória limitada, as demais
+    métricas ficam zeradas e o arquivo recebe o marcador `large_file`. O
+    limiar vem de `--large-file-mb` ou, por padrão, de `--max-memory-mb`. O
+    pico de memória é informado no bloco `resources`.
 
     Exemplos:
         analyzer all-dir examples/
         analyzer all-dir examples/ --format json
         analyzer all-dir examples/ --format json --output resultado.json
+        analyzer all-dir . --format json --compact --output resultado.json.gz
+        analyzer all-dir . --format msgpack --output resultado.msgpack
+        analyzer all-dir examples/ --jobs 8
+        analyzer all-dir . --metrics lines,functions,complexity --format json
+        analyzer all-dir examples/ --format ndjson --output resultado.ndjson
+        analyzer all-dir . --exclude "tests/*" --exclude "*_pb2.py"
+        analyzer all-dir . --changed-since origin/main --format json
+        analyzer all-dir . --changed-since origin/main --merge-cached
+        analyzer all-dir . --staged
+        analyzer all-dir . --large-file-mb 20 --max-memory-mb 512
     """
+    from datetime import datetime
+    from functools import partial
+
+    from analyzer.directory_analysis import (
+        METRICS_FORMAT, add_to_summary, analyze_dir_file, analyze_files_cached, cached_results, finalize_summary,
+        new_summary, ordered_results
+    )
+    from analyzer.file_walker import iter_python_files
+    from analyzer.large_files import large_file_threshold
+    from analyzer.output_formatter import NDJSONWriter, format_output
+    from analyzer.result_cache import ResultCache
+
+    check_output_format(format, output)
+    selected = parse_metrics(metrics, DEFAULT_DIRECTORY_METRICS)
+    scoped = bool(changed_since or staged)
+    if merge_cached and (not scoped or no_cache):
+        typer.secho("❌ --merge-cached exige --changed-since ou --staged, com o cache ativo", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
     try:
         # Verifica se o diretório existe
         if not os.path.isdir(directory):
             typer.secho(f"❌ Diretório não encontrado: {directory}", fg=typer.colors.RED, err=True)
             raise typer.Exit(code=1)
 
-        # Lista todos os arquivos .py no diretório
-        python_files = [
-            os.path.join(directory, f) 
-            for f in os.listdir(directory) 
-            if f.endswith('.py')
-        ]
-
-        if not python_files:
-            typer.secho(f"⚠️ Nenhum arquivo Python encontrado em: {directory}", fg=typer.colors.YELLOW)
-            raise typer.Exit(code=1)
-
         # Coleta métricas de todos os arquivos
         all_metrics = {
             "directory_analyzed": directory,
@@ -163,326 +307,672 @@ def analyze_all_dir(
             "files": {}
         }
 
-        total_metrics = {
-            "total_files": len(python_files),
-            "total_lines": 0,
-            "total_comments": 0,
-            "total_docstrings": 0,
-            "total_classes": 0,
-            "total_functions": 0,
-            "total_methods": {
-                "public": 0,
-                "private": 0,
-                "total": 0
-            }
-        }
-
-        # Analisa cada arquivo
-        for file_path in python_files:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    code = f.read()
-
-                file_metrics = {
-                    "metrics": {
-                        "lines": count_lines(code),
-                        "comments": count_comments(code),
-                        "docstrings": count_docstrings(code),
-                        "classes": count_classes(code),
-                        "functions": count_functions(code)
-                    },
-                    "methods": {
-                        "public": 0,
-                        "private": 0,
-                        "total": 0,
-                        "ratio": {}
-                    }
-                }
-
-                # Análise de métodos
-                public_methods, private_methods = count_methods(code)
-                total_methods = public_methods + private_methods
-                
-                file_metrics["methods"].update({
-                    "public": public_methods,
-                    "private": private_methods,
-                    "total": total_methods
-                })
-
-                if total_methods > 0:
-                    file_metrics["methods"]["ratio"] = {
-                        "public": round((public_methods / total_methods) * 100, 1),
-                        "private": round((private_methods / total_methods) * 100, 1)
+        # Com --changed-since/--staged, só os arquivos alterados segundo o git
+        changes = None
+        if scoped:
+            from analyzer.git_changes import changed_python_files
+
+            changed = changed_python_files(directory, changed_since, staged, include, exclude)
+            changes = {"since": changed_since, "staged": staged, "changed_files": len(changed)}
+
+        # Percorre o diretório sob demanda: a análise começa antes do fim da varredura
+        python_files = []
+
+        def walk():
+            for file_path in (changed if scoped else iter_python_files(directory, include, exclude)):
+                python_files.append(file_path)
+                yield file_path
+
+        def merge_cached_results():
+            """Resultados em cache dos arquivos não alterados (--merge-cached)."""
+            if not merge_cached:
+                return []
+            rest, missing = cached_results(iter_python_files(directory, include, exclude), cache, python_files)
+            changes["merged_files"] = len(rest)
+            changes["uncached_files"] = missing
+            return rest
+
+        threshold = large_file_threshold(large_file_mb, max_memory_mb)
+        metric_names = [metric.name for metric in selected]
+        # Módulos do projeto, descobertos uma vez para todos os arquivos (dependencies)
+        first_party = None
+        if any(metric.uses_first_party for metric in selected):
+            from analyzer.import_origin import first_party_modules
+
+            first_party = first_party_modules(directory)
+        analyze = partial(analyze_dir_file, large_file_bytes=threshold, metrics=metric_names, first_party=first_party)
+
+        cache = None
+        if not no_cache:
+            options = {"format": METRICS_FORMAT, "large_file_bytes": threshold, "metrics": metric_names}
+            if first_party is not None:
+                # O mesmo conteúdo muda de resultado se os módulos do projeto mudam
+                options["first_party"] = sorted(first_party)
+            cache = ResultCache(cache_dir, max_size_mb=cache_size, options=options)
+            if rebuild_cache:
+                cache.clear()
+
+        prefix = os.path.join(directory, "")
+
+        def relative(file_path):
+            return file_path[len(prefix):].replace(os.sep, "/")
+
+        # Analisa cada arquivo (em paralelo quando jobs > 1)
+        jobs = jobs or default_jobs()
+        try:
+            results = analyze_files_cached(walk(), jobs, cache, analyze=analyze)
+            if format.lower() == "ndjson":
+                # Streaming: cada arquivo é escrito assim que termina, sem acumular resultados
+                total_metrics = new_summary(0, selected)
+                with NDJSONWriter(output) as writer:
+                    for file_path, file_metrics, error in results:
+                        if error is not None:
+                            writer.write({"type": "error", "file": relative(file_path), "error": error})
+                            continue
+                        add_to_summary(total_metrics, file_metrics, metrics=selected)
+                        writer.write({"type": "file", "file": relative(file_path), **file_metrics})
+
+                    if not python_files and not scoped:
+                        typer.secho(f"⚠️ Nenhum arquivo Python encontrado em: {directory}", fg=typer.colors.YELLOW, err=True)
+                        raise typer.Exit(code=1)
+
+                    rest = merge_cached_results()
+                    for file_metrics in rest:
+                        add_to_summary(total_metrics, file_metrics, metrics=selected)
+                    total_metrics["total_files"] = len(python_files) + len(rest)
+                    finalize_summary(total_metrics, selected)
+                    summary_record = {
+                        "type": "summary",
+                        "directory_analyzed": directory,
+                        "analysis_timestamp": all_metrics["analysis_timestamp"],
+                        "summary": total_metrics
                     }
+                    if changes is not None:
+                        summary_record["changes"] = changes
+                    if cache is not None:
+                        summary_record["cache"] = cache.stats()
+                    summary_record["resources"] = check_resources(max_memory_mb, threshold)
+                    if profiling.enabled():
+                        summary_record["profile"] = profiling.report()
+                    writer.write(summary_record)
+                if output:
+                    typer.echo(f"✅ Resultados salvos em: {output}")
+                return
+            results = list(results)
+            rest = merge_cached_results()
+        finally:
+            if cache is not None:
+                cache.close()
+
+        if not python_files and not scoped:
+            typer.secho(f"⚠️ Nenhum arquivo Python encontrado em: {directory}", fg=typer.colors.YELLOW)
+            raise typer.Exit(code=1)
 
-                # Atualiza totais
-                total_metrics["total_lines"] += file_metrics["metrics"]["lines"]
-                total_metrics["total_comments"] += file_metrics["metrics"]["comments"]
-                total_metrics["total_docstrings"] += file_metrics["metrics"]["docstrings"]
-                total_metrics["total_classes"] += file_metrics["metrics"]["classes"]
-                total_metrics["total_functions"] += file_metrics["metrics"]["functions"]
-                total_metrics["total_methods"]["public"] += public_methods
-                total_metrics["total_methods"]["private"] += private_methods
-                total_metrics["total_methods"]["total"] += total_methods
-
-                # Adiciona métricas do arquivo ao resultado
-                all_metrics["files"][os.path.basename(file_path)] = file_metrics
-
-            except Exception as e:
-                typer.secho(f"⚠️ Erro ao analisar {file_path}: {str(e)}", fg=typer.colors.YELLOW)
+        total_metrics = new_summary(len(python_files) + len(rest), selected)
+        for file_metrics in rest:
+            add_to_summary(total_metrics, file_metrics, metrics=selected)
+        large_files = []
+        for file_path, file_metrics, error in ordered_results(python_files, results):
+            if error is not None:
+                typer.secho(f"⚠️ Erro ao analisar {file_path}: {error}", fg=typer.colors.YELLOW)
                 continue
 
-        # Adiciona totais ao resultado
-        all_metrics["summary"] = total_metrics
+            # Atualiza totais
+            add_to_summary(total_metrics, file_metrics, metrics=selected)
 
-        # Calcula proporção total de métodos
-        if total_metrics["total_methods"]["total"] > 0:
-            all_metrics["summary"]["methods_ratio"] = {
-                "public": round((total_metrics["total_methods"]["public"] / total_metrics["total_methods"]["total"]) * 100, 1),
-                "private": round((total_metrics["total_methods"]["private"] / total_metrics["total_methods"]["total"]) * 100, 1)
-            }
+            # Adiciona métricas do arquivo ao resultado
+            all_metrics["files"][relative(file_path)] = file_metrics
+            if "large_file" in file_metrics:
+                large_files.append(relative(file_path))
+
+        # Adiciona totais ao resultado e calcula proporção total de métodos
+        finalize_summary(total_metrics, selected)
+        all_metrics["summary"] = total_metrics
+        if changes is not None:
+            all_metrics["changes"] = changes
+        if large_files:
+            all_metrics["large_files"] = large_files
+        if cache is not None:
+            all_metrics["cache"] = cache.stats()
+        all_metrics["resources"] = check_resources(max_memory_mb, threshold)
 
         # Formatação e saída
-        if format.lower() == "json":
-            result = format_output(all_metrics, "json", output)
+        if format.lower() in ("json", "msgpack"):
+            if profiling.enabled():
+                all_metrics["profile"] = profiling.report()
+            result = format_output(all_metrics, format, output, compact=compact)
             typer.echo(result)
             return
 
         # Exibição CLI padrão
-        console.print("\n📊 Análise do Diretório:", directory)
+        with profiling.stage("render"):
+            from rich.console import Console
+            from rich.table import Table
+
+            console = Console()
+            console.print("\n📊 Análise do Diretório:", directory)
         
-        # Tabela de resumo
-        summary_table = Table(title="📈 Resumo Geral", title_style="bold cyan")
-        summary_table.add_column("Métrica", style="bold yellow")
-        summary_table.add_column("Valor", justify="right", style="bold green")
-
-        summary_table.add_row("Total de Arquivos", str(total_metrics["total_files"]))
-        summary_table.add_row("Total de Linhas", str(total_metrics["total_lines"]))
-        summary_table.add_row("Total de Comentários", str(total_metrics["total_comments"]))
-        summary_table.add_row("Total de Docstrings", str(total_metrics["total_docstrings"]))
-        summary_table.add_row("Total de Classes", str(total_metrics["total_classes"]))
-        summary_table.add_row("Total de Funções", str(total_metrics["total_functions"]))
-        summary_table.add_row("Total de Métodos Públicos", str(total_metrics["total_methods"]["public"]))
-        summary_table.add_row("Total de Métodos Privados", str(total_metrics["total_methods"]["private"]))
-        summary_table.add_row("Total de Métodos", str(total_metrics["total_methods"]["total"]))
-
-        if "methods_ratio" in all_metrics["summary"]:
-            summary_table.add_row(
-                "Proporção Total Público/Privado",
-                f"{all_metrics['summary']['methods_ratio']['public']}% / {all_metrics['summary']['methods_ratio']['private']}%"
-            )
-
-        console.print(summary_table)
-
-        # Tabela detalhada por arquivo
-        details_table = Table(title="\n📁 Detalhes por Arquivo", title_style="bold cyan")
-        details_table.add_column("Arquivo", style="bold yellow")
-        details_table.add_column("Linhas", justify="right")
-        details_table.add_column("Comentários", justify="right")
-        details_table.add_column("Classes", justify="right")
-        details_table.add_column("Funções", justify="right")
-        details_table.add_column("Métodos (Pub/Priv)", justify="right")
-
-        for filename, metrics in all_metrics["files"].items():
-            details_table.add_row(
-                filename,
-                str(metrics["metrics"]["lines"]),
-                str(metrics["metrics"]["comments"]),
-                str(metrics["metrics"]["classes"]),
-                str(metrics["metrics"]["functions"]),
-                f"{metrics['methods']['public']}/{metrics['methods']['private']}"
-            )
-
-        console.print(details_table)
+            # Tabela de resumo
+            summary_table = Table(title="📈 Resumo Geral", title_style="bold cyan")
+            summary_table.add_column("Métrica", style="bold yellow")
+            summary_table.add_column("Valor", justify="right", style="bold green")
+
+            summary_table.add_row("Total de Arquivos", str(total_metrics["total_files"]))
+            for metric in selected:
+                for label, value in metric.summary_rows(total_metrics):
+                    summary_table.add_row(label, value)
+
+            console.print(summary_table)
+            if changes is not None:
+                scope = f"alterados desde {changed_since}" if changed_since else "alterados"
+                if staged:
+                    scope += " no índice (--staged)"
+                console.print(f"[cyan]🔀 {changes['changed_files']} arquivo(s) {scope}[/]")
+                if merge_cached:
+                    console.print(f"[cyan]   Totais com {changes['merged_files']} arquivo(s) do cache "
+                                  f"({changes['uncached_files']} fora do cache)[/]")
+            if cache is not None:
+                console.print(f"[dim]Cache: {cache.hits} acertos, {cache.misses} falhas[/]")
+            if large_files:
+                console.print(f"[yellow]📦 {len(large_files)} arquivo(s) grande(s) analisado(s) em streaming, sem métricas da AST: {', '.join(large_files)}[/]")
+            console.print(f"[dim]Pico de memória: {all_metrics['resources']['peak_rss_mb']} MB (limite: {max_memory_mb} MB)[/]")
+
+            # Tabela detalhada por arquivo
+            details_table = Table(title="\n📁 Detalhes por Arquivo", title_style="bold cyan")
+            details_table.add_column("Arquivo", style="bold yellow")
+            columns = [metric for metric in selected if metric.column]
+            for metric in columns:
+                details_table.add_column(metric.column, justify="right")
+
+            for filename, file_metrics in all_metrics["files"].items():
+                details_table.add_row(filename, *(metric.cell(file_metrics) for metric in columns))
+
+            console.print(details_table)
 
     except Exception as e:
         typer.secho(f"❌ Erro durante a análise: {str(e)}", fg=typer.colors.RED, err=True)
         raise typer.Exit(code=1)
 
 
+def check_resources(max_memory_mb: int, threshold: int):
+    """Bloco `resources` da saída, com um aviso se o pico de memória passou do limite."""
+    from analyzer.large_files import resource_report
+
+    resources = resource_report(max_memory_mb, threshold)
+    peak = resources["peak_rss_mb"]
+    if peak is not None and peak > max_memory_mb:
+        typer.secho(f"⚠️ Pico de memória de {peak} MB acima do limite de {max_memory_mb} MB. "
+                    f"Reduza --large-file-mb ou --jobs.", fg=typer.colors.YELLOW, err=True)
+    return resources
+
+
 @app.command("all", help="Analisa todas as métricas do código (linhas, comentários, docstrings, classes, funções, métodos, indentação, dependências externas e proporção de comentários por unidade de código).")
 def analyze_all(
     file: str = typer.Argument(..., help="Caminho para o arquivo Python a ser analisado."),
-    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli ou json)"),
-    output: str = typer.Option(None, "--output", "-o", help="Arquivo de saída (opcional, apenas para formato json)")
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli, json ou msgpack)"),
+    output: str = typer.Option(None, "--output", "-o", help="Arquivo de saída (opcional para json, obrigatório para msgpack; .gz comprime com gzip)"),
+    compact: bool = typer.Option(False, "--compact", help="JSON compacto, sem indentação"),
+    metrics: str = typer.Option(None, "--metrics", "-m", help="Métricas a calcular, separadas por vírgula (padrão: todas)"),
+    large_file_mb: float = typer.Option(None, "--large-file-mb", help="A partir deste tamanho (MB) o arquivo é analisado em streaming (padrão: derivado de --max-memory-mb)"),
+    max_memory_mb: int = typer.Option(DEFAULT_MAX_MEMORY_MB, "--max-memory-mb", help="Limite de memória da análise (MB)")
 ):
     """
     Analisa todas as métricas de um arquivo Python, incluindo indentação, dependências externas e proporção de comentários por unidade.
+
+    `--metrics` restringe a análise a algumas métricas do registro
+    (metric_registry), por exemplo `--metrics lines,functions,complexity`;
+    só as passadas que elas exigem são feitas.
+
+    Arquivos grandes são lidos em streaming: só as métricas de linhas
+    (linhas, comentários, indentação e duplicatas) são calculadas, e a saída
+    indica as métricas da AST que foram puladas.
     """
-    try:
-        with open(file, "r", encoding="utf-8") as f:
-            code = f.read()
-    except FileNotFoundError:
-        typer.secho(f"❌ Arquivo não encontrado: {file}", fg=typer.colors.RED, err=True)
-        raise typer.Exit(code=1)
-    except Exception as e:
-        typer.secho(f"❌ Erro ao ler o arquivo: {str(e)}", fg=typer.colors.RED, err=True)
-        raise typer.Exit(code=1)
+    from analyzer import daemon_client
+    from analyzer.large_files import is_large_file, large_file_threshold
+
+    check_output_format(format, output)
+    selected = parse_metrics(metrics)
+    threshold = large_file_threshold(large_file_mb, max_memory_mb)
+    if is_large_file(file, threshold):
+        show_large_file(file, format, output, max_memory_mb, threshold, compact)
+        return
 
-    # Métricas de código
-    line_count = count_lines(code)
-    comment_count = count_comments(code)
-    docstring_count = count_docstrings(code)
-    class_count = count_classes(code)
-    function_count = count_functions(code)
-    indent_result = count_indentation(file)
-    public_methods, private_methods = count_methods(code)
-    total_methods = public_methods + private_methods
-
-    # Dependências externas com contagem
-    from collections import defaultdict
-    import_counter = defaultdict(int)
-    get_external_imports(file, import_counter)
-
-    # Proporção comentário/código
-    proporcao = ProporcaoComentarioCodigo(file)
-    resultados = proporcao.analisar()
-    if resultados:
-        percentual_medio = round(
-            sum(unidade["percentual"] for unidade in resultados) / len(resultados),
-            2
-        )
+    # Com o daemon (analyzer serve) rodando, o relatório vem do cache dele
+    report = daemon_client.fetch_report(file)
+    if report is not None:
+        report = {key: report[key] for metric in selected for key in metric.keys}
     else:
-        percentual_medio = 0.0
-
-    # Análise de complexidade
-    complexity_results = analyze_complexity_code(code)
+        from analyzer.file_report import file_report
 
-    # Análise de código morto
-    dead_code_result = analyze_dead_code(code)
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                code = f.read()
+        except FileNotFoundError:
+            typer.secho(f"❌ Arquivo não encontrado: {file}", fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+        except Exception as e:
+            typer.secho(f"❌ Erro ao ler o arquivo: {str(e)}", fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+        report = file_report(file, code, [metric.name for metric in selected])
 
     # Formatação e saída JSON
-    if format.lower() == "json":
-        result_dict = {
-            "file_analyzed": file,
-            "metrics": {
-                "lines": line_count,
-                "comments": comment_count,
-                "docstrings": docstring_count,
-                "classes": class_count,
-                "functions": function_count,
-                "public_methods": public_methods,
-                "private_methods": private_methods,
-                "total_methods": total_methods,
-                "indentation": indent_result,
-                "external_dependencies": dict(import_counter),
-                "comment_ratio_avg": percentual_medio,
-                "comment_ratio_units": resultados,
-                "complexity_analysis": complexity_results,
-                "dead_code": dead_code_result
-            }
-        }
-        result = format_output(result_dict, "json", output)
+    if format.lower() in ("json", "msgpack"):
+        from analyzer.output_formatter import format_output
+
+        result_dict = {"file_analyzed": file, "metrics": report}
+        if profiling.enabled():
+            result_dict["profile"] = profiling.report()
+        result = format_output(result_dict, format, output, compact=compact)
         typer.echo(result)
         return
 
     # Exibição CLI detalhada (tabelas)
+    with profiling.stage("render"):
+        from rich.console import Console
+        from rich.table import Table
+
+        console = Console()
+        table = Table(title=f"📊 Análise do Arquivo: {file}", title_style="bold cyan")
+        table.add_column("Métrica", style="bold yellow")
+        table.add_column("Valor", justify="right", style="bold green")
+
+        for metric in selected:
+            for label, value in metric.rows(report):
+                table.add_row(label, value)
+
+        console.print(table)
+
+        # Detalhes das métricas selecionadas
+        import_counter = report.get("external_dependencies")
+        resultados = report.get("comment_ratio_units")
+        complexity_results = report.get("complexity_analysis")
+        dead_code_result = report.get("dead_code")
+
+        if import_counter is None:
+            pass
+        elif import_counter:
+            dep_table = Table(title="📦 Dependências Externas Detalhadas", title_style="bold magenta")
+            dep_table.add_column("Pacote", style="bold yellow")
+            dep_table.add_column("Ocorrências", justify="right", style="bold green")
+            for lib, count in sorted(import_counter.items(), key=lambda x: (-x[1], x[0])):
+                dep_table.add_row(lib, str(count))
+            console.print(dep_table)
+        else:
+            console.print("[green]Nenhuma dependência externa encontrada.[/]")
+
+        if resultados is None:
+            pass
+        elif resultados:
+            ratio_table = Table(title="📈 Proporção Comentário/Código por Unidade", title_style="bold blue")
+            ratio_table.add_column("Unidade", style="bold yellow")
+            ratio_table.add_column("Linhas", justify="right")
+            ratio_table.add_column("Comentários", justify="right")
+            ratio_table.add_column("Comentado (%)", justify="right")
+            for r in resultados:
+                ratio_table.add_row(r["nome"], str(r["linhas_totais"]), str(r["comentarios"]), f'{r["percentual"]}%')
+            console.print(ratio_table)
+        else:
+            console.print("[yellow]⚠️ Nenhuma função ou classe encontrada para proporção comentário/código.[/]")
+
+        # Tabela de complexidade
+        if complexity_results is None:
+            pass
+        elif complexity_results:
+            complexity_table = Table(title="📈 Complexidade Assintótica das Funções", title_style="bold blue")
+            complexity_table.add_column("Função", style="bold yellow")
+            complexity_table.add_column("Complexidade Estimada", style="bold green")
+            complexity_table.add_column("Ciclomática", style="bold cyan", justify="right")
+            for r in complexity_results:
+                complexity_table.add_row(r["function"], r["complexity"], str(r["cyclomatic"]))
+            console.print(complexity_table)
+        else:
+            console.print("[yellow]⚠️ Nenhuma função encontrada para análise de complexidade.[/]")
+
+        # Tabela de código morto
+        if dead_code_result is None:
+            pass
+        elif dead_code_result["dead_functions"] or dead_code_result["dead_classes"]:
+            dead_table = Table(title="🪦 Código Morto (Não Utilizado)", title_style="bold red")
+            dead_table.add_column("Tipo", style="bold yellow")
+            dead_table.add_column("Nome", style="bold white")
+            for func in dead_code_result["dead_functions"]:
+                dead_table.add_row("Função", func)
+            for cls in dead_code_result["dead_classes"]:
+                dead_table.add_row("Classe", cls)
+            console.print(dead_table)
+        else:
+            console.print("[green]Nenhuma função ou classe morta encontrada.[/]")
+
+
+def show_large_file(file: str, format: str, output: str, max_memory_mb: int, threshold: int, compact: bool = False):
+    """Saída do comando all para um arquivo grande, analisado em streaming."""
+    from analyzer.large_files import SKIPPED_METRICS, large_file_marker, stream_file_metrics
+    from analyzer.output_formatter import format_output
+
+    try:
+        metrics = stream_file_metrics(file, max_memory_mb)
+    except Exception as e:
+        typer.secho(f"❌ Erro ao ler o arquivo: {str(e)}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    result_dict = {
+        "file_analyzed": file,
+        "metrics": metrics,
+        "large_file": large_file_marker(file, SKIPPED_METRICS),
+        "resources": check_resources(max_memory_mb, threshold)
+    }
+    if format.lower() in ("json", "msgpack"):
+        if profiling.enabled():
+            result_dict["profile"] = profiling.report()
+        typer.echo(format_output(result_dict, format, output, compact=compact))
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
+    indentation = metrics["indentation"]
+    duplicates = metrics["duplicates"]
     table = Table(title=f"📊 Análise do Arquivo: {file}", title_style="bold cyan")
     table.add_column("Métrica", style="bold yellow")
     table.add_column("Valor", justify="right", style="bold green")
+    table.add_row("Total de Linhas", str(metrics["lines"]))
+    table.add_row("Comentários", str(metrics["comments"]))
+    table.add_row("Linhas de Código", str(metrics["code_lines"]))
+    table.add_row("Linhas Só de Comentário", str(metrics["comment_lines"]))
+    table.add_row("Linhas em Branco", str(metrics["blank_lines"]))
+    table.add_row("Indentação Média", str(indentation["average_indent"]))
+    table.add_row("Indentação Máxima", str(indentation["max_indent"]))
+    table.add_row("Indentação Mínima", str(indentation["min_indent"]))
+    table.add_row(f"Blocos Duplicados ({duplicates['window_lines']}+ linhas)", str(duplicates["duplicated_blocks"]))
+    table.add_row("Linhas Duplicadas", str(duplicates["duplicated_lines"]))
+    console.print(table)
 
-    table.add_row("Total de Linhas", str(line_count))
-    table.add_row("Comentários", str(comment_count))
-    table.add_row("Docstrings", str(docstring_count))
-    table.add_row("Classes", str(class_count))
-    table.add_row("Funções", str(function_count))
-    table.add_row("Métodos Públicos", str(public_methods))
-    table.add_row("Métodos Privados", str(private_methods))
-    table.add_row("Total de Métodos", str(total_methods))
-    if total_methods > 0:
-        public_ratio = (public_methods / total_methods) * 100
-        private_ratio = (private_methods / total_methods) * 100
-        table.add_row("Proporção Público/Privado", f"{public_ratio:.1f}% / {private_ratio:.1f}%")
-    table.add_row("Indentação Média", str(indent_result.get("average_indent", "-")))
-    table.add_row("Indentação Máxima", str(indent_result.get("max_indent", "-")))
-    table.add_row("Indentação Mínima", str(indent_result.get("min_indent", "-")))
-    table.add_row("Dependências Externas", str(len(import_counter)))
-    table.add_row("Comentado (%) Médio por Unidade", f"{percentual_medio}%")
+    marker = result_dict["large_file"]
+    console.print(f"[yellow]📦 Arquivo grande ({marker['size_mb']} MB): analisado em streaming, sem as métricas da AST "
+                  f"({', '.join(marker['skipped_metrics'])}).[/]")
+    if duplicates["truncated"]:
+        console.print("[yellow]⚠️ Índice de duplicatas cheio: a contagem de duplicatas é parcial.[/]")
+    console.print(f"[dim]Pico de memória: {result_dict['resources']['peak_rss_mb']} MB (limite: {max_memory_mb} MB)[/]")
+
+
+@app.command("history", help="Métricas do all-dir para cada commit de um intervalo do git, sem checkout.")
+def history(
+    directory: str = typer.Argument(".", help="Diretório dentro do repositório git (a análise fica restrita a ele)."),
+    rev_range: str = typer.Option(..., "--rev-range", "-r", help="Intervalo de commits do git (ex.: v1.0..v2.0 ou main~100..main)"),
+    first_parent: bool = typer.Option(False, "--first-parent", help="Segue só o primeiro pai dos merges (um ponto por merge na branch principal)"),
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli, json, msgpack ou ndjson)"),
+    output: str = typer.Option(None, "--output", "-o", help="Arquivo de saída (opcional para json e ndjson, obrigatório para msgpack; .gz comprime com gzip)"),
+    compact: bool = typer.Option(False, "--compact", help="JSON compacto, sem indentação"),
+    metrics: str = typer.Option(None, "--metrics", "-m", help=f"Métricas a somar, separadas por vírgula (padrão: {','.join(DEFAULT_DIRECTORY_METRICS)})"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Número de processos paralelos (padrão: número de CPUs)"),
+    include: List[str] = typer.Option(None, "--include", help="Glob de arquivos a analisar (pode repetir; padrão: *.py)"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar (pode repetir)"),
+    large_file_mb: float = typer.Option(None, "--large-file-mb", help="Arquivos a partir deste tamanho (MB) são analisados em streaming (padrão: derivado de --max-memory-mb)"),
+    max_memory_mb: int = typer.Option(DEFAULT_MAX_MEMORY_MB, "--max-memory-mb", help="Limite de memória por processo (MB)")
+):
+    """
+    Calcula o `summary` do all-dir em cada commit de `--rev-range`, para
+    gráficos de tendência entre versões.
 
-    console.print(table)
+    Nada é extraído para o disco: árvores e conteúdos são lidos por um
+    `git cat-file --batch` persistente. Cada conteúdo distinto de arquivo
+    (sha do blob) é analisado uma única vez no histórico inteiro, em paralelo
+    por `--jobs` processos, e subárvores que não mudaram entre commits são
+    somadas uma única vez; o custo cresce com o que mudou, não com o número
+    de commits vezes o tamanho do repositório.
 
-    if import_counter:
-        dep_table = Table(title="📦 Dependências Externas Detalhadas", title_style="bold magenta")
-        dep_table.add_column("Pacote", style="bold yellow")
-        dep_table.add_column("Ocorrências", justify="right", style="bold green")
-        for lib, count in sorted(import_counter.items(), key=lambda x: (-x[1], x[0])):
-            dep_table.add_row(lib, str(count))
-        console.print(dep_table)
-    else:
-        console.print("[green]Nenhuma dependência externa encontrada.[/]")
+    Os totais de cada commit são os do all-dir sobre o checkout daquele
+    commit, considerando os arquivos versionados (o .gitignore não se aplica).
+    Só entram métricas com total no summary; `dependencies` fica de fora.
 
-    if resultados:
-        ratio_table = Table(title="📈 Proporção Comentário/Código por Unidade", title_style="bold blue")
-        ratio_table.add_column("Unidade", style="bold yellow")
-        ratio_table.add_column("Linhas", justify="right")
-        ratio_table.add_column("Comentários", justify="right")
-        ratio_table.add_column("Comentado (%)", justify="right")
-        for r in resultados:
-            ratio_table.add_row(r["nome"], str(r["linhas_totais"]), str(r["comentarios"]), f'{r["percentual"]}%')
-        console.print(ratio_table)
-    else:
-        console.print("[yellow]⚠️ Nenhuma função ou classe encontrada para proporção comentário/código.[/]")
-
-    # Tabela de complexidade
-    if complexity_results:
-        complexity_table = Table(title="📈 Complexidade Assintótica das Funções", title_style="bold blue")
-        complexity_table.add_column("Função", style="bold yellow")
-        complexity_table.add_column("Complexidade Estimada", style="bold green")
-        for r in complexity_results:
-            complexity_table.add_row(r["function"], r["complexity"])
-        console.print(complexity_table)
-    else:
-        console.print("[yellow]⚠️ Nenhuma função encontrada para análise de complexidade.[/]")
-
-    # Tabela de código morto
-    if dead_code_result["dead_functions"] or dead_code_result["dead_classes"]:
-        dead_table = Table(title="🪦 Código Morto (Não Utilizado)", title_style="bold red")
-        dead_table.add_column("Tipo", style="bold yellow")
-        dead_table.add_column("Nome", style="bold white")
-        for func in dead_code_result["dead_functions"]:
-            dead_table.add_row("Função", func)
-        for cls in dead_code_result["dead_classes"]:
-            dead_table.add_row("Classe", cls)
-        console.print(dead_table)
-    else:
-        console.print("[green]Nenhuma função ou classe morta encontrada.[/]")
+    Opções de formato:
+    - cli: Tabela com uma linha por commit (padrão)
+    - json: Gera saída em formato JSON, com a lista `commits`
+    - msgpack: Mesmos dados do json no formato binário MessagePack (exige `--output`)
+    - ndjson: Uma linha JSON por commit e uma linha final com o resumo do histórico
+
+    Exemplos:
+        analyzer history --rev-range v1.0..v2.0
+        analyzer history . --rev-range main~500..main --first-parent --format json --output historico.json
+        analyzer history src/ --rev-range v1.0..HEAD --metrics lines,functions --format ndjson
+    """
+    from datetime import datetime
+    from functools import partial
+
+    from analyzer.directory_analysis import analyze_files
+    from analyzer.history import HistoryScan, analyze_blob, close_cat_files, list_commits, unsupported_metrics
+    from analyzer.large_files import large_file_threshold
+    from analyzer.output_formatter import NDJSONWriter, format_output
+
+    check_output_format(format, output)
+    selected = parse_metrics(metrics, DEFAULT_DIRECTORY_METRICS)
+    unsupported = unsupported_metrics(selected)
+    if unsupported:
+        typer.secho(f"❌ Métricas sem total por commit no history: {', '.join(unsupported)}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    if not os.path.isdir(directory):
+        typer.secho(f"❌ Diretório não encontrado: {directory}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    try:
+        commits = list_commits(directory, rev_range, first_parent)
+        scan = HistoryScan(directory, include, exclude)
+        try:
+            # 1. Árvores de todos os commits: descobre os conteúdos distintos
+            with profiling.stage("trees"):
+                trees = [scan.add_commit(commit["commit"]) for commit in commits]
+
+            # 2. Cada blob distinto é analisado uma única vez, em paralelo
+            threshold = large_file_threshold(large_file_mb, max_memory_mb)
+            analyze = partial(analyze_blob, repo=scan.repo, large_file_bytes=threshold,
+                              metrics=[metric.name for metric in selected])
+            results = {}
+            for sha, file_metrics, error in analyze_files(list(scan.blobs), jobs or default_jobs(), analyze):
+                if error is not None and format.lower() == "cli":
+                    typer.secho(f"⚠️ Erro ao analisar {scan.blobs[sha]} ({sha[:10]}): {error}",
+                                fg=typer.colors.YELLOW, err=True)
+                results[sha] = (sha, file_metrics, error)
+
+            # 3. Totais de cada commit, somando as subárvores já calculadas
+            with profiling.stage("summaries"):
+                for commit, tree in zip(commits, trees):
+                    commit["summary"], commit["failed_files"] = scan.summary(tree, results, selected)
+        finally:
+            scan.close()
+            close_cat_files()
+
+        history_metrics = {
+            "repository": scan.repo,
+            "directory_analyzed": directory,
+            "rev_range": rev_range,
+            "analysis_timestamp": datetime.now().isoformat(),
+            "commits": commits,
+            "blobs": {
+                "distinct": len(scan.blobs),
+                "failed": sum(1 for _, file_metrics, _ in results.values() if file_metrics is None),
+                "file_versions": scan.file_versions
+            },
+            "resources": check_resources(max_memory_mb, threshold)
+        }
+        if profiling.enabled():
+            history_metrics["profile"] = profiling.report()
+
+        if format.lower() == "ndjson":
+            with NDJSONWriter(output) as writer:
+                for commit in commits:
+                    writer.write({"type": "commit", **commit})
+                writer.write({"type": "history", **{key: value for key, value in history_metrics.items() if key != "commits"},
+                              "commits": len(commits)})
+            if output:
+                typer.echo(f"✅ Resultados salvos em: {output}")
+            return
+        if format.lower() in ("json", "msgpack"):
+            typer.echo(format_output(history_metrics, format, output, compact=compact))
+            return
+
+        with profiling.stage("render"):
+            from rich.console import Console
+            from rich.table import Table
+
+            console = Console()
+            table = Table(title=f"📈 Histórico: {rev_range}", title_style="bold cyan")
+            table.add_column("Commit", style="bold yellow")
+            table.add_column("Data")
+            table.add_column("Arquivos", justify="right")
+            for metric in selected:
+                table.add_column(metric.column or metric.label or metric.name, justify="right")
+            for commit in commits:
+                table.add_row(commit["commit"][:10], commit["date"][:10], str(commit["summary"]["total_files"]),
+                              *(metric.summary_cell(commit["summary"]) for metric in selected))
+            console.print(table)
+            blobs = history_metrics["blobs"]
+            console.print(f"[dim]{len(commits)} commit(s), {blobs['file_versions']} versões de arquivo, "
+                          f"{blobs['distinct']} conteúdo(s) distinto(s) analisado(s)[/]")
+
+    except Exception as e:
+        typer.secho(f"❌ Erro durante a análise: {str(e)}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+
+@app.command("watch", help="Observa um diretório e reanalisa apenas os arquivos alterados (eventos NDJSON).")
+def watch(
+    directory: str = typer.Argument(..., help="Caminho para o diretório com arquivos Python."),
+    include: List[str] = typer.Option(None, "--include", help="Glob de arquivos a analisar (pode repetir; padrão: *.py)"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar (pode repetir)"),
+    debounce: int = typer.Option(30, "--debounce", help="Janela em ms para agrupar alterações seguidas"),
+    poll: bool = typer.Option(False, "--poll", help="Força a observação por varredura periódica (sem inotify)"),
+    interval: float = typer.Option(0.5, "--interval", help="Intervalo em segundos entre varreduras no modo --poll"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Processos paralelos na análise inicial (padrão: número de CPUs)")
+):
+    """
+    Observa um diretório e, a cada alteração salva, reanalisa somente os arquivos
+    modificados. Os totais são atualizados subtraindo a contribuição antiga do
+    arquivo e somando a nova. Cada atualização é emitida como uma linha JSON
+    (NDJSON) na saída padrão.
+
+    Exemplos:
+        analyzer watch .
+        analyzer watch src/ --exclude "tests/*" --debounce 50
+    """
+    import json
+    from analyzer.watcher import watch_directory
+
+    if not os.path.isdir(directory):
+        typer.secho(f"❌ Diretório não encontrado: {directory}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    def emit(event):
+        typer.echo(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+        sys.stdout.flush()
+
+    try:
+        watch_directory(directory, emit, include, exclude, debounce=debounce / 1000,
+                        poll_interval=interval, force_polling=poll, jobs=jobs or default_jobs())
+    except KeyboardInterrupt:
+        pass
+
+
+def daemon_metrics(file: str, *keys: str):
+    """
+    Métrica (ou tupla de métricas) do arquivo vinda do daemon (analyzer serve),
+    ou None para o comando calcular no próprio processo.
+    """
+    from analyzer import daemon_client
+
+    report = daemon_client.fetch_report(file)
+    if report is None:
+        return None
+    values = tuple(report[key] for key in keys)
+    return values[0] if len(keys) == 1 else values
 
 
 # Comandos individuais
 @app.command("lines", help="Conta o número total de linhas no código.")
 def lines(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_lines(file)
+    from analyzer.analyze_lines import analyze_lines
+    analyze_lines(file, daemon_metrics(file, "lines"))
 
 @app.command("comments", help="Conta o número de comentários no código.")
 def comments(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_comments(file)
+    from analyzer.analyze_comments import analyze_comments
+    analyze_comments(file, daemon_metrics(file, "comments"))
 
 @app.command("docstrings", help="Conta a quantidade de docstrings no código.")
 def docstrings(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_docstrings(file)
+    from analyzer.analyze_docstrings import analyze_docstrings
+    analyze_docstrings(file, daemon_metrics(file, "docstrings"))
 
 @app.command("classes", help="Conta o número de classes no código.")
 def classes(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_classes(file)
+    from analyzer.analyze_classes import analyze_classes
+    analyze_classes(file, daemon_metrics(file, "classes"))
 
 @app.command("functions", help="Conta o número de funções no código.")
 def functions(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_functions(file)
+    from analyzer.analyze_functions import analyze_functions
+    analyze_functions(file, daemon_metrics(file, "functions"))
 
 @app.command("indent", help="Analisa os níveis de indentação do código.")
 def indent(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_indentation(file)
+    from analyzer.analyze_indentation import analyze_indentation
+    analyze_indentation(file, daemon_metrics(file, "indentation"))
+
+@app.command("dependencies", help="Analisa as dependências externas e o grafo de imports do código.")
+def dependencies(
+    path: str = typer.Argument(..., help="Caminho para o arquivo ou diretório Python."),
+    impact: List[str] = typer.Option(None, "--impact", help="Arquivo alterado: lista os módulos afetados (pode repetir)"),
+    graph: bool = typer.Option(False, "--graph", "-g", help="Mostra o grafo de imports: fan-in, fan-out e ciclos"),
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli ou json)"),
+    jobs: int = typer.Option(default_jobs(), "--jobs", "-j", help="Número de processos paralelos"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar (pode repetir)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Não usar os imports guardados em cache"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Diretório do cache de imports")
+):
+    """
+    Analisa as dependências do código.
+
+    Sem opções, conta os pacotes externos importados (que não são da
+    biblioteca padrão nem do próprio projeto), por arquivo e no total. Com
+    --graph ou --impact, resolve todos os imports (inclusive relativos) para
+    módulos do próprio repositório, biblioteca padrão ou terceiros e monta o
+    grafo de imports.
+    Com --impact, responde quais módulos são afetados pela mudança de um
+    arquivo (ele próprio e todos os que dependem dele, direta ou
+    indiretamente), útil para escolher os testes a rodar no CI.
+
+    Exemplos:
+        analyzer dependencies .
+        analyzer dependencies . --graph
+        analyzer dependencies . --impact analyzer/metrics_engine.py
+        analyzer dependencies . --impact analyzer/metrics_engine.py --format json
+    """
+    if impact or graph:
+        show_import_graph(path, impact, graph, format, jobs, exclude, not no_cache, cache_dir)
+        return
 
-@app.command("dependencies", help="Analisa as dependências externas do código.")
-def dependencies(path: str = typer.Argument(..., help="Caminho para o arquivo ou diretório Python.")):
     from collections import defaultdict
+    from analyzer.dependency_analyzer import analyze_repository, get_external_imports
+    from analyzer.import_origin import first_party_modules
+    from analyzer.output_formatter import format_output
+
     import_counter = defaultdict(int)
+    per_file = {}
 
     if os.path.isfile(path):
-        get_external_imports(path, import_counter)
+        get_external_imports(path, import_counter, first_party_modules(path))
+        per_file[path] = dict(import_counter)
     else:
-        import_counter = analyze_repository(path)
+        per_file, import_counter = analyze_repository(path, jobs, per_file=True, exclude=exclude)
+
+    if format == "json":
+        typer.echo(format_output({"files": per_file, "total": dict(import_counter)}, "json"))
+        return
 
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console()
     console.print(f"\n[bold magenta]📦 Dependências externas encontradas em '{path}':[/]\n")
     if not import_counter:
         console.print("[green]Nenhuma dependência externa encontrada.[/]")
@@ -491,14 +981,88 @@ def dependencies(path: str = typer.Argument(..., help="Caminho para o arquivo ou
     table = Table(title="Dependências", title_style="bold blue")
     table.add_column("Biblioteca", style="bold yellow")
     table.add_column("Ocorrências", justify="right", style="bold green")
+    table.add_column("Arquivos", justify="right", style="cyan")
 
+    files_using = defaultdict(int)
+    for counts in per_file.values():
+        for lib in counts:
+            files_using[lib] += 1
     for lib, count in sorted(import_counter.items(), key=lambda x: (-x[1], x[0])):
-        table.add_row(lib, str(count))
+        table.add_row(lib, str(count), str(files_using[lib]))
+
+    console.print(table)
+
+def show_import_graph(root, impact, show_graph, format, jobs, exclude, use_cache, cache_dir):
+    """Monta o grafo de imports (com cache) e exibe o impacto de mudanças ou o grafo completo."""
+    from rich.console import Console
+    from rich.table import Table
+    from analyzer.import_graph import IMPORTS_FORMAT, build_import_graph, relative_to_root
+    from analyzer.output_formatter import format_output
+    from analyzer.result_cache import ResultCache
+
+    console = Console()
+    cache = ResultCache(cache_dir, analyzer="imports", options={"format": IMPORTS_FORMAT}) if use_cache else None
+    try:
+        import_graph, errors = build_import_graph(root, jobs, cache, exclude)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    if impact:
+        changed = [relative_to_root(root, p) for p in impact]
+        affected = import_graph.impact(changed)
+        if format == "json":
+            typer.echo(format_output({"changed": changed, "affected": affected}, "json"))
+            return
+        console.print(f"\n[bold magenta]🎯 Módulos afetados pela mudança de {', '.join(changed)}:[/]\n")
+        if not affected:
+            console.print("[yellow]⚠️ Nenhum módulo do repositório corresponde aos arquivos informados.[/]")
+        for affected_path in affected:
+            console.print(f"  {affected_path}")
+        console.print(f"\n[dim]{len(affected)} de {len(import_graph.modules)} módulos afetados[/]")
+        return
 
+    cycles = import_graph.cycles()
+    if format == "json":
+        modules = {
+            name: {
+                "path": module_path,
+                "imports": sorted(import_graph.edges[name]),
+                "fan_in": import_graph.fan_in(name),
+                "fan_out": import_graph.fan_out(name),
+                "stdlib": dict(import_graph.stdlib.get(name, {})),
+                "third_party": dict(import_graph.third_party.get(name, {})),
+            }
+            for name, module_path in sorted(import_graph.modules.items())
+        }
+        result = {"modules": modules, "cycles": cycles, "errors": dict(errors)}
+        typer.echo(format_output(result, "json"))
+        return
+
+    table = Table(title=f"🕸️ Grafo de imports de '{root}'", title_style="bold blue")
+    table.add_column("Módulo", style="bold yellow")
+    table.add_column("Fan-in", justify="right", style="bold green")
+    table.add_column("Fan-out", justify="right", style="bold cyan")
+    for name in sorted(import_graph.modules, key=lambda n: (-import_graph.fan_in(n), n)):
+        table.add_row(name, str(import_graph.fan_in(name)), str(import_graph.fan_out(name)))
     console.print(table)
 
+    if cycles:
+        console.print(f"\n[bold red]🔁 {len(cycles)} ciclo(s) de imports:[/]")
+        for cycle in cycles:
+            console.print("  " + " → ".join(cycle + [cycle[0]]))
+    else:
+        console.print("\n[green]✅ Nenhum ciclo de imports encontrado.[/]")
+    for error_path, error in errors:
+        console.print(f"[red]❌ Erro em {error_path}: {error}[/]")
+
 @app.command("comment-ratio", help="Calcula o percentual de comentários por unidade de código (funções e classes).")
 def comment_ratio(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
+    from rich.console import Console
+    from rich.table import Table
+    from analyzer.analyze_comment_ratio import ProporcaoComentarioCodigo
+
+    console = Console()
     try:
         analisador = ProporcaoComentarioCodigo(file)
         resultados = analisador.analisar()
@@ -523,31 +1087,75 @@ def comment_ratio(file: str = typer.Argument(..., help="Caminho para o arquivo P
 
 @app.command("methods", help="Analisa os métodos públicos e privados no código.")
 def methods(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
-    analyze_methods(file)
+    from analyzer.analyze_methods import analyze_methods
+    analyze_methods(file, daemon_metrics(file, "public_methods", "private_methods"))
 
 @app.command("function-size", help="Analisa o tamanho médio das funções no código.")
 def function_size(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
+    from analyzer.analyze_function_size import analyze_function_size
     analyze_function_size(file)
 
-@app.command("duplicate-code", help="Identifica blocos de código duplicados no arquivo.")
+@app.command("duplicate-code", help="Identifica blocos de código duplicados no arquivo ou entre os arquivos de um diretório.")
 def duplicate_code(
-    file: str = typer.Argument(..., help="Caminho para o arquivo Python."),
+    file: str = typer.Argument(..., help="Caminho para o arquivo Python (ou diretório, com --dir)."),
     block_size: int = typer.Option(None, "--block-size", "-b", help="Tamanho do bloco para análise (padrão: automático)"),
-    auto: bool = typer.Option(True, "--auto", "-a", help="Modo automático: testa múltiplos tamanhos (2-10 linhas)")
+    auto: bool = typer.Option(True, "--auto", "-a", help="Modo automático: detecta clones máximos de qualquer tamanho (mínimo 2 linhas)"),
+    dir: bool = typer.Option(False, "--dir", "-d", help="Procura clones entre os arquivos do diretório informado"),
+    ast_mode: bool = typer.Option(False, "--ast", help="Compara a estrutura da AST, ignorando nomes e constantes"),
+    min_nodes: int = typer.Option(DEFAULT_MIN_NODES, "--min-nodes", help="Tamanho mínimo (em nós da AST) dos clones no modo --ast"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar no modo --dir (pode repetir)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Não usar o índice persistente de impressões digitais"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Diretório do índice de impressões digitais")
 ):
+    """
+    Identifica blocos de código duplicados.
+
+    Com --dir, cada arquivo do diretório é reduzido a impressões digitais
+    (winnowing sobre hashes de tokens normalizados) guardadas em um índice
+    invertido em `--cache-dir`; execuções seguintes só reprocessam os arquivos
+    alterados. O resultado lista as classes de clones com arquivo e linhas.
+
+    Com --ast, funções e instruções com a mesma estrutura são agrupadas mesmo
+    que nomes ou constantes tenham mudado (funciona com arquivo ou --dir).
+
+    Exemplos:
+        analyzer duplicate-code examples/sample.py
+        analyzer duplicate-code src/ --dir
+        analyzer duplicate-code . --dir --exclude "tests/*"
+        analyzer duplicate-code src/ --dir --ast --min-nodes 40
+    """
+    if ast_mode:
+        from analyzer.ast_clones import analyze_ast_duplicates
+        analyze_ast_duplicates(file, dir, exclude, min_nodes)
+        return
+    if dir:
+        from analyzer.clone_index import analyze_cross_file_duplicates
+        analyze_cross_file_duplicates(file, exclude, use_cache=not no_cache, cache_dir=cache_dir)
+        return
     # Se block_size foi especificado, desabilita o modo automático
     if block_size is not None:
         auto = False
+    from analyzer.analyze_duplicate_code import analyze_duplicate_code
     analyze_duplicate_code(file, block_size, auto)
 
 @app.command("bugs-ai", help="Analisa código usando IA para identificar bugs e problemas.")
 def bugs_ai(
-    file: str = typer.Argument(..., help="Caminho para o arquivo Python."),
+    file: str = typer.Argument(None, help="Caminho para o arquivo Python (ou use --dir)."),
+    directory: str = typer.Option(None, "--dir", "-d", help="Analisa todos os arquivos Python do diretório, em paralelo"),
     language: str = typer.Option("python", "--language", "-l", help="Linguagem de programação"),
     api_key: str = typer.Option(None, "--api-key", "-k", help="Chave da API (ou configure OPENAI_API_KEY)"),
+    api_url: str = typer.Option(None, "--api-url", help="URL de chat completions de uma API compatível com a OpenAI (padrão: OpenAI)"),
     simple: bool = typer.Option(False, "--simple", "-s", help="Modo simplificado"),
     no_cache: bool = typer.Option(False, "--no-cache", help="Ignorar cache e fazer nova requisição"),
-    model: str = typer.Option(None, "--model", "-m", help="Modelo a ser usado (gpt-3.5-turbo, gpt-4, etc.)")
+    model: str = typer.Option(None, "--model", "-m", help="Modelo a ser usado (gpt-3.5-turbo, gpt-4, etc.)"),
+    concurrency: int = typer.Option(DEFAULT_AI_CONCURRENCY, "--concurrency", "-c", help="Requisições simultâneas no modo --dir"),
+    requests_per_minute: float = typer.Option(DEFAULT_AI_REQUESTS_PER_MINUTE, "--rpm", help="Limite de requisições por minuto no modo --dir (0 desliga)"),
+    tokens_per_minute: float = typer.Option(DEFAULT_AI_TOKENS_PER_MINUTE, "--tpm", help="Limite de tokens por minuto no modo --dir (0 desliga)"),
+    max_retries: int = typer.Option(DEFAULT_AI_MAX_RETRIES, "--max-retries", help="Novas tentativas em 429/5xx no modo --dir"),
+    include: List[str] = typer.Option(None, "--include", help="Glob de arquivos a analisar no modo --dir (pode repetir; padrão: *.py)"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar no modo --dir (pode repetir)"),
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída no modo --dir (cli, json ou ndjson)"),
+    output: str = typer.Option(None, "--output", "-o", help="Arquivo de saída no modo --dir (json e ndjson; .gz comprime com gzip)")
 ):
     """
     Analisa código usando IA para identificar bugs, problemas de segurança, performance e qualidade.
@@ -559,6 +1167,14 @@ def bugs_ai(
     uma nova análise.
     
     Modelos disponíveis: gpt-3.5-turbo (padrão), gpt-3.5-turbo-16k, gpt-4, gpt-4-turbo
+
+    Com `--dir`, todos os arquivos Python do diretório são analisados com até
+    `--concurrency` requisições em andamento. Os limites da conta por minuto
+    (`--rpm`, `--tpm`) são respeitados por baldes de fichas, e respostas 429 e
+    5xx são repetidas com espera exponencial e jitter (`--max-retries`). Cada
+    arquivo aparece assim que termina; `--format ndjson` emite uma linha por
+    arquivo e uma linha final com o resumo. `--api-url` aponta para qualquer
+    servidor compatível com a API da OpenAI (inclusive um local, para testes).
     
     Exemplos:
         analyzer bugs-ai examples/sample.py
@@ -566,11 +1182,33 @@ def bugs_ai(
         analyzer bugs-ai examples/sample.py --api-key sua_chave_aqui
         analyzer bugs-ai examples/sample.py --no-cache
         analyzer bugs-ai examples/sample.py --model gpt-4
+        analyzer bugs-ai --dir analyzer/ --concurrency 8 --rpm 500 --tpm 90000
+        analyzer bugs-ai --dir . --format ndjson --output bugs.ndjson
+        analyzer bugs-ai --dir . --api-url http://localhost:8000/v1/chat/completions
     """
+    if directory:
+        if format.lower() not in ("cli", "json", "ndjson"):
+            typer.secho(f"❌ Formato inválido no modo --dir: {format}", fg=typer.colors.RED, err=True)
+            raise typer.Exit(code=1)
+
+        from analyzer.analyze_bugs_ai import analyze_bugs_ai_dir
+
+        summary = analyze_bugs_ai_dir(directory, language, api_key, no_cache, model, api_url, concurrency,
+                                      requests_per_minute, tokens_per_minute, max_retries, include, exclude,
+                                      format.lower(), output)
+        if summary is None:
+            raise typer.Exit(code=1)
+        return
+    if not file:
+        typer.secho("❌ Informe o arquivo ou um diretório com --dir", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    from analyzer.analyze_bugs_ai import analyze_bugs_ai, analyze_bugs_ai_simple
+
     if simple:
-        analyze_bugs_ai_simple(file, language, api_key, no_cache, model)
+        analyze_bugs_ai_simple(file, language, api_key, no_cache, model, api_url)
     else:
-        analyze_bugs_ai(file, language, api_key, no_cache, model)
+        analyze_bugs_ai(file, language, api_key, no_cache, model, api_url)
 
 @app.command("bugs-ai-simple", help="Versão simplificada da análise de bugs com IA.")
 def bugs_ai_simple(
@@ -589,6 +1227,7 @@ def bugs_ai_simple(
         analyzer bugs-ai-simple examples/sample.py --no-cache
         analyzer bugs-ai-simple examples/sample.py --model gpt-3.5-turbo
     """
+    from analyzer.analyze_bugs_ai import analyze_bugs_ai_simple
     analyze_bugs_ai_simple(file, language, api_key, no_cache, model)
 
 @app.command("clear-cache", help="Limpa o cache de análises de bugs com IA.")
@@ -612,14 +1251,217 @@ def list_models():
     from analyzer.analyze_bugs_ai import list_models
     list_models()
 
-@app.command("analyze-complexity", help="Analisa a complexidade assintótica das funções do código.")
+@app.command("analyze-complexity", help="Analisa a complexidade assintótica e ciclomática (McCabe) das funções do código.")
 def analyze_complexity_cli(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
+    from analyzer.analyze_complexity import analyze_complexity
     analyze_complexity(file)
 
-@app.command("analyze-dead-code", help="Identifica funções e classes não utilizadas (código morto) no arquivo.")
-def analyze_dead_code_command(file: str = typer.Argument(..., help="Caminho para o arquivo Python.")):
+@app.command("analyze-dead-code", help="Identifica funções e classes não utilizadas (código morto) no arquivo ou repositório.")
+def analyze_dead_code_command(
+    file: str = typer.Argument(..., help="Caminho para o arquivo Python (ou diretório, com --dir)."),
+    dir: bool = typer.Option(False, "--dir", "-d", help="Considera as referências de todos os módulos do diretório"),
+    jobs: int = typer.Option(default_jobs(), "--jobs", "-j", help="Número de processos paralelos no modo --dir"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar no modo --dir (pode repetir)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Não usar o índice de símbolos guardado em cache"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Diretório do cache de símbolos")
+):
+    """
+    Identifica funções, métodos e classes não utilizados.
+
+    Com --dir, os símbolos (definições e referências por nome, atributo, import
+    e `__all__`) de todos os módulos são extraídos em paralelo e guardados em
+    cache; numa nova execução só os arquivos alterados são analisados. Uma
+    definição é considerada morta quando nenhum módulo a referencia. Funções
+    decoradas e testes do pytest são tratados como pontos de entrada.
+
+    Exemplos:
+        analyzer analyze-dead-code examples/sample.py
+        analyzer analyze-dead-code . --dir --exclude "tests/*"
+    """
+    if dir:
+        from analyzer.symbol_index import analyze_repository_dead_code
+        analyze_repository_dead_code(file, jobs, not no_cache, cache_dir, exclude)
+        return
+    from analyzer.analyze_dead_code import analyze_dead_code_cli
     analyze_dead_code_cli(file)
 
+@app.command("serve", help="Inicia o daemon de análise, que mantém os resultados em memória para os demais comandos.")
+def serve(
+    socket_path: str = typer.Option(None, "--socket", help="Caminho do socket Unix (padrão: $ANALYZER_SOCKET ou um por usuário)"),
+    idle_timeout: int = typer.Option(DEFAULT_IDLE_TIMEOUT, "--idle-timeout", help="Encerra após este tempo sem requisições (s; 0: nunca)"),
+    max_entries: int = typer.Option(DEFAULT_DAEMON_ENTRIES, "--max-entries", help="Máximo de arquivos guardados em memória"),
+    stop: bool = typer.Option(False, "--stop", help="Encerra o daemon em execução")
+):
+    """
+    Inicia o daemon de análise, em primeiro plano, ouvindo em um socket Unix.
+
+    Com o daemon rodando, os comandos `all`, `lines`, `comments`,
+    `docstrings`, `classes`, `functions`, `methods` e `indent` pedem a ele o
+    relatório do arquivo em vez de analisá-lo: o daemon guarda os resultados em
+    um LRU em memória, com chave no caminho, mtime e tamanho do arquivo, e
+    atende várias requisições ao mesmo tempo. Sem daemon (ou com
+    `--no-daemon`), os comandos analisam no próprio processo.
+
+    O daemon encerra sozinho depois de `--idle-timeout` segundos sem
+    requisições. `analyzer status` mostra o tamanho do cache e a taxa de acertos.
+
+    Exemplos:
+        analyzer serve &
+        analyzer serve --idle-timeout 3600 --max-entries 10000
+        analyzer serve --stop
+    """
+    from analyzer import daemon, daemon_client
+
+    path = socket_path or daemon_client.socket_path()
+    if stop:
+        if daemon_client.request({"op": "stop"}, path) is None:
+            typer.secho(f"⚠️ Nenhum daemon em execução em {path}", fg=typer.colors.YELLOW, err=True)
+            raise typer.Exit(code=1)
+        typer.echo(f"✅ Daemon encerrado: {path}")
+        return
+
+    def ready(server):
+        typer.secho(f"🚀 Daemon ouvindo em {path} (pid {os.getpid()})", fg=typer.colors.GREEN)
+        sys.stdout.flush()
+
+    try:
+        daemon.serve(path, idle_timeout, max_entries, on_ready=ready)
+    except RuntimeError as e:
+        typer.secho(f"❌ {e}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        pass
+    typer.echo("👋 Daemon encerrado")
+
+@app.command("status", help="Mostra se o daemon está rodando, o tamanho do cache e a taxa de acertos.")
+def status(
+    socket_path: str = typer.Option(None, "--socket", help="Caminho do socket Unix (padrão: $ANALYZER_SOCKET ou um por usuário)"),
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli ou json)")
+):
+    from analyzer import daemon_client
+
+    path = socket_path or daemon_client.socket_path()
+    response = daemon_client.request({"op": "status"}, path)
+    if response is None:
+        typer.secho(f"⚠️ Nenhum daemon em execução em {path}", fg=typer.colors.YELLOW, err=True)
+        raise typer.Exit(code=1)
+    info = response["status"]
+
+    if format.lower() == "json":
+        from analyzer.output_formatter import format_output
+        typer.echo(format_output(info, "json"))
+        return
+
+    from rich.console import Console
+    from rich.table import Table
+
+    cache = info["cache"]
+    table = Table(title="⚡ Daemon de Análise", title_style="bold cyan")
+    table.add_column("Métrica", style="bold yellow")
+    table.add_column("Valor", justify="right", style="bold green")
+    table.add_row("Socket", info["socket"])
+    table.add_row("PID", str(info["pid"]))
+    table.add_row("Versão", info["version"])
+    table.add_row("Ativo há (s)", str(info["uptime_s"]))
+    table.add_row("Encerra após ocioso (s)", str(info["idle_timeout_s"]) if info["idle_timeout_s"] else "nunca")
+    table.add_row("Requisições", str(info["requests"]))
+    table.add_row("Arquivos em cache", f"{cache['entries']} / {cache['max_entries']}")
+    table.add_row("Tamanho do cache", f"{cache['size_kb']} KB")
+    table.add_row("Acertos / Falhas", f"{cache['hits']} / {cache['misses']}")
+    table.add_row("Taxa de acertos", f"{cache['hit_rate']}%")
+    Console().print(table)
+
+@app.command("bench", help="Mede o desempenho de cada analisador sobre um repositório.")
+def bench(
+    path: str = typer.Argument(..., help="Diretório com os arquivos Python a medir."),
+    repeat: int = typer.Option(DEFAULT_REPEAT, "--repeat", "-r", help="Repetições de cada medição (vale o melhor tempo)"),
+    jobs: int = typer.Option(1, "--jobs", "-j", help="Processos do all-dir e do analyze_repository"),
+    only: List[str] = typer.Option(None, "--only", help=f"Mede só o analisador informado (pode repetir): {', '.join(BENCHMARKS)}"),
+    exclude: List[str] = typer.Option(None, "--exclude", help="Glob de arquivos ou diretórios a ignorar (pode repetir)"),
+    format: str = typer.Option("cli", "--format", "-f", help="Formato de saída (cli ou json)"),
+    output: str = typer.Option(None, "--output", "-o", help="Arquivo JSON de saída (pode ser usado depois em --compare)"),
+    compare: str = typer.Option(None, "--compare", help="Relatório JSON de uma execução anterior (linha de base)"),
+    threshold: float = typer.Option(DEFAULT_THRESHOLD, "--threshold", help="Queda máxima de throughput aceita em --compare (fração)")
+):
+    """
+    Mede o desempenho dos analisadores sobre um repositório.
+
+    Cada analisador público (count_*, find_all_duplicates,
+    analyze_complexity_code, analyze_dead_code, proporção de comentários e
+    analyze_repository) e os comandos `all` e `all-dir` são executados
+    `--repeat` vezes sobre os arquivos do diretório; o relatório traz o
+    melhor tempo e o throughput (arquivos/s e MB/s). O mesmo harness é usado
+    pela suíte de benchmarks (`python -m benchmarks.bench_suite`).
+
+    Com `--compare`, o throughput é comparado a um relatório salvo antes com
+    `--output`; o comando termina com código 1 se alguma medição cair mais que
+    `--threshold`.
+
+    Exemplos:
+        analyzer bench . --exclude "tests/*"
+        analyzer bench . --only all-dir --jobs 4
+        analyzer bench . --output base.json
+        analyzer bench . --compare base.json --threshold 0.1
+    """
+    if not os.path.isdir(path):
+        typer.secho(f"❌ Diretório não encontrado: {path}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+    unknown = [name for name in only or [] if name not in BENCHMARKS]
+    if unknown:
+        typer.secho(f"❌ Medição desconhecida: {', '.join(unknown)}", fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
+    from rich.console import Console
+    from rich.table import Table
+    from analyzer.benchmark import compare_reports, load_report, run_benchmarks
+    from analyzer.output_formatter import format_output
+
+    console = Console()
+    show_progress = format.lower() != "json"
+    report = run_benchmarks(
+        path, repeat=repeat, jobs=jobs, only=only or None, exclude=exclude,
+        progress=(lambda name: console.print(f"[dim]⏱️  {name}...[/]")) if show_progress else None,
+    )
+    comparison = None
+    if compare:
+        comparison = compare_reports(report, load_report(compare), threshold)
+        report["comparison"] = comparison
+    regressions = [item["benchmark"] for item in comparison or [] if item["regression"]]
+
+    if output:
+        typer.echo(format_output(report, "json", output))
+    if format.lower() == "json":
+        if not output:
+            typer.echo(format_output(report, "json"))
+    else:
+        changes = {item["benchmark"]: item for item in comparison or []}
+        table = Table(title=f"⏱️  Benchmark: {path}", title_style="bold cyan",
+                      caption=f"{report['files']} arquivos, melhor de {repeat} execuções")
+        table.add_column("Medição", style="bold yellow")
+        table.add_column("Tempo (s)", justify="right")
+        table.add_column("Arquivos/s", justify="right")
+        table.add_column("MB/s", justify="right", style="bold green")
+        if comparison is not None:
+            table.add_column("Variação", justify="right")
+        for name, result in report["results"].items():
+            row = [name, f"{result['seconds']:.3f}", str(result["files_per_s"]), str(result["mb_per_s"])]
+            if comparison is not None:
+                change = changes.get(name)
+                if change is None:
+                    row.append("-")
+                else:
+                    style = "red" if change["regression"] else "green"
+                    row.append(f"[{style}]{change['change']:+.1%}[/]")
+            table.add_row(*row)
+        console.print(table)
+        if report["skipped_files"]:
+            console.print(f"[dim]{report['skipped_files']} arquivo(s) grande(s) ou ilegível(is) fora dos analisadores por arquivo[/]")
+
+    if regressions:
+        typer.secho(f"❌ Regressão de throughput acima de {threshold:.0%}: {', '.join(regressions)}",
+                    fg=typer.colors.RED, err=True)
+        raise typer.Exit(code=1)
+
 # Entrada CLI
 def cli_main():
     app()
@@ -0,0 +1,228 @@
+import struct
+from typing import Any, Callable, Dict, Tuple
+
+# Serialização no formato binário MessagePack (https://msgpack.org), sem
+# dependências: os arquivos podem ser lidos por qualquer biblioteca msgpack.
+# Só os tipos da saída JSON são aceitos (dict, list, tuple, str, int, float,
+# bool e None, além de bytes); como no JSON, chaves que não são strings viram
+# strings, então os dados lidos de volta são os mesmos nos dois formatos.
+
+_UINT8 = struct.Struct(">BB")
+_UINT16 = struct.Struct(">BH")
+_UINT32 = struct.Struct(">BI")
+_UINT64 = struct.Struct(">BQ")
+_INT8 = struct.Struct(">Bb")
+_INT16 = struct.Struct(">Bh")
+_INT32 = struct.Struct(">Bi")
+_INT64 = struct.Struct(">Bq")
+_DOUBLE = struct.Struct(">Bd")
+
+
+def packb(obj: Any) -> bytes:
+    """Serializa `obj` em MessagePack."""
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """Lê um objeto MessagePack completo (gerado por packb ou por outra biblioteca)."""
+    obj, position = _unpack(data, 0)
+    if position != len(data):
+        raise ValueError(f"dados extras depois do objeto MessagePack (posição {position})")
+    return obj
+
+
+def _pack(obj: Any, out: bytearray):
+    packer = _PACKERS.get(type(obj))
+    if packer is None:
+        # Subclasses (defaultdict, Counter, OrderedDict, IntEnum...)
+        for base, candidate in _PACKERS.items():
+            if isinstance(obj, base) and base is not bool:
+                packer = candidate
+                break
+        else:
+            raise TypeError(f"tipo não suportado em MessagePack: {type(obj).__name__}")
+    packer(obj, out)
+
+
+def _pack_none(obj: None, out: bytearray):
+    out.append(0xc0)
+
+
+def _pack_bool(obj: bool, out: bytearray):
+    out.append(0xc3 if obj else 0xc2)
+
+
+def _pack_int(obj: int, out: bytearray):
+    if 0 <= obj < 0x80:
+        out.append(obj)
+    elif -32 <= obj < 0:
+        out.append(obj & 0xff)
+    elif obj >= 0:
+        if obj <= 0xff:
+            out += _UINT8.pack(0xcc, obj)
+        elif obj <= 0xffff:
+            out += _UINT16.pack(0xcd, obj)
+        elif obj <= 0xffffffff:
+            out += _UINT32.pack(0xce, obj)
+        else:
+            out += _UINT64.pack(0xcf, obj)
+    elif obj >= -0x80:
+        out += _INT8.pack(0xd0, obj)
+    elif obj >= -0x8000:
+        out += _INT16.pack(0xd1, obj)
+    elif obj >= -0x80000000:
+        out += _INT32.pack(0xd2, obj)
+    else:
+        out += _INT64.pack(0xd3, obj)
+
+
+def _pack_float(obj: float, out: bytearray):
+    out += _DOUBLE.pack(0xcb, obj)
+
+
+def _pack_str(obj: str, out: bytearray):
+    data = obj.encode("utf-8")
+    size = len(data)
+    if size < 32:
+        out.append(0xa0 | size)
+    elif size <= 0xff:
+        out += _UINT8.pack(0xd9, size)
+    elif size <= 0xffff:
+        out += _UINT16.pack(0xda, size)
+    else:
+        out += _UINT32.pack(0xdb, size)
+    out += data
+
+
+def _pack_bytes(obj: bytes, out: bytearray):
+    size = len(obj)
+    if size <= 0xff:
+        out += _UINT8.pack(0xc4, size)
+    elif size <= 0xffff:
+        out += _UINT16.pack(0xc5, size)
+    else:
+        out += _UINT32.pack(0xc6, size)
+    out += obj
+
+
+def _pack_array(obj, out: bytearray):
+    size = len(obj)
+    if size < 16:
+        out.append(0x90 | size)
+    elif size <= 0xffff:
+        out += _UINT16.pack(0xdc, size)
+    else:
+        out += _UINT32.pack(0xdd, size)
+    for item in obj:
+        _pack(item, out)
+
+
+def _pack_map(obj: Dict, out: bytearray):
+    size = len(obj)
+    if size < 16:
+        out.append(0x80 | size)
+    elif size <= 0xffff:
+        out += _UINT16.pack(0xde, size)
+    else:
+        out += _UINT32.pack(0xdf, size)
+    for key, value in obj.items():
+        _pack_str(key if type(key) is str else _json_key(key), out)
+        _pack(value, out)
+
+
+def _json_key(key: Any) -> str:
+    """Converte uma chave como o json.dumps faz."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return float.__repr__(key)
+    raise TypeError(f"chave não suportada em MessagePack: {type(key).__name__}")
+
+
+# Tipo exato -> função; bool vem antes de int para as subclasses
+_PACKERS: Dict[type, Callable[[Any, bytearray], None]] = {
+    dict: _pack_map,
+    str: _pack_str,
+    bool: _pack_bool,
+    int: _pack_int,
+    float: _pack_float,
+    list: _pack_array,
+    tuple: _pack_array,
+    type(None): _pack_none,
+    bytes: _pack_bytes,
+}
+
+_FIXED_WIDTH = {
+    0xcc: struct.Struct(">B"), 0xcd: struct.Struct(">H"), 0xce: struct.Struct(">I"), 0xcf: struct.Struct(">Q"),
+    0xd0: struct.Struct(">b"), 0xd1: struct.Struct(">h"), 0xd2: struct.Struct(">i"), 0xd3: struct.Struct(">q"),
+    0xca: struct.Struct(">f"), 0xcb: struct.Struct(">d"),
+}
+_LENGTH = {
+    0xd9: struct.Struct(">B"), 0xda: struct.Struct(">H"), 0xdb: struct.Struct(">I"),  # str
+    0xc4: struct.Struct(">B"), 0xc5: struct.Struct(">H"), 0xc6: struct.Struct(">I"),  # bin
+    0xdc: struct.Struct(">H"), 0xdd: struct.Struct(">I"),  # array
+    0xde: struct.Struct(">H"), 0xdf: struct.Struct(">I"),  # map
+}
+
+
+def _unpack(data: bytes, position: int) -> Tuple[Any, int]:
+    code = data[position]
+    position += 1
+    if code < 0x80:
+        return code, position
+    if code >= 0xe0:
+        return code - 0x100, position
+    if 0xa0 <= code <= 0xbf:
+        end = position + (code & 0x1f)
+        return data[position:end].decode("utf-8"), end
+    if 0x90 <= code <= 0x9f:
+        return _unpack_array(data, position, code & 0x0f)
+    if 0x80 <= code <= 0x8f:
+        return _unpack_map(data, position, code & 0x0f)
+    if code == 0xc0:
+        return None, position
+    if code == 0xc2:
+        return False, position
+    if code == 0xc3:
+        return True, position
+    fixed = _FIXED_WIDTH.get(code)
+    if fixed is not None:
+        return fixed.unpack_from(data, position)[0], position + fixed.size
+    length = _LENGTH.get(code)
+    if length is None:
+        raise ValueError(f"tipo MessagePack não suportado: 0x{code:02x} (posição {position - 1})")
+    size = length.unpack_from(data, position)[0]
+    position += length.size
+    if code in (0xd9, 0xda, 0xdb):
+        return data[position:position + size].decode("utf-8"), position + size
+    if code in (0xc4, 0xc5, 0xc6):
+        return bytes(data[position:position + size]), position + size
+    if code in (0xdc, 0xdd):
+        return _unpack_array(data, position, size)
+    return _unpack_map(data, position, size)
+
+
+def _unpack_array(data: bytes, position: int, size: int) -> Tuple[list, int]:
+    items = []
+    for _ in range(size):
+        item, position = _unpack(data, position)
+        items.append(item)
+    return items, position
+
+
+def _unpack_map(data: bytes, position: int, size: int) -> Tuple[dict, int]:
+    result = {}
+    for _ in range(size):
+        key, position = _unpack(data, position)
+        result[key], position = _unpack(data, position)
+    return result, position
@@ -0,0 +1,337 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from analyzer.defaults import DEFAULT_DIRECTORY_METRICS
+from analyzer.import_origin import count_external_imports, first_party_modules
+from analyzer.metrics_engine import AST, TEXT, TOKENS
+
+# Como o all-dir resume a métrica no bloco summary
+SUM = "sum"          # total_<nome>: soma dos valores por arquivo
+COUNTER = "counter"  # soma de dicionários {nome: ocorrências}
+
+
+class Metric:
+    """
+    Métrica do relatório: quais entradas ela exige, como calculá-la a partir
+    do SourceAnalysis de um arquivo, como exibi-la e como resumi-la no all-dir.
+
+    Args:
+        name: Nome usado em `--metrics`
+        inputs: Entradas necessárias (TEXT, TOKENS, AST)
+        compute: Função (análise, caminho do arquivo) -> valor
+        label: Linha da tabela do comando all (None: sem linha)
+        display: Converte o valor no texto da tabela
+        key: Chave no relatório (padrão: o nome)
+        aggregate: SUM, COUNTER ou None (apenas por arquivo)
+        total_label: Linha do resumo do all-dir (padrão: "Total de <label>")
+        column: Coluna da tabela por arquivo do all-dir (None: sem coluna)
+        empty: Valor nos arquivos grandes, quando a métrica não é calculada
+        streaming: Chave equivalente no resultado de stream_file_metrics
+    """
+
+    # O valor depende dos módulos do próprio projeto (first_party_modules), não
+    # só do conteúdo do arquivo: entra na chave do cache do all-dir
+    uses_first_party = False
+
+    def __init__(self, name: str, inputs: Iterable[str], compute: Callable[[Any, str], Any],
+                 label: Optional[str] = None, display: Callable[[Any], str] = str, key: Optional[str] = None,
+                 aggregate: Optional[str] = None, total_label: Optional[str] = None,
+                 column: Optional[str] = None, empty: Any = 0, streaming: Optional[str] = None):
+        self.name = name
+        self.inputs = frozenset(inputs)
+        self.compute = compute
+        self.label = label
+        self.display = display
+        self.key = key or name
+        self.aggregate = aggregate
+        self.total_label = total_label or (f"Total de {label}" if label else None)
+        self.column = column
+        self.empty = empty
+        self.streaming = streaming
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        """Chaves que a métrica acrescenta ao relatório."""
+        return (self.key,)
+
+    def report(self, analysis, file: str, first_party: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        """
+        Entradas do bloco metrics do comando all. `first_party` são os módulos
+        do próprio projeto, calculados uma vez por execução (None: a partir de `file`).
+        """
+        return {self.key: self.compute(analysis, file)}
+
+    def rows(self, report: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Linhas (rótulo, valor) da tabela do comando all."""
+        return [(self.label, self.display(report[self.key]))] if self.label else []
+
+    # all-dir: resultado por arquivo
+    def directory_entry(self, report: Dict[str, Any], file_metrics: Dict[str, Any]):
+        for key in self.keys:
+            file_metrics["metrics"][key] = report[key]
+
+    def empty_entry(self, file_metrics: Dict[str, Any]):
+        file_metrics["metrics"][self.key] = self.empty
+
+    def streamed_entry(self, streamed: Dict[str, Any], file_metrics: Dict[str, Any]):
+        file_metrics["metrics"][self.key] = streamed[self.streaming]
+
+    def cell(self, file_metrics: Dict[str, Any]) -> str:
+        return str(file_metrics["metrics"][self.key])
+
+    # all-dir: bloco summary
+    @property
+    def summary_key(self) -> str:
+        return f"total_{self.name}" if self.aggregate == SUM else self.key
+
+    def start_summary(self, summary: Dict[str, Any]):
+        if self.aggregate == SUM:
+            summary[self.summary_key] = 0
+        elif self.aggregate == COUNTER:
+            summary[self.summary_key] = {}
+
+    def add_to_summary(self, summary: Dict[str, Any], file_metrics: Dict[str, Any], sign: int = 1):
+        value = file_metrics["metrics"][self.key]
+        if self.aggregate == SUM:
+            summary[self.summary_key] += sign * value
+        elif self.aggregate == COUNTER:
+            totals = summary[self.summary_key]
+            for name, count in value.items():
+                total = totals.get(name, 0) + sign * count
+                if total:
+                    totals[name] = total
+                else:
+                    totals.pop(name, None)
+
+    def merge_summary(self, summary: Dict[str, Any], other: Dict[str, Any]):
+        """Soma os totais de outro resumo (de outro conjunto de arquivos) a `summary`."""
+        if self.aggregate == SUM:
+            summary[self.summary_key] += other[self.summary_key]
+        elif self.aggregate == COUNTER:
+            totals = summary[self.summary_key]
+            for name, count in other[self.summary_key].items():
+                totals[name] = totals.get(name, 0) + count
+
+    def finalize_summary(self, summary: Dict[str, Any]):
+        if self.aggregate == COUNTER:
+            totals = summary[self.summary_key]
+            summary[self.summary_key] = dict(sorted(totals.items(), key=lambda item: (-item[1], item[0])))
+
+    def summary_rows(self, summary: Dict[str, Any]) -> List[Tuple[str, str]]:
+        if self.aggregate is None or not self.total_label:
+            return []
+        return [(self.total_label, self.display(summary[self.summary_key]))]
+
+    def summary_cell(self, summary: Dict[str, Any]) -> str:
+        """Total da métrica em uma célula de tabela (ex.: uma linha por commit no history)."""
+        return self.display(summary[self.summary_key]) if self.aggregate else "-"
+
+
+class MethodsMetric(Metric):
+    """Métodos públicos e privados (os especiais, como __init__, não contam)."""
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return ("public_methods", "private_methods", "total_methods")
+
+    def report(self, analysis, file: str, first_party: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        public_methods, private_methods = analysis.methods
+        return {
+            "public_methods": public_methods,
+            "private_methods": private_methods,
+            "total_methods": public_methods + private_methods
+        }
+
+    def rows(self, report: Dict[str, Any]) -> List[Tuple[str, str]]:
+        public_methods, private_methods, total_methods = (report[key] for key in self.keys)
+        rows = [
+            ("Métodos Públicos", str(public_methods)),
+            ("Métodos Privados", str(private_methods)),
+            ("Total de Métodos", str(total_methods))
+        ]
+        if total_methods > 0:
+            public_ratio = (public_methods / total_methods) * 100
+            private_ratio = (private_methods / total_methods) * 100
+            rows.append(("Proporção Público/Privado", f"{public_ratio:.1f}% / {private_ratio:.1f}%"))
+        return rows
+
+    def directory_entry(self, report: Dict[str, Any], file_metrics: Dict[str, Any]):
+        public_methods, private_methods, total_methods = (report[key] for key in self.keys)
+        file_metrics["methods"] = {
+            "public": public_methods,
+            "private": private_methods,
+            "total": total_methods,
+            "ratio": {}
+        }
+        if total_methods > 0:
+            file_metrics["methods"]["ratio"] = {
+                "public": round((public_methods / total_methods) * 100, 1),
+                "private": round((private_methods / total_methods) * 100, 1)
+            }
+
+    def empty_entry(self, file_metrics: Dict[str, Any]):
+        file_metrics["methods"] = {"public": 0, "private": 0, "total": 0, "ratio": {}}
+
+    def cell(self, file_metrics: Dict[str, Any]) -> str:
+        return f"{file_metrics['methods']['public']}/{file_metrics['methods']['private']}"
+
+    @property
+    def summary_key(self) -> str:
+        return "total_methods"
+
+    def start_summary(self, summary: Dict[str, Any]):
+        summary["total_methods"] = {"public": 0, "private": 0, "total": 0}
+
+    def add_to_summary(self, summary: Dict[str, Any], file_metrics: Dict[str, Any], sign: int = 1):
+        for key in ("public", "private", "total"):
+            summary["total_methods"][key] += sign * file_metrics["methods"][key]
+
+    def merge_summary(self, summary: Dict[str, Any], other: Dict[str, Any]):
+        for key in ("public", "private", "total"):
+            summary["total_methods"][key] += other["total_methods"][key]
+
+    def finalize_summary(self, summary: Dict[str, Any]):
+        """Calcula a proporção total de métodos públicos/privados."""
+        total_methods = summary["total_methods"]
+        if total_methods["total"] > 0:
+            summary["methods_ratio"] = {
+                "public": round((total_methods["public"] / total_methods["total"]) * 100, 1),
+                "private": round((total_methods["private"] / total_methods["total"]) * 100, 1)
+            }
+        else:
+            summary.pop("methods_ratio", None)
+
+    def summary_rows(self, summary: Dict[str, Any]) -> List[Tuple[str, str]]:
+        total_methods = summary["total_methods"]
+        rows = [
+            ("Total de Métodos Públicos", str(total_methods["public"])),
+            ("Total de Métodos Privados", str(total_methods["private"])),
+            ("Total de Métodos", str(total_methods["total"]))
+        ]
+        if "methods_ratio" in summary:
+            ratio = summary["methods_ratio"]
+            rows.append(("Proporção Total Público/Privado", f"{ratio['public']}% / {ratio['private']}%"))
+        return rows
+
+    def summary_cell(self, summary: Dict[str, Any]) -> str:
+        return f"{summary['total_methods']['public']}/{summary['total_methods']['private']}"
+
+
+class IndentationMetric(Metric):
+    """Média, máximo, mínimo e distribuição da indentação."""
+
+    def rows(self, report: Dict[str, Any]) -> List[Tuple[str, str]]:
+        indent_result = report[self.key]
+        return [
+            ("Indentação Média", str(indent_result.get("average_indent", "-"))),
+            ("Indentação Máxima", str(indent_result.get("max_indent", "-"))),
+            ("Indentação Mínima", str(indent_result.get("min_indent", "-")))
+        ]
+
+    def cell(self, file_metrics: Dict[str, Any]) -> str:
+        return str(file_metrics["metrics"][self.key].get("average_indent", "-"))
+
+
+class CommentRatioMetric(Metric):
+    """Proporção comentário/código de cada função e classe, e a média entre elas."""
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        return ("comment_ratio_avg", "comment_ratio_units")
+
+    def report(self, analysis, file: str, first_party: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        units = analysis.comment_ratio_units
+        if units:
+            average_ratio = round(sum(unit["percentual"] for unit in units) / len(units), 2)
+        else:
+            average_ratio = 0.0
+        return {"comment_ratio_avg": average_ratio, "comment_ratio_units": units}
+
+    def rows(self, report: Dict[str, Any]) -> List[Tuple[str, str]]:
+        return [(self.label, f"{report['comment_ratio_avg']}%")]
+
+    def empty_entry(self, file_metrics: Dict[str, Any]):
+        file_metrics["metrics"]["comment_ratio_avg"] = 0.0
+        file_metrics["metrics"]["comment_ratio_units"] = []
+
+    def cell(self, file_metrics: Dict[str, Any]) -> str:
+        return f"{file_metrics['metrics']['comment_ratio_avg']}%"
+
+
+class DependenciesMetric(Metric):
+    """Pacotes importados que não são da biblioteca padrão nem do próprio projeto."""
+
+    uses_first_party = True
+
+    def report(self, analysis, file: str, first_party: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        if first_party is None:
+            first_party = first_party_modules(file)
+        import_counter = defaultdict(int)
+        count_external_imports(analysis.imports, import_counter, first_party)
+        return {self.key: dict(import_counter)}
+
+
+# Métricas registradas, na ordem do relatório
+METRICS: Dict[str, Metric] = {}
+
+
+def register(metric: Metric) -> Metric:
+    """
+    Registra uma métrica: ela passa a valer em `--metrics` e aparece no
+    relatório, nas tabelas e no resumo do all-dir sem mudanças no main.
+    """
+    if metric.name in METRICS:
+        raise ValueError(f"métrica já registrada: {metric.name}")
+    METRICS[metric.name] = metric
+    return metric
+
+
+def select_metrics(names: Union[None, str, Iterable[str]] = None,
+                   default: Optional[Iterable[str]] = None) -> List[Metric]:
+    """
+    Métricas pedidas, na ordem do registro. `names` aceita uma lista ou um
+    texto separado por vírgulas ("lines,functions"); vazio, vale `default`
+    (ou todas as métricas). Nomes desconhecidos levantam ValueError.
+    """
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    if not names:
+        names = METRICS if default is None else default
+    unknown = [name for name in names if name not in METRICS]
+    if unknown:
+        raise ValueError(f"métrica desconhecida: {', '.join(unknown)} (disponíveis: {', '.join(METRICS)})")
+    wanted = set(names)
+    return [metric for metric in METRICS.values() if metric.name in wanted]
+
+
+def required_inputs(metrics: Sequence[Metric]) -> Set[str]:
+    """
+    Entradas (TEXT, TOKENS, AST) que as métricas exigem juntas: as únicas
+    passadas que o SourceAnalysis delas pode fazer.
+    """
+    return set().union(*(metric.inputs for metric in metrics))
+
+
+register(Metric("lines", [TOKENS], lambda analysis, file: analysis.lines,
+                label="Total de Linhas", aggregate=SUM, total_label="Total de Linhas", column="Linhas",
+                streaming="lines"))
+register(Metric("comments", [TOKENS], lambda analysis, file: analysis.comments,
+                label="Comentários", aggregate=SUM, column="Comentários", streaming="comments"))
+register(Metric("docstrings", [AST], lambda analysis, file: analysis.docstrings,
+                label="Docstrings", aggregate=SUM))
+register(Metric("classes", [AST], lambda analysis, file: analysis.classes,
+                label="Classes", aggregate=SUM, column="Classes"))
+register(Metric("functions", [AST], lambda analysis, file: analysis.functions,
+                label="Funções", aggregate=SUM, column="Funções"))
+register(MethodsMetric("methods", [AST], None, column="Métodos (Pub/Priv)"))
+register(IndentationMetric("indentation", [TOKENS], lambda analysis, file: analysis.indentation,
+                           column="Indentação Média", empty={}, streaming="indentation"))
+register(DependenciesMetric("dependencies", [AST], None, key="external_dependencies",
+                            label="Dependências Externas", display=lambda value: str(len(value)),
+                            aggregate=COUNTER, empty={}))
+register(CommentRatioMetric("comment_ratio", [TOKENS, AST], None, label="Comentado (%) Médio por Unidade",
+                            column="Comentado (%)"))
+register(Metric("complexity", [AST], lambda analysis, file: analysis.complexity, key="complexity_analysis",
+                empty=[]))
+register(Metric("dead_code", [AST], lambda analysis, file: analysis.dead_code,
+                empty={"dead_functions": [], "dead_classes": []}))
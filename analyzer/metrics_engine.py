@@ -0,0 +1,454 @@
+import ast
+import sys
+import tokenize
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from analyzer import profiling
+from analyzer.lexical import LexicalScan
+
+# Entradas de uma análise, da mais barata para a mais cara: o texto bruto, a
+# varredura léxica (comentários, linhas em branco e indentação) e a AST (parse
+# e travessia combinada). As métricas do registro (metric_registry) declaram
+# de quais precisam, e o SourceAnalysis só faz as passadas declaradas.
+TEXT = "text"
+TOKENS = "tokens"
+AST = "ast"
+
+# Nós de constantes: o parser do Python 3.7 ainda produz ast.Str, ast.Num etc.
+# no lugar de ast.Constant (os nomes antigos são obsoletos a partir do 3.8)
+if sys.version_info >= (3, 8):
+    CONSTANT_NODES = (ast.Constant,)
+else:
+    CONSTANT_NODES = (ast.Constant, ast.Str, ast.Bytes, ast.Num, ast.NameConstant, ast.Ellipsis)
+
+
+class cached_property:
+    """
+    Propriedade calculada no primeiro acesso e guardada na instância, como a
+    functools.cached_property (que só existe a partir do Python 3.8).
+    """
+
+    def __init__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__[self.name] = self.func(instance)
+        return value
+
+
+def string_value(node: ast.AST) -> Optional[str]:
+    """Texto de uma constante string (ast.Constant ou, no Python 3.7, ast.Str); None para os demais nós."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+    elif sys.version_info < (3, 8) and isinstance(node, ast.Str):
+        value = node.s
+    else:
+        return None
+    return value if isinstance(value, str) else None
+
+
+def end_line(node: ast.AST) -> int:
+    """Última linha do nó; sem end_lineno (Python 3.7), a maior linha entre seus descendentes."""
+    end = getattr(node, 'end_lineno', None)
+    if end:
+        return end
+    return max(getattr(child, 'lineno', 0) for child in ast.walk(node)) or node.lineno
+
+
+def complexity_label(depth: int) -> str:
+    """Converte a profundidade máxima de laços em uma complexidade assintótica."""
+    if depth == 0:
+        return "O(1)"
+    elif depth == 1:
+        return "O(n)"
+    elif depth == 2:
+        return "O(n^2)"
+    else:
+        return f"O(n^{depth})"
+
+
+def indentation_stats(lines) -> Dict[str, Any]:
+    """Calcula as estatísticas de indentação a partir das linhas do código."""
+    indent_levels = []
+    for line in lines:
+        if line.strip():  # Ignorar linhas em branco
+            spaces = len(line) - len(line.lstrip(' '))
+            tabs = len(line) - len(line.lstrip('\t'))
+            indent_levels.append(spaces if spaces else tabs * 4)  # 1 tab = 4 espaços
+    return indentation_summary(indent_levels)
+
+
+def indentation_summary(indent_levels: List[int]) -> Dict[str, Any]:
+    """Média, máximo, mínimo e distribuição das indentações das linhas não vazias."""
+    return indentation_from_distribution(Counter(indent_levels))
+
+
+def indentation_from_distribution(distribution: Dict[int, int]) -> Dict[str, Any]:
+    """
+    As mesmas estatísticas a partir de {indentação: linhas}, sem a lista de
+    níveis (usado na análise em streaming dos arquivos grandes).
+    """
+    if not distribution:
+        return {
+            'average_indent': 0,
+            'max_indent': 0,
+            'min_indent': 0,
+            'indent_distribution': {}
+        }
+
+    total = sum(distribution.values())
+    return {
+        'average_indent': round(sum(level * count for level, count in distribution.items()) / total, 2),
+        'max_indent': max(distribution),
+        'min_indent': min(distribution),
+        'indent_distribution': dict(sorted(distribution.items()))
+    }
+
+
+# Nós que acrescentam um caminho ao grafo de controle (complexidade de McCabe);
+# ast.match_case só existe a partir do Python 3.10
+_DECISION_NODES = tuple(node for node in (ast.If, ast.IfExp, ast.For, ast.AsyncFor, ast.While,
+                                          ast.ExceptHandler, getattr(ast, "match_case", None))
+                        if node is not None)
+_DECISION_TYPES = frozenset(_DECISION_NODES + (ast.BoolOp, ast.comprehension))
+
+
+class _MetricsVisitor:
+    """
+    Visitor combinado: uma única travessia da AST preenche todas as métricas.
+
+    A travessia é iterativa (pilha explícita, em pré-ordem), então módulos com
+    aninhamento muito profundo não esbarram no limite de recursão do Python.
+    Cada handler pode devolver uma função de saída, executada depois que toda a
+    subárvore do nó foi visitada.
+
+    A ordem de ast.walk (largura) usada pelas análises originais é reproduzida
+    guardando, para cada unidade, a chave (nível, índice em pré-ordem).
+    """
+
+    def __init__(self):
+        self.docstrings = 0
+        self.classes = 0
+        self.functions = 0
+        self.public_methods = 0
+        self.private_methods = 0
+        self.imports: List[str] = []
+        self.defined_funcs: Set[str] = set()
+        self.defined_classes: Set[str] = set()
+        self.used_funcs: Set[str] = set()
+        self.used_classes: Set[str] = set()
+        # [ordem, nome, profundidade_base, profundidade_máxima, complexidade_ciclomática]
+        self.function_depths = []
+        self.units = []  # (ordem, tipo, nome, linha_inicial, linha_final)
+        self._open_functions = []
+        self._loop_depth = 0
+        self.max_loop_depth = 0
+        self._index = 0
+        self._order = (0, 0)
+
+    def visit(self, root):
+        handlers = {}
+        stack = [(root, 0)]
+        AST = ast.AST
+        while stack:
+            node, level = stack.pop()
+            if level is None:
+                node()  # função de saída de um nó já visitado
+                continue
+            self._order = (level, self._index)
+            self._index += 1
+
+            node_type = type(node)
+            handler = handlers.get(node_type)
+            if handler is None:
+                handler = handlers[node_type] = getattr(self, 'visit_' + node_type.__name__, None)
+            if node_type in _DECISION_TYPES and self._open_functions:
+                self._count_decisions(node)
+            if handler is not None:
+                on_exit = handler(node)
+                if on_exit is not None:
+                    stack.append((on_exit, None))
+
+            # Filhos empilhados em ordem reversa, para serem visitados em pré-ordem
+            children = []
+            for field in node._fields:
+                value = getattr(node, field, None)
+                if isinstance(value, AST):
+                    children.append((value, level + 1))
+                elif isinstance(value, list):
+                    children.extend((item, level + 1) for item in value if isinstance(item, AST))
+            children.reverse()
+            stack.extend(children)
+
+    def _count_decisions(self, node):
+        # Os caminhos contam apenas para a função mais interna
+        entry = self._open_functions[-1]
+        if isinstance(node, ast.BoolOp):
+            entry[4] += len(node.values) - 1
+        elif isinstance(node, ast.comprehension):
+            entry[4] += 1 + len(node.ifs)
+        else:
+            entry[4] += 1
+
+    def _add_unit(self, node, kind: str):
+        # A unidade termina na última linha do corpo, inclusive blocos aninhados
+        self.units.append((self._order, kind, node.name, node.lineno, end_line(node)))
+
+    def visit_Expr(self, node):
+        if string_value(node.value) is not None:
+            self.docstrings += 1
+
+    def visit_ClassDef(self, node):
+        self.classes += 1
+        self.defined_classes.add(node.name)
+        self._add_unit(node, 'Classe')
+        for item in node.body:
+            if isinstance(item, ast.FunctionDef):
+                # Ignora métodos especiais como __init__, __str__, etc
+                if item.name.startswith('__') and item.name.endswith('__'):
+                    continue
+                elif item.name.startswith('_'):
+                    self.private_methods += 1
+                else:
+                    self.public_methods += 1
+
+    def _open_function(self, node):
+        entry = [self._order, node.name, self._loop_depth, 0, 1]
+        self.function_depths.append(entry)
+        self._open_functions.append(entry)
+        return self._open_functions.pop
+
+    def visit_FunctionDef(self, node):
+        self.functions += 1
+        self.defined_funcs.add(node.name)
+        self._add_unit(node, 'Função')
+        return self._open_function(node)
+
+    def visit_AsyncFunctionDef(self, node):
+        self._add_unit(node, 'Função')
+        return self._open_function(node)
+
+    def _enter_loops(self, count: int):
+        self._loop_depth += count
+        self.max_loop_depth = max(self.max_loop_depth, self._loop_depth)
+        for entry in self._open_functions:
+            entry[3] = max(entry[3], self._loop_depth - entry[2])
+
+        def leave():
+            self._loop_depth -= count
+        return leave
+
+    def _visit_loop(self, node):
+        return self._enter_loops(1)
+
+    def _visit_comprehension(self, node):
+        # Cada `for` de uma compreensão é um laço aninhado, que envolve também a expressão
+        return self._enter_loops(len(node.generators))
+
+    visit_For = _visit_loop
+    visit_AsyncFor = _visit_loop
+    visit_While = _visit_loop
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            self.used_funcs.add(node.func.id)
+        elif isinstance(node.func, ast.Attribute):
+            self.used_funcs.add(node.func.attr)
+
+    def visit_Attribute(self, node):
+        # Para instanciamento de classes
+        if isinstance(node.value, ast.Name):
+            self.used_classes.add(node.value.id)
+
+    def visit_Name(self, node):
+        # Para instanciamento de classes; vale também para usos antes da definição
+        self.used_classes.add(node.id)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append(alias.name.split('.')[0])
+
+    def visit_ImportFrom(self, node):
+        # Imports relativos são sempre do próprio pacote
+        if node.module and not node.level:
+            self.imports.append(node.module.split('.')[0])
+
+
+class SourceAnalysis:
+    """
+    Análise compartilhada de um código-fonte.
+
+    O texto é lido uma vez, varrido lexicamente uma vez e convertido em AST
+    uma vez; todas as métricas são derivadas desses resultados sob demanda, de
+    modo que métricas puramente textuais não pagam o custo do parse.
+
+    `inputs` restringe as passadas às entradas declaradas (TOKENS, AST): pedir
+    uma propriedade que dependa de outra levanta RuntimeError, em vez de fazer
+    a passada escondida. None libera todas.
+    """
+
+    def __init__(self, code: str, filename: str = "<unknown>", tree: ast.AST = None,
+                 tokens: Iterable[tokenize.TokenInfo] = None, inputs: Optional[Iterable[str]] = None):
+        self.code = code
+        self.filename = filename
+        self._tokens = tokens
+        self.inputs = None if inputs is None else frozenset(inputs)
+        if tree is not None:
+            self.tree = tree
+
+    def _require(self, name: str):
+        if self.inputs is not None and name not in self.inputs:
+            declared = ", ".join(sorted(self.inputs)) or "nenhuma"
+            raise RuntimeError(f"passada '{name}' não declarada nas entradas da análise (declaradas: {declared})")
+
+    @cached_property
+    def tree(self) -> ast.AST:
+        self._require(AST)
+        with profiling.stage("parse"):
+            return ast.parse(self.code, filename=self.filename)
+
+    @cached_property
+    def lexical(self) -> LexicalScan:
+        """Classificação (código/comentário/branco) e indentação de cada linha, numa só varredura."""
+        self._require(TOKENS)
+        with profiling.stage("lexical"):
+            return LexicalScan(self.code, self._tokens)
+
+    @property
+    def comment_lines(self) -> Dict[int, str]:
+        """Mapa linha -> comentário (`#` dentro de strings não conta)."""
+        return self.lexical.comment_text
+
+    @cached_property
+    def comment_prefix(self) -> List[int]:
+        """
+        Somas prefixas dos comentários: comment_prefix[i] é o número de linhas
+        com comentário entre as linhas 1 e i. O total de um intervalo [a, b] é
+        comment_prefix[b] - comment_prefix[a - 1].
+        """
+        return self.lexical.comment_prefix()
+
+    @cached_property
+    def _visitor(self) -> _MetricsVisitor:
+        tree = self.tree
+        with profiling.stage("ast_metrics"):
+            visitor = _MetricsVisitor()
+            visitor.visit(tree)
+        return visitor
+
+    # Métricas textuais
+    @property
+    def lines(self) -> int:
+        return self.lexical.line_count
+
+    @property
+    def comments(self) -> int:
+        return self.lexical.comment_count
+
+    @cached_property
+    def indentation(self) -> Dict[str, Any]:
+        levels = self.lexical.indent_levels()
+        with profiling.stage("indentation"):
+            return indentation_summary(levels)
+
+    # Métricas da AST
+    @property
+    def docstrings(self) -> int:
+        return self._visitor.docstrings
+
+    @property
+    def classes(self) -> int:
+        return self._visitor.classes
+
+    @property
+    def functions(self) -> int:
+        return self._visitor.functions
+
+    @property
+    def methods(self):
+        """Tupla (métodos_públicos, métodos_privados)."""
+        return self._visitor.public_methods, self._visitor.private_methods
+
+    @property
+    def imports(self) -> List[str]:
+        """Nome de pacote de primeiro nível de cada import, na ordem em que aparece."""
+        return list(self._visitor.imports)
+
+    @property
+    def max_loop_depth(self) -> int:
+        """Maior aninhamento de laços (inclusive compreensões) em todo o código."""
+        return self._visitor.max_loop_depth
+
+    @property
+    def complexity(self) -> List[Dict[str, Any]]:
+        """
+        Para cada função (inclusive async), em ordem de ast.walk: a complexidade
+        assintótica estimada pelo aninhamento de laços e a complexidade
+        ciclomática de McCabe (1 + desvios: if, laços, except, case, operadores
+        booleanos e cláusulas de compreensões).
+        """
+        visitor = self._visitor
+        with profiling.stage("complexity"):
+            entries = sorted(visitor.function_depths, key=lambda e: e[0])
+            return [
+                {'function': name, 'complexity': complexity_label(depth), 'cyclomatic': cyclomatic}
+                for _, name, _, depth, cyclomatic in entries
+            ]
+
+    @property
+    def dead_code(self) -> Dict[str, List[str]]:
+        visitor = self._visitor
+        with profiling.stage("dead_code"):
+            return {
+                "dead_functions": sorted(visitor.defined_funcs - visitor.used_funcs),
+                "dead_classes": sorted(visitor.defined_classes - visitor.used_classes)
+            }
+
+    @property
+    def comment_ratio_units(self) -> List[Dict[str, Any]]:
+        """Comentários de cada função e classe, em O(1) por unidade (somas prefixas)."""
+        visitor = self._visitor
+        with profiling.stage("comment_ratio"):
+            prefix = self.comment_prefix
+            resultados = []
+            for _, kind, name, start, end in sorted(visitor.units, key=lambda u: u[0]):
+                total_linhas = end - start + 1
+                total_comentarios = prefix[end] - prefix[start - 1]
+                percentual = (total_comentarios / total_linhas) * 100 if total_linhas > 0 else 0
+                resultados.append({
+                    "nome": f"{kind}: {name}",
+                    "linhas_totais": total_linhas,
+                    "comentarios": total_comentarios,
+                    "percentual": round(percentual, 2)
+                })
+            return resultados
+
+
+@lru_cache(maxsize=16)
+def get_analysis(code: str) -> SourceAnalysis:
+    """
+    Retorna a análise compartilhada de um código.
+
+    Chamadas consecutivas das funções count_* sobre o mesmo texto reaproveitam
+    o mesmo parse.
+    """
+    return SourceAnalysis(code)
+
+
+def analyze_file(file_path: str) -> SourceAnalysis:
+    """Lê o arquivo uma única vez e retorna sua análise compartilhada."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        code = f.read()
+    return SourceAnalysis(code, filename=file_path)
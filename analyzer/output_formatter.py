@@ -1,35 +1,123 @@
 import json
+import sys
 from typing import Dict, Any
 from datetime import datetime
 from pathlib import Path
 
-def format_output(metrics: Dict[str, Any], format_type: str = "cli", output_file: str = None) -> str:
+# Nível do gzip para arquivos de saída terminados em .gz: o 9 comprime só um
+# pouco mais e leva várias vezes mais tempo nos relatórios grandes
+GZIP_LEVEL = 6
+GZIP_MAGIC = b'\x1f\x8b'
+
+def format_output(metrics: Dict[str, Any], format_type: str = "cli", output_file: str = None,
+                  compact: bool = False) -> str:
     """
     Formata a saída das métricas no formato especificado.
     
     Args:
         metrics: Dicionário com as métricas coletadas
-        format_type: Tipo de formato ('cli', 'json')
-        output_file: Caminho do arquivo de saída (opcional)
+        format_type: Tipo de formato ('cli', 'json', 'msgpack')
+        output_file: Caminho do arquivo de saída (opcional; obrigatório para
+            'msgpack', que é binário). Se terminar em `.gz`, o arquivo é
+            gravado comprimido com gzip
+        compact: JSON sem indentação nem espaços entre os itens
     
     Returns:
         str: Mensagem de confirmação ou dados formatados
     """
-    if format_type.lower() == "json":
-        output = {
-            "timestamp": datetime.now().isoformat(),
-            "metrics": metrics
-        }
-        
+    format_type = format_type.lower()
+    if format_type not in ("json", "msgpack"):
+        return None
+
+    output = {
+        "timestamp": datetime.now().isoformat(),
+        "metrics": metrics
+    }
+    if format_type == "msgpack":
+        if not output_file:
+            raise ValueError("o formato msgpack é binário: informe o arquivo de saída")
+        from analyzer.messagepack import packb
+        data = packb(output)
+    else:
+        # dumps gera o texto de uma vez (com o encoder em C quando compacto);
+        # json.dump no arquivo faria milhares de escritas pequenas
+        if compact:
+            text = json.dumps(output, ensure_ascii=False, separators=(',', ':'))
+        else:
+            text = json.dumps(output, indent=4, ensure_ascii=False)
+        if not output_file:
+            return text
+        data = text.encode('utf-8')
+
+    with _open_output(output_file, 'wb') as f:
+        f.write(data)
+    return f"✅ Resultados salvos em: {output_file}"
+
+
+def load_output(path: str) -> Dict[str, Any]:
+    """
+    Lê um arquivo gerado por format_output em qualquer formato: JSON
+    (indentado ou compacto) ou MessagePack, comprimido com gzip ou não.
+    O formato é reconhecido pelo conteúdo, não pela extensão.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] == GZIP_MAGIC:
+        import gzip
+        data = gzip.decompress(data)
+    if data.lstrip()[:1] in (b'{', b'['):
+        return json.loads(data.decode('utf-8'))
+    from analyzer.messagepack import unpackb
+    return unpackb(data)
+
+
+def _open_output(output_file: str, mode: str):
+    """Abre o arquivo de saída (criando o diretório), com gzip se terminar em .gz."""
+    output_path = Path(output_file)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.suffix == '.gz':
+        import gzip
+        if 'b' in mode:
+            return gzip.open(output_file, mode, compresslevel=GZIP_LEVEL)
+        return gzip.open(output_file, mode, compresslevel=GZIP_LEVEL, encoding='utf-8')
+    if 'b' in mode:
+        return open(output_file, mode)
+    return open(output_file, mode, encoding='utf-8')
+
+
+class NDJSONWriter:
+    """
+    Escreve um objeto JSON compacto por linha (NDJSON) à medida que os
+    resultados ficam prontos, na saída padrão ou em um arquivo.
+
+    Cada linha é gravada e descarregada imediatamente, então ferramentas
+    consumidoras podem processar os resultados enquanto a análise continua
+    e a memória usada não cresce com o número de arquivos. Em arquivos .gz
+    (comprimidos com gzip) as linhas só são descarregadas no fechamento:
+    descarregar a cada linha estragaria a compressão.
+    """
+
+    def __init__(self, output_file: str = None):
+        self.output_file = output_file
         if output_file:
-            # Garante que o diretório existe
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output, f, indent=4, ensure_ascii=False)
-            return f"✅ Resultados salvos em: {output_file}"
+            self.stream = _open_output(output_file, 'wt')
+            self.flush_lines = Path(output_file).suffix != '.gz'
         else:
-            return json.dumps(output, indent=4, ensure_ascii=False)
-    
-    return None 
\ No newline at end of file
+            self.stream = sys.stdout
+            self.flush_lines = True
+
+    def write(self, record: Dict[str, Any]):
+        self.stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+        self.stream.write('\n')
+        if self.flush_lines:
+            self.stream.flush()
+
+    def close(self):
+        if self.output_file:
+            self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,228 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+# O cProfile e o pstats só são importados com --profile-output: este módulo é
+# importado por todos os comandos e precisa ser barato.
+
+# Contexto vazio devolvido quando o perfil está desligado (custo de uma chamada)
+_NULL = nullcontext()
+
+
+class Profiler:
+    """
+    Tempo de parede e de CPU de cada etapa da análise, no total e por arquivo.
+
+    Os tempos são exclusivos: quando uma etapa dispara outra (a travessia da
+    AST que precisa do parse, por exemplo), o tempo da interna é descontado da
+    externa, então a soma das etapas não conta nada duas vezes.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}  # etapa -> [parede, cpu, chamadas]
+        self.files: Dict[str, Dict[str, float]] = {}  # arquivo -> etapa -> parede
+        self.current_file: Optional[str] = None
+        self._stack: List[List[float]] = []  # [tempo dos filhos: parede, cpu]
+
+    @contextmanager
+    def stage(self, name: str):
+        frame = [0.0, 0.0]
+        self._stack.append(frame)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][0] += wall
+                self._stack[-1][1] += cpu
+            self.add(name, wall - frame[0], cpu - frame[1], self.current_file)
+
+    def add(self, name: str, wall: float, cpu: float, file: Optional[str] = None, calls: int = 1):
+        entry = self.stages.setdefault(name, [0.0, 0.0, 0])
+        entry[0] += wall
+        entry[1] += cpu
+        entry[2] += calls
+        if file is not None:
+            per_file = self.files.setdefault(file, {})
+            per_file[name] = per_file.get(name, 0.0) + wall
+
+    @contextmanager
+    def file(self, path: str):
+        previous, self.current_file = self.current_file, path
+        try:
+            yield
+        finally:
+            self.current_file = previous
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Dados brutos, para serem enviados de um processo de trabalho ao principal."""
+        return {"stages": self.stages, "files": self.files}
+
+    def merge(self, snapshot: Dict[str, Any]):
+        for name, (wall, cpu, calls) in snapshot["stages"].items():
+            self.add(name, wall, cpu, calls=calls)
+        for path, stages in snapshot["files"].items():
+            per_file = self.files.setdefault(path, {})
+            for name, wall in stages.items():
+                per_file[name] = per_file.get(name, 0.0) + wall
+
+
+# Perfil da execução atual; None quando --profile não foi usado
+_profiler: Optional[Profiler] = None
+_started = 0.0
+_cprofile: Optional["cProfile.Profile"] = None
+_worker_stats: List[Dict] = []
+_reported = False
+
+
+def enabled() -> bool:
+    return _profiler is not None
+
+
+def stage(name: str):
+    """Mede uma etapa (`with stage("parse"): ...`); sem efeito com o perfil desligado."""
+    if _profiler is None:
+        return _NULL
+    return _profiler.stage(name)
+
+
+def file(path: str):
+    """Atribui as etapas medidas dentro do bloco ao arquivo informado."""
+    if _profiler is None:
+        return _NULL
+    return _profiler.file(path)
+
+
+def enable(with_cprofile: bool = False):
+    """Liga o perfil da execução (e, opcionalmente, o cProfile)."""
+    global _profiler, _started, _cprofile, _reported
+    _profiler = Profiler()
+    _reported = False
+    _started = time.perf_counter()
+    _worker_stats.clear()
+    if with_cprofile:
+        import cProfile
+        _cprofile = cProfile.Profile()
+        _cprofile.enable()
+
+
+def disable():
+    global _profiler, _cprofile
+    if _cprofile is not None:
+        _cprofile.disable()
+    _profiler = None
+    _cprofile = None
+
+
+def worker_options() -> Optional[Dict[str, bool]]:
+    """O que os processos de trabalho devem medir (None com o perfil desligado)."""
+    if _profiler is None:
+        return None
+    return {"cprofile": _cprofile is not None}
+
+
+@contextmanager
+def worker(options: Optional[Dict[str, bool]], collected: List[Dict]):
+    """
+    Mede o trabalho feito em um processo de trabalho. Ao final, acrescenta a
+    `collected` os tempos (e as estatísticas do cProfile) para o processo
+    principal juntar com merge_worker.
+    """
+    global _profiler
+    if options is None:
+        yield
+        return
+    previous, _profiler = _profiler, Profiler()
+    profile = None
+    if options["cprofile"]:
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    try:
+        yield
+    finally:
+        data = _profiler.snapshot()
+        if profile is not None:
+            profile.disable()
+            profile.create_stats()
+            data["cprofile"] = profile.stats
+        collected.append(data)
+        _profiler = previous
+
+
+def merge_worker(data: Optional[Dict]):
+    """Junta ao perfil do processo principal o que um processo de trabalho mediu."""
+    if data is None or _profiler is None:
+        return
+    _profiler.merge(data)
+    if "cprofile" in data:
+        _worker_stats.append(data["cprofile"])
+
+
+def reported() -> bool:
+    """Indica se o perfil já foi incluído na saída (JSON) do comando."""
+    return _reported
+
+
+class _StatsData:
+    """Estatísticas já coletadas, no formato que pstats.Stats.add aceita."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+def dump_cprofile(path: str):
+    """Grava as estatísticas do cProfile (processo principal e processos de trabalho) em `path`."""
+    if _cprofile is None:
+        return
+    import pstats
+    _cprofile.disable()
+    stats = pstats.Stats(_cprofile)
+    for worker_stats in _worker_stats:
+        stats.add(_StatsData(worker_stats))
+    stats.dump_stats(path)
+
+
+def report(top_files: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Bloco `profile` da saída: etapas ordenadas pelo tempo de parede e os
+    arquivos mais lentos (todos, ou os `top_files` primeiros) com o tempo de
+    cada etapa.
+
+    `share_pct` é a fração do tempo medido em todas as etapas; com vários
+    processos, a soma dos tempos das etapas passa do tempo total da execução.
+    """
+    global _reported
+    if _profiler is None:
+        return {}
+    _reported = True
+    total = time.perf_counter() - _started
+    measured = sum(wall for wall, _, _ in _profiler.stages.values())
+    stages = [
+        {
+            "stage": name,
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "calls": calls,
+            "share_pct": round(wall / measured * 100, 1) if measured else 0.0,
+        }
+        for name, (wall, cpu, calls) in sorted(_profiler.stages.items(), key=lambda item: -item[1][0])
+    ]
+    files = sorted(_profiler.files.items(), key=lambda item: -sum(item[1].values()))
+    if top_files is not None:
+        files = files[:top_files]
+    return {
+        "total_wall_s": round(total, 4),
+        "stages": stages,
+        "files": {
+            path: {"total_s": round(sum(times.values()), 4),
+                   **{name: round(wall, 4) for name, wall in sorted(times.items(), key=lambda item: -item[1])}}
+            for path, times in files
+        },
+    }
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+from analyzer import __version__
+from analyzer.defaults import DEFAULT_CACHE_DIR, DEFAULT_MAX_SIZE_MB
+
+CACHE_FILE = "analysis_cache.sqlite3"
+_HASH_BLOCK = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+class ResultCache:
+    """
+    Cache persistente (SQLite) dos resultados de análise por arquivo.
+
+    A chave de cada resultado combina o hash do conteúdo, a versão do analyzer,
+    o nome da análise e suas opções. Antes de ler e calcular o hash de um
+    arquivo, (caminho, tamanho, mtime) é comparado com o último registro: se
+    nada mudou, o hash guardado é reutilizado e o arquivo nem é aberto.
+    O tamanho total é limitado e os resultados menos usados são removidos primeiro;
+    registros de arquivos que deixaram de existir são descartados ao fechar.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, analyzer: str = "all-dir",
+                 options: Optional[Dict[str, Any]] = None, max_size_mb: int = DEFAULT_MAX_SIZE_MB):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, CACHE_FILE)
+        self.max_size = max_size_mb * 1024 * 1024
+        self._salt = json.dumps([__version__, analyzer, options or {}], sort_keys=True)
+        self.hits = 0
+        self.misses = 0
+        self._hashes: Dict[str, str] = {}
+        self._touched: Dict[str, float] = {}
+        self._seen: Set[str] = set()
+
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(_SCHEMA)
+        self._files: Dict[str, Tuple[int, int, str]] = {
+            path: (size, mtime_ns, content_hash)
+            for path, size, mtime_ns, content_hash in self.conn.execute(
+                "SELECT path, size, mtime_ns, content_hash FROM files")
+        }
+
+    def _key(self, content_hash: str) -> str:
+        return hashlib.sha256(f"{self._salt}:{content_hash}".encode("utf-8")).hexdigest()
+
+    def _content_hash(self, path: str) -> Optional[str]:
+        """Retorna o hash do conteúdo, lendo o arquivo apenas se tamanho/mtime mudaram."""
+        self._seen.add(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._forget(path)
+            return None
+        known = self._files.get(path)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            return known[2]
+
+        try:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                # Em blocos: arquivos grandes não são carregados inteiros na memória
+                for block in iter(lambda: f.read(_HASH_BLOCK), b""):
+                    digest.update(block)
+            content_hash = digest.hexdigest()
+        except OSError:
+            return None
+        self._files[path] = (st.st_size, st.st_mtime_ns, content_hash)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)",
+            (path, st.st_size, st.st_mtime_ns, content_hash))
+        return content_hash
+
+    def _forget(self, path: str):
+        if self._files.pop(path, None) is not None:
+            self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """Hash do conteúdo do arquivo (None se não pode ser lido), sem reler arquivos inalterados."""
+        return self._content_hash(os.path.abspath(path))
+
+    def get(self, path: str) -> Optional[Any]:
+        """Retorna o resultado guardado para o arquivo ou None (contabilizando acertos/falhas)."""
+        path = os.path.abspath(path)
+        content_hash = self._content_hash(path)
+        if content_hash is None:
+            self.misses += 1
+            return None
+        self._hashes[path] = content_hash
+        result = self.get_by_hash(content_hash)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def get_by_hash(self, content_hash: str) -> Optional[Any]:
+        """
+        Resultado guardado para um hash, de um arquivo ou de um resultado
+        derivado de vários (ex.: o grafo de imports, pelo hash de todos os arquivos).
+        Não entra nas estatísticas, que contam apenas consultas por arquivo.
+        """
+        key = self._key(content_hash)
+        row = self.conn.execute("SELECT result FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        return json.loads(row[0])
+
+    def put(self, path: str, result: Any):
+        """Guarda o resultado da análise de um arquivo."""
+        path = os.path.abspath(path)
+        content_hash = self._hashes.pop(path, None) or self._content_hash(path)
+        if content_hash is None:
+            return
+        self.put_by_hash(content_hash, result)
+
+    def put_by_hash(self, content_hash: str, result: Any):
+        payload = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO results (key, result, size, last_used) VALUES (?, ?, ?, ?)",
+            (self._key(content_hash), payload, len(payload), time.time()))
+
+    def clear(self):
+        """Remove todos os registros do cache."""
+        self.conn.execute("DELETE FROM results")
+        self.conn.execute("DELETE FROM files")
+        self._files.clear()
+        self._hashes.clear()
+        self._touched.clear()
+        self._seen.clear()
+
+    def _prune(self):
+        """Remove os registros de arquivos não consultados nesta execução que não existem mais."""
+        for path in [path for path in self._files if path not in self._seen]:
+            if not os.path.exists(path):
+                self._forget(path)
+
+    def _evict(self):
+        """Remove os resultados menos usados até o cache caber no limite de tamanho."""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_size:
+            return
+        stale = []
+        for key, size in self.conn.execute("SELECT key, size FROM results ORDER BY last_used ASC"):
+            if total <= self.max_size:
+                break
+            stale.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        """Grava os acessos pendentes, descarta arquivos removidos, aplica o limite de tamanho e fecha o banco."""
+        self.conn.executemany(
+            "UPDATE results SET last_used = ? WHERE key = ?",
+            [(used, key) for key, used in self._touched.items()])
+        self._touched.clear()
+        self._prune()
+        self._evict()
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,239 @@
+import ast
+import os
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from analyzer.directory_analysis import analyze_files_cached
+from analyzer.file_walker import iter_python_files
+from analyzer.metrics_engine import string_value
+from analyzer.result_cache import DEFAULT_CACHE_DIR, ResultCache
+
+# Versão do formato dos símbolos guardados no cache
+SYMBOLS_FORMAT = 2
+
+# Nomes que recebem a própria instância ou classe nos métodos
+_SELF_NAMES = frozenset({'self', 'cls'})
+
+# (nome, tipo, linha, ponto_de_entrada)
+Definition = Tuple[str, str, int, bool]
+
+# Métodos chamados implicitamente pelo unittest
+_IMPLICIT_METHODS = frozenset({
+    'setUp', 'tearDown', 'setUpClass', 'tearDownClass', 'asyncSetUp', 'asyncTearDown',
+})
+
+
+def _is_entry_point(node: ast.AST, kind: str) -> bool:
+    """Definições chamadas por frameworks, e não pelo código do repositório."""
+    if node.decorator_list:
+        return True
+    # Hooks do unittest e visitors do ast (despacho pelo nome)
+    return kind == 'method' and (node.name in _IMPLICIT_METHODS or node.name.startswith('visit_'))
+
+
+def _is_test(path: str, name: str, kind: str) -> bool:
+    """Testes coletados pelo pytest em arquivos test_*.py."""
+    if not os.path.basename(path).startswith('test_'):
+        return False
+    return name.startswith('Test' if kind == 'class' else 'test')
+
+
+def _is_dunder(name: str) -> bool:
+    return name.startswith('__') and name.endswith('__')
+
+
+def _all_entries(node: ast.AST) -> List[str]:
+    """Nomes listados em `__all__ = [...]` (ou `+=`)."""
+    value = node.value
+    if isinstance(value, (ast.List, ast.Tuple)):
+        return [name for name in map(string_value, value.elts) if name is not None]
+    return []
+
+
+def _is_self_call(node: ast.Call, function: Optional[str]) -> bool:
+    """Chamada direta da função mais interna a si mesma: `f(...)` em f ou `self.f(...)` no método f."""
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id == function
+    return (isinstance(func, ast.Attribute) and func.attr == function
+            and isinstance(func.value, ast.Name) and func.value.id in _SELF_NAMES)
+
+
+def extract_symbols(code: str, filename: str = "<unknown>") -> Dict[str, Any]:
+    """
+    Extrai, em uma única travessia, as definições e as referências de um módulo.
+
+    Definições: funções, métodos e classes (métodos especiais são ignorados,
+    pois são chamados implicitamente). Funções decoradas, hooks do unittest e
+    métodos `visit_*` são marcados como pontos de entrada: quem os chama é o
+    framework. Testes do pytest são reconhecidos pelo índice, a partir do caminho.
+
+    Referências: nomes lidos, atributos (`obj.metodo`), nomes importados e os
+    itens de `__all__`. Só a chamada direta de uma função a si mesma
+    (recursão, na função mais interna) não conta: outros usos do mesmo nome,
+    como `self._d.get()` dentro de `get` ou uma classe que se instancia nos
+    próprios métodos, são referências. O resultado não depende da ordem em que
+    os nós aparecem.
+    """
+    tree = ast.parse(code, filename=filename)
+    definitions: List[Definition] = []
+    references: Counter = Counter()
+    self_calls = set()  # nós `func` das chamadas recursivas
+
+    # Pilha de (nó, função mais interna que o envolve, está dentro de uma classe)
+    stack = [(tree, None, False)]
+    while stack:
+        node, function, in_class = stack.pop()
+        child_function, child_in_class = function, False
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            is_class = isinstance(node, ast.ClassDef)
+            if not _is_dunder(node.name):
+                kind = 'class' if is_class else ('method' if in_class else 'function')
+                definitions.append((node.name, kind, node.lineno, _is_entry_point(node, kind)))
+            child_function = None if is_class else node.name
+            child_in_class = is_class
+        elif isinstance(node, ast.Call):
+            if function is not None and _is_self_call(node, function):
+                self_calls.add(node.func)
+        elif isinstance(node, ast.Name):
+            if node not in self_calls:
+                references[node.id] += 1
+        elif isinstance(node, ast.Attribute):
+            if node not in self_calls:
+                references[node.attr] += 1
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                references[alias.name] += 1
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                for part in alias.name.split('.'):
+                    references[part] += 1
+        elif isinstance(node, (ast.Assign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if any(isinstance(t, ast.Name) and t.id == '__all__' for t in targets):
+                for name in _all_entries(node):
+                    references[name] += 1
+
+        stack.extend((child, child_function, child_in_class) for child in ast.iter_child_nodes(node))
+
+    return {
+        "format": SYMBOLS_FORMAT,
+        "definitions": sorted(definitions, key=lambda d: (d[2], d[0])),
+        "references": dict(references),
+    }
+
+
+def extract_file_symbols(file_path: str) -> Dict[str, Any]:
+    """Lê um arquivo e extrai seus símbolos (executado nos processos de trabalho)."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        return extract_symbols(f.read(), filename=file_path)
+
+
+class SymbolIndex:
+    """
+    Tabela de símbolos e índice reverso de referências de um repositório.
+
+    Cada arquivo contribui com suas definições e contagens de referências; ao
+    trocar um arquivo, sua contribuição antiga é subtraída e a nova somada, sem
+    reprocessar os demais. A pergunta "este símbolo é usado?" vira uma consulta
+    ao contador de referências.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.references: Counter = Counter()
+        self.definitions: Dict[str, List[Tuple[str, str, int, bool]]] = defaultdict(list)
+
+    def add(self, path: str, symbols: Dict[str, Any]):
+        if path in self.files:
+            self.remove(path)
+        self.files[path] = symbols
+        self.references.update(symbols["references"])
+        for name, kind, line, entry in symbols["definitions"]:
+            entry = entry or _is_test(path, name, kind)
+            self.definitions[name].append((path, kind, line, entry))
+
+    def remove(self, path: str):
+        symbols = self.files.pop(path, None)
+        if symbols is None:
+            return
+        self.references.subtract(symbols["references"])
+        for name, _, _, _ in symbols["definitions"]:
+            remaining = [d for d in self.definitions[name] if d[0] != path]
+            if remaining:
+                self.definitions[name] = remaining
+            else:
+                del self.definitions[name]
+
+    def is_used(self, name: str) -> bool:
+        return self.references.get(name, 0) > 0
+
+    def unused(self) -> List[Tuple[str, str, str, int]]:
+        """Definições sem nenhuma referência no repositório: (caminho, nome, tipo, linha)."""
+        result = []
+        for name, entries in self.definitions.items():
+            if self.is_used(name):
+                continue
+            for path, kind, line, entry in entries:
+                if not entry:
+                    result.append((path, name, kind, line))
+        return sorted(result, key=lambda d: (d[0], d[3]))
+
+
+def build_symbol_index(
+    root: str,
+    jobs: int = 1,
+    cache: Optional[ResultCache] = None,
+    exclude: Optional[Sequence[str]] = None,
+) -> Tuple[SymbolIndex, List[Tuple[str, str]]]:
+    """
+    Extrai os símbolos de todos os arquivos do repositório em paralelo.
+
+    Com `cache`, os símbolos de cada arquivo ficam guardados pelo hash do
+    conteúdo: numa nova execução só os arquivos alterados são lidos e analisados.
+    Retorna (índice, [(caminho, erro)]).
+    """
+    index = SymbolIndex()
+    errors = []
+    prefix = os.path.join(root, "")
+    paths = iter_python_files(root, exclude=exclude)
+    for path, symbols, error in analyze_files_cached(paths, jobs, cache, analyze=extract_file_symbols):
+        relative = path[len(prefix):].replace(os.sep, "/") if path.startswith(prefix) else path
+        if error is not None:
+            errors.append((relative, error))
+        else:
+            index.add(relative, symbols)
+    return index, errors
+
+
+def find_repository_dead_code(root: str, jobs: int = 1, use_cache: bool = True,
+                              cache_dir: str = DEFAULT_CACHE_DIR, exclude: Optional[Sequence[str]] = None):
+    """Retorna (definições_não_usadas, erros, estatísticas_do_cache_ou_None)."""
+    cache = ResultCache(cache_dir, analyzer="symbols", options={"format": SYMBOLS_FORMAT}) if use_cache else None
+    try:
+        index, errors = build_symbol_index(root, jobs, cache, exclude)
+        return index.unused(), errors, cache.stats() if cache else None
+    finally:
+        if cache is not None:
+            cache.close()
+
+
+def analyze_repository_dead_code(root: str, jobs: int = 1, use_cache: bool = True,
+                                 cache_dir: str = DEFAULT_CACHE_DIR, exclude: Optional[Sequence[str]] = None):
+    """
+    Função CLI para identificar código morto considerando todo o repositório.
+    """
+    unused, errors, stats = find_repository_dead_code(root, jobs, use_cache, cache_dir, exclude)
+    print(f"\n🪦 Código Morto no repositório {root}:")
+    for path, error in errors:
+        print(f"Erro em {path}: {error}")
+    labels = {"function": "Função", "method": "Método", "class": "Classe"}
+    if unused:
+        print("Definições não utilizadas em nenhum módulo:")
+        for path, name, kind, line in unused:
+            print(f"  - {path}:{line} {labels[kind]} {name}")
+    else:
+        print("Nenhuma definição morta encontrada.")
+    if stats is not None:
+        print(f"Cache: {stats['hits']} acertos, {stats['misses']} falhas")
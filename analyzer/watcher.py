@@ -0,0 +1,257 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+
+from analyzer.directory_analysis import (
+    add_to_summary, analyze_one, analyze_files, finalize_summary, new_summary, remove_from_summary
+)
+from analyzer.file_walker import is_path_included, iter_python_files
+
+# Constantes de <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyBackend:
+    """Observa diretórios com inotify (Linux), sem dependências externas."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify indisponível")
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.watches: Dict[int, str] = {}
+
+    def add(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def read(self, timeout: float) -> List[tuple]:
+        """Retorna uma lista de (caminho, é_diretório) alterados, aguardando até `timeout`."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        changes = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_IGNORED:
+                    self.watches.pop(wd, None)
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                changes.append((path, bool(mask & IN_ISDIR)))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Alternativa portátil: compara fotografias (mtime, tamanho) da árvore."""
+
+    def __init__(self, root: str, include=None, exclude=None, interval: float = 0.5):
+        self.root = root
+        self.include = include
+        self.exclude = exclude
+        self.interval = interval
+        self.snapshot = self._take_snapshot()
+
+    def _take_snapshot(self) -> Dict[str, tuple]:
+        snapshot = {}
+        for path in iter_python_files(self.root, self.include, self.exclude):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def add(self, directory: str):
+        pass
+
+    def read(self, timeout: float) -> List[tuple]:
+        time.sleep(min(timeout, self.interval))
+        current = self._take_snapshot()
+        changed = [path for path, stamp in current.items() if self.snapshot.get(path) != stamp]
+        changed += [path for path in self.snapshot if path not in current]
+        self.snapshot = current
+        return [(path, False) for path in changed]
+
+    def close(self):
+        pass
+
+
+class WatchState:
+    """
+    Resultados em memória de um diretório observado.
+
+    Cada atualização subtrai dos totais a contribuição anterior do arquivo e
+    soma a nova, mantendo o bloco summary do all-dir sem recalculá-lo.
+    """
+
+    def __init__(self, root: str, include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None):
+        self.root = root
+        self.include = include
+        self.exclude = exclude
+        self.prefix = os.path.join(root, "")
+        self.files: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.summary = new_summary(0)
+        self.directories: List[str] = []
+
+    def summary_snapshot(self) -> Dict[str, Any]:
+        """Cópia dos totais atuais, para que eventos já emitidos não mudem depois."""
+        snapshot = dict(self.summary)
+        snapshot["total_methods"] = dict(self.summary["total_methods"])
+        return snapshot
+
+    def relative(self, path: str) -> str:
+        return path[len(self.prefix):].replace(os.sep, "/") if path.startswith(self.prefix) else path
+
+    def initial_scan(self, jobs: int = 1) -> Dict[str, Any]:
+        paths = list(iter_python_files(self.root, self.include, self.exclude,
+                                       on_directory=self.directories.append))
+        for path, file_metrics, _ in analyze_files(paths, jobs):
+            self.files[path] = file_metrics
+            if file_metrics is not None:
+                add_to_summary(self.summary, file_metrics)
+        self.summary["total_files"] = len(self.files)
+        finalize_summary(self.summary)
+        return {"event": "ready", "files": len(self.files), "summary": self.summary_snapshot()}
+
+    def expand(self, changes: List[tuple]) -> Set[str]:
+        """Converte alterações brutas (arquivos e diretórios) em arquivos a reanalisar."""
+        paths = set()
+        for path, is_dir in changes:
+            if is_dir or os.path.isdir(path):
+                prefix = os.path.join(path, "")
+                paths.update(p for p in self.files if p.startswith(prefix))
+                if os.path.isdir(path) and is_path_included(self.root, path, exclude=self.exclude, is_dir=True):
+                    paths.update(iter_python_files(path, self.include, self.exclude,
+                                                   on_directory=self.directories.append))
+            else:
+                paths.add(path)
+        return paths
+
+    def refresh(self, paths: Set[str]) -> List[Dict[str, Any]]:
+        """Reanalisa apenas os arquivos alterados e devolve um evento por arquivo."""
+        events = []
+        for path in sorted(paths):
+            known = path in self.files
+            exists = os.path.isfile(path)
+            if not known and not (exists and is_path_included(self.root, path, self.include, self.exclude)):
+                continue
+
+            start = time.perf_counter()
+            old = self.files.get(path)
+            if old is not None:
+                remove_from_summary(self.summary, old)
+
+            if not exists:
+                del self.files[path]
+                event = {"event": "delete", "file": self.relative(path)}
+            else:
+                _, file_metrics, error = analyze_one(path)
+                self.files[path] = file_metrics
+                if error is not None:
+                    event = {"event": "error", "file": self.relative(path), "error": error}
+                else:
+                    add_to_summary(self.summary, file_metrics)
+                    event = {"event": "update" if known else "add", "file": self.relative(path),
+                             "metrics": file_metrics}
+
+            self.summary["total_files"] = len(self.files)
+            finalize_summary(self.summary)
+            event["summary"] = self.summary_snapshot()
+            event["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+            events.append(event)
+        return events
+
+
+def watch_directory(
+    root: str,
+    emit: Callable[[Dict[str, Any]], None],
+    include: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None,
+    debounce: float = 0.05,
+    poll_interval: float = 0.5,
+    force_polling: bool = False,
+    jobs: int = 1,
+    should_stop: Callable[[], bool] = lambda: False,
+):
+    """
+    Observa `root` e emite um evento para cada arquivo reanalisado.
+
+    Usa inotify quando disponível e, caso contrário, compara fotografias de
+    mtime periodicamente. Alterações que chegam dentro da janela de `debounce`
+    segundos são agrupadas e cada arquivo é reanalisado uma única vez.
+    """
+    state = WatchState(root, include, exclude)
+    emit(state.initial_scan(jobs))
+
+    backend = None
+    if not force_polling:
+        try:
+            backend = InotifyBackend()
+            for directory in state.directories:
+                backend.add(directory)
+        except (OSError, AttributeError):
+            backend = None
+    if backend is None:
+        backend = PollingBackend(root, include, exclude, poll_interval)
+
+    watched = set(state.directories)
+    try:
+        while not should_stop():
+            changes = backend.read(timeout=0.25)
+            if not changes:
+                continue
+            # Debounce: agrupa as alterações que chegarem logo em seguida
+            deadline = time.monotonic() + debounce
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                more = backend.read(timeout=remaining)
+                if not more:
+                    break
+                changes.extend(more)
+
+            paths = state.expand(changes)
+            for directory in state.directories:
+                if directory not in watched:
+                    watched.add(directory)
+                    backend.add(directory)
+            for event in state.refresh(paths):
+                emit(event)
+    finally:
+        backend.close()
@@ -0,0 +1,93 @@
+"""
+Compara a análise de complexidade antiga (um ast.get_source_segment e um novo
+parse recursivo por função) com a travessia única e iterativa do motor.
+
+Gera módulos sintéticos com funções profundamente aninhadas e módulos muito
+grandes, e conta as chamadas a ast.parse de cada abordagem. A abordagem antiga
+é quadrática em módulos grandes (ast.get_source_segment percorre o texto
+inteiro a cada função), por isso só roda nos casos menores.
+
+Uso:
+    python -m benchmarks.bench_complexity
+"""
+import ast
+import sys
+import textwrap
+import time
+
+from benchmarks.bench_parse_count import count_calls
+from analyzer.metrics_engine import SourceAnalysis, complexity_label
+
+
+def legacy_complexity(code: str):
+    """Implementação anterior: re-parse e recursão para cada FunctionDef."""
+    def estimate(func_code):
+        tree = ast.parse(func_code)
+        max_depth = [0]
+
+        def visit(node, depth=0):
+            if isinstance(node, (ast.For, ast.While)):
+                depth += 1
+                max_depth[0] = max(max_depth[0], depth)
+            for child in ast.iter_child_nodes(node):
+                visit(child, depth)
+        visit(tree)
+        return complexity_label(max_depth[0])
+
+    tree = ast.parse(code)
+    results = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            func_code = textwrap.dedent(ast.get_source_segment(code, node))
+            results.append({'function': node.name, 'complexity': estimate(func_code)})
+    return results
+
+
+def nested_module(depth: int) -> str:
+    """Funções aninhadas umas nas outras, cada uma com um laço."""
+    lines = []
+    for i in range(depth):
+        indent = "    " * (2 * i)
+        lines.append(f"{indent}def f{i}(x):")
+        lines.append(f"{indent}    for v{i} in x:")
+    lines.append("    " * (2 * depth) + "pass")
+    return "\n".join(lines) + "\n"
+
+
+def large_module(functions: int) -> str:
+    body = (
+        "def f{n}(dados, limite):\n"
+        "    total = 0\n"
+        "    for linha in dados:\n"
+        "        for valor in linha:\n"
+        "            if valor > limite and valor % 2:\n"
+        "                total += valor\n"
+        "    return [x * 2 for x in dados if x]\n\n"
+    )
+    return "".join(body.format(n=n) for n in range(functions))
+
+
+def main():
+    legacy = ("antigo", legacy_complexity)
+    engine = ("motor", lambda c: SourceAnalysis(c).complexity)
+    cases = [
+        ("aninhado (45 níveis)", nested_module(45), (legacy, engine)),
+        ("grande (500 funções)", large_module(500), (legacy, engine)),
+        ("grande (20k funções)", large_module(20_000), (engine,)),
+    ]
+    print(f"{'Módulo':24} {'Modo':10} {'parse':>8} {'tempo (s)':>10}")
+    for label, code, runners in cases:
+        for mode, runner in runners:
+            with count_calls() as counts:
+                start = time.perf_counter()
+                try:
+                    runner(code)
+                    elapsed = f"{time.perf_counter() - start:10.3f}"
+                except RecursionError:
+                    elapsed = f"{'recursão':>10}"
+            print(f"{label:24} {mode:10} {counts['parse']:>8} {elapsed}")
+
+
+if __name__ == "__main__":
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 1000))
+    main()
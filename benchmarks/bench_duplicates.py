@@ -0,0 +1,66 @@
+"""
+Compara a detecção de duplicações antiga (uma varredura por tamanho de bloco,
+de 2 a 10 linhas) com o motor de clones máximos em arquivos sintéticos grandes:
+código com funções repetidas e entradas periódicas (linhas idênticas seguidas e
+um bloco curto repetido), o pior caso de quem estende clones por diagonal.
+
+Uso:
+    python -m benchmarks.bench_duplicates [linhas...]
+"""
+import random
+import sys
+import time
+
+from analyzer.analyze_duplicate_code import find_all_duplicates, find_duplicate_blocks
+
+
+def generate_code(total_lines: int, seed: int = 0) -> str:
+    """Gera código com funções repetidas (clones) misturadas a funções únicas."""
+    rng = random.Random(seed)
+    templates = []
+    for t in range(20):
+        size = rng.randint(3, 40)
+        body = [f"    v{t}_{i} = compute_{t}(x, {i})" for i in range(size)]
+        templates.append(body)
+
+    lines = []
+    n = 0
+    while len(lines) < total_lines:
+        lines.append(f"def funcao_{n}(x):")
+        if rng.random() < 0.5:
+            lines.extend(rng.choice(templates))
+        else:
+            lines.extend(f"    u{n}_{i} = {rng.random()}" for i in range(rng.randint(3, 30)))
+        lines.append("    return x")
+        lines.append("")
+        n += 1
+    return "\n".join(lines[:total_lines])
+
+
+def generate_periodic(total_lines: int, period: int) -> str:
+    """Gera `total_lines` linhas repetindo um bloco de `period` linhas."""
+    block = [f"v{i} = compute(x, {i})" for i in range(period)]
+    return "\n".join(block[i % period] for i in range(total_lines))
+
+
+def legacy(code: str):
+    """Comportamento anterior do modo automático: uma varredura por tamanho."""
+    return {size: find_duplicate_blocks(code, size) for size in range(2, 11)}
+
+
+def main(sizes):
+    print(f"{'Linhas':>8} {'Entrada':12} {'Modo':10} {'tempo (s)':>10} {'ocorrências':>12}")
+    for total in sizes:
+        inputs = (("funções", generate_code(total)), ("idênticas", generate_periodic(total, 1)),
+                  ("período 3", generate_periodic(total, 3)))
+        for name, code in inputs:
+            for mode, runner in (("antigo", legacy), ("máximos", find_all_duplicates)):
+                start = time.perf_counter()
+                result = runner(code)
+                elapsed = time.perf_counter() - start
+                found = sum(len(v) for v in result.values())
+                print(f"{total:>8} {name:12} {mode:10} {elapsed:>10.3f} {found:>12}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10_000, 50_000])
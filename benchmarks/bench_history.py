@@ -0,0 +1,92 @@
+"""
+Compara o `history` com a abordagem ingênua de fazer checkout de cada commit
+e rodar o all-dir nele, em um repositório git sintético.
+
+O repositório começa com o corpus sintético (benchmarks.corpus) e recebe
+`--commits` commits, cada um alterando `--changes` módulos: o caso comum de
+um histórico real, em que quase todos os arquivos se repetem entre commits.
+Os totais das duas abordagens são conferidos commit a commit.
+
+Uso:
+    python -m benchmarks.bench_history [--commits 30] [--changes 3] [--scale 0.05] [--jobs N]
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import time
+
+from typer.testing import CliRunner
+
+from analyzer.defaults import default_jobs
+from analyzer.main import app
+from benchmarks.corpus import generate_corpus
+
+
+def git(repo: str, *args: str) -> str:
+    return subprocess.run(["git", "-C", repo, *args], check=True, capture_output=True, text=True).stdout
+
+
+def build_repo(repo: str, commits: int, changes: int, scale: float, seed: int = 0):
+    """Repositório com o corpus no primeiro commit e `commits` commits com `changes` módulos alterados cada."""
+    generate_corpus(repo, scale, seed)
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "bench@exemplo.com")
+    git(repo, "config", "user.name", "bench")
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "corpus")
+    modules = sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(repo)
+                     if ".git" not in dirpath for name in names if name.endswith(".py"))
+    rng = random.Random(seed)
+    for n in range(commits):
+        for path in rng.sample(modules, changes):
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(f"\n\ndef adicionada_{n}(x):\n    # commit {n}\n    return x + {n}\n")
+        git(repo, "commit", "-qam", f"commit {n}")
+
+
+def json_output(args) -> dict:
+    result = CliRunner().invoke(app, args)
+    if result.exit_code != 0:
+        raise RuntimeError(f"{args[0]} terminou com código {result.exit_code}: {result.output[-500:]}")
+    return json.loads(result.output)["metrics"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara o history com um checkout + all-dir por commit.")
+    parser.add_argument("--commits", type=int, default=30, help="Commits após o inicial")
+    parser.add_argument("--changes", type=int, default=3, help="Módulos alterados por commit")
+    parser.add_argument("--scale", type=float, default=0.05, help="Escala do corpus")
+    parser.add_argument("--jobs", type=int, default=default_jobs(), help="Processos paralelos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        repo = os.path.join(workdir, "repo")
+        build_repo(repo, args.commits, args.changes, args.scale)
+        jobs = ["--jobs", str(args.jobs)]
+
+        start = time.perf_counter()
+        history = json_output(["history", repo, "--rev-range", "main", "--format", "json", *jobs])
+        history_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for record in history["commits"]:
+            git(repo, "checkout", "-q", record["commit"])
+            summary = json_output(["all-dir", repo, "--format", "json", "--no-cache", *jobs])["summary"]
+            if summary != record["summary"]:
+                raise RuntimeError(f"{record['commit']}: totais do history diferem do all-dir")
+        naive_time = time.perf_counter() - start
+
+    blobs = history["blobs"]
+    print(f"{len(history['commits'])} commits, {blobs['file_versions']} versões de arquivo, "
+          f"{blobs['distinct']} conteúdos distintos\n")
+    print(f"{'Abordagem':28} {'tempo (s)':>10}")
+    print(f"{'checkout + all-dir':28} {naive_time:10.2f}")
+    print(f"{'history':28} {history_time:10.2f}")
+    print(f"\nGanho: {naive_time / history_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
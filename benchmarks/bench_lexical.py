@@ -0,0 +1,105 @@
+"""
+Compara as métricas léxicas antigas (contagem de linhas, `"#" in line`,
+indentação e filtro de linhas em branco do tamanho de funções, cada uma com sua
+própria varredura do texto) com a varredura léxica única do motor.
+
+Também mede o tokenize da biblioteca padrão, que dá as mesmas contagens de
+comentários que a varredura, e mostra quantos `#` dentro de strings a contagem
+antiga tomava por comentários. O parse da AST (para os intervalos das funções)
+é feito uma vez, fora da medição.
+
+Uso:
+    python -m benchmarks.bench_lexical [megabytes...]
+"""
+import ast
+import io
+import sys
+import time
+import tokenize
+
+from analyzer.lexical import LexicalScan
+from analyzer.metrics_engine import indentation_stats, indentation_summary
+
+
+def generated_module(megabytes: float) -> str:
+    """Módulo sintético com comentários, docstrings e `#` dentro de strings."""
+    body = (
+        "class Servico{n}:\n"
+        "    \"\"\"Docstring com # que não é comentário.\n"
+        "\n"
+        "    Segunda linha da docstring.\n"
+        "    \"\"\"\n"
+        "\n"
+        "    # Comentário de classe\n"
+        "    def processar(self, dados):\n"
+        "        total = 0  # comentário no fim da linha\n"
+        "        for item in dados:\n"
+        "            if item.startswith('#'):\n"
+        "                continue\n"
+        "            total += len(f\"{{item}} #{n}\")\n"
+        "\n"
+        "        return total\n"
+        "\n"
+    )
+    block_size = len(body.format(n=0))
+    blocks = max(1, int(megabytes * 1_000_000 / block_size))
+    return "".join(body.format(n=n) for n in range(blocks))
+
+
+def function_ranges(code: str):
+    """(primeira, última) linha de cada função; o parse é o mesmo nos dois modos e fica fora da medição."""
+    return [(node.lineno, getattr(node, "end_lineno", None) or node.lineno) for node in ast.walk(ast.parse(code))
+            if isinstance(node, ast.FunctionDef)]
+
+
+def legacy_metrics(code: str, ranges):
+    """Implementação anterior: uma varredura do texto por métrica."""
+    lines = len(code.splitlines())
+    comments = sum(1 for line in code.split("\n") if "#" in line)
+    indentation = indentation_stats(code.split("\n"))
+    code_lines = code.split("\n")
+    sizes = sum(len([line for line in code_lines[first - 1:last] if line.strip()]) for first, last in ranges)
+    return lines, comments, indentation, sizes
+
+
+def scan_metrics(code: str, ranges):
+    """Varredura única: todas as métricas saem dos arrays por linha."""
+    scan = LexicalScan(code)
+    nonblank = scan.nonblank_prefix()
+    sizes = sum(nonblank[last] - nonblank[first - 1] for first, last in ranges)
+    return scan.line_count, scan.comment_count, indentation_summary(scan.indent_levels()), sizes
+
+
+def tokenize_comments(code: str, ranges) -> int:
+    """Comentários pelo tokenize (o que o comment-ratio usava antes da varredura)."""
+    rows = set()
+    for token in tokenize.generate_tokens(io.StringIO(code).readline):
+        if token.type == tokenize.COMMENT:
+            rows.add(token.start[0])
+    return len(rows)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{'Tamanho':>8} {'Modo':10} {'tempo (s)':>10} {'comentários':>12}")
+    for megabytes in sizes:
+        code = generated_module(megabytes)
+        ranges = function_ranges(code)
+        label = f"{len(code) / 1_000_000:.1f} MB"
+        legacy, legacy_time = timed(legacy_metrics, code, ranges)
+        scan, scan_time = timed(scan_metrics, code, ranges)
+        tokens, tokens_time = timed(tokenize_comments, code, ranges)
+        assert legacy[0] == scan[0] and legacy[2] == scan[2] and legacy[3] == scan[3]
+        assert tokens == scan[1]
+        print(f"{label:>8} {'antigo':10} {legacy_time:10.3f} {legacy[1]:>12}")
+        print(f"{label:>8} {'varredura':10} {scan_time:10.3f} {scan[1]:>12}")
+        print(f"{label:>8} {'tokenize':10} {tokens_time:10.3f} {tokens:>12}")
+
+
+if __name__ == "__main__":
+    main([float(arg) for arg in sys.argv[1:]] or [1, 4, 16])
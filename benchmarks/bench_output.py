@@ -0,0 +1,86 @@
+"""
+Compara os formatos de saída do `all-dir` em um relatório grande: tempo de
+gravação (format_output), tempo de leitura (load_output) e tamanho do arquivo.
+
+O relatório vem de uma análise real do corpus sintético (benchmarks.corpus),
+com as entradas por arquivo replicadas até `--files` arquivos, o tamanho dos
+relatórios dos repositórios grandes. Vale o melhor tempo entre as repetições.
+
+Uso:
+    python -m benchmarks.bench_output [--files 40000] [--repeat 3] [--scale 0.1]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict
+
+from typer.testing import CliRunner
+
+from analyzer.main import app
+from analyzer.output_formatter import format_output, load_output
+from benchmarks.corpus import generate_corpus
+
+# (nome, formato, compacto, extensão)
+VARIANTS = [
+    ("json", "json", False, ".json"),
+    ("json --compact", "json", True, ".json"),
+    ("json.gz", "json", False, ".json.gz"),
+    ("json --compact .gz", "json", True, ".json.gz"),
+    ("msgpack", "msgpack", False, ".msgpack"),
+    ("msgpack.gz", "msgpack", False, ".msgpack.gz"),
+]
+
+
+def build_report(workdir: str, files: int, scale: float) -> Dict[str, Any]:
+    """Relatório do all-dir no corpus sintético, com `files` entradas por arquivo."""
+    corpus = os.path.join(workdir, "corpus")
+    generate_corpus(corpus, scale)
+    output = os.path.join(workdir, "base.json")
+    result = CliRunner().invoke(app, ["all-dir", corpus, "--format", "json", "--no-cache", "--output", output])
+    if result.exit_code != 0:
+        raise RuntimeError(f"all-dir terminou com código {result.exit_code}: {result.output[-500:]}")
+    report = load_output(output)["metrics"]
+    analyzed = list(report["files"].items())
+    report["files"] = {}
+    for n in range(files):
+        path, metrics = analyzed[n % len(analyzed)]
+        report["files"][f"copia{n // len(analyzed)}/{path}"] = metrics
+    return report
+
+
+def best_time(function: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os formatos de saída em um relatório grande do all-dir.")
+    parser.add_argument("--files", type=int, default=40000, help="Arquivos no relatório")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições de cada medição")
+    parser.add_argument("--scale", type=float, default=0.1, help="Escala do corpus analisado")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        report = build_report(workdir, args.files, args.scale)
+        # O que qualquer formato deve devolver na leitura (chaves do JSON são strings)
+        expected = json.loads(json.dumps(report))
+        print(f"Relatório com {len(report['files'])} arquivos\n")
+        print(f"{'Formato':22} {'gravação (s)':>13} {'leitura (s)':>12} {'tamanho (MB)':>13}")
+        for name, format_type, compact, extension in VARIANTS:
+            path = os.path.join(workdir, "saida" + extension)
+            write = best_time(lambda: format_output(report, format_type, path, compact=compact), args.repeat)
+            read = best_time(lambda: load_output(path), args.repeat)
+            if load_output(path)["metrics"] != expected:
+                raise RuntimeError(f"{name}: os dados lidos diferem do relatório gravado")
+            size = os.path.getsize(path) / (1024 * 1024)
+            print(f"{name:22} {write:13.3f} {read:12.3f} {size:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Conta quantas vezes cada arquivo é lido e convertido em AST pelo comando `all`.
+
+Compara o caminho com métricas isoladas (cada métrica faz sua própria leitura
+e parse, como antes do motor compartilhado) com o motor compartilhado usado
+por `analyzer all`.
+
+Uso:
+    python -m benchmarks.bench_parse_count [arquivos...]
+"""
+import ast
+import builtins
+import contextlib
+import glob
+import io
+import sys
+import time
+from collections import defaultdict
+
+from analyzer.analyze_classes import count_classes
+from analyzer.analyze_comment_ratio import ProporcaoComentarioCodigo
+from analyzer.analyze_comments import count_comments
+from analyzer.analyze_complexity import analyze_complexity_code
+from analyzer.analyze_dead_code import analyze_dead_code
+from analyzer.analyze_docstrings import count_docstrings
+from analyzer.analyze_functions import count_functions
+from analyzer.analyze_indentation import count_indentation
+from analyzer.analyze_lines import count_lines
+from analyzer.analyze_methods import count_methods
+from analyzer.dependency_analyzer import get_external_imports
+from analyzer.main import analyze_all
+from analyzer.metrics_engine import get_analysis
+
+
+@contextlib.contextmanager
+def count_calls():
+    """Instrumenta ast.parse e open, acumulando as chamadas em um dicionário."""
+    counts = {"parse": 0, "open": 0}
+    original_parse, original_open = ast.parse, builtins.open
+
+    def parse(*args, **kwargs):
+        counts["parse"] += 1
+        return original_parse(*args, **kwargs)
+
+    def open_(*args, **kwargs):
+        counts["open"] += 1
+        return original_open(*args, **kwargs)
+
+    ast.parse, builtins.open = parse, open_
+    try:
+        yield counts
+    finally:
+        ast.parse, builtins.open = original_parse, original_open
+
+
+def run_isolated(file_path: str):
+    """Executa cada métrica separadamente, sem compartilhar o parse."""
+    steps = [
+        count_lines, count_comments, count_docstrings, count_classes,
+        count_functions, count_methods, analyze_complexity_code, analyze_dead_code,
+    ]
+    with open(file_path, "r", encoding="utf-8") as f:
+        code = f.read()
+    for step in steps:
+        get_analysis.cache_clear()
+        step(code)
+    count_indentation(file_path)
+    get_external_imports(file_path, defaultdict(int))
+    ProporcaoComentarioCodigo(file_path).analisar()
+
+
+def run_shared(file_path: str):
+    """Executa o comando `all` com o motor compartilhado."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyze_all(file_path, format="json", output=None, compact=False, metrics=None, large_file_mb=None, max_memory_mb=1024)
+
+
+def main(paths):
+    print(f"{'Arquivo':40} {'Modo':10} {'parse':>6} {'open':>6} {'tempo (ms)':>11}")
+    for path in paths:
+        for mode, runner in (("isolado", run_isolated), ("motor", run_shared)):
+            get_analysis.cache_clear()
+            with count_calls() as counts:
+                start = time.perf_counter()
+                runner(path)
+                elapsed = (time.perf_counter() - start) * 1000
+            print(f"{path[-40:]:40} {mode:10} {counts['parse']:>6} {counts['open']:>6} {elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or sorted(glob.glob("examples/*.py")))
@@ -0,0 +1,116 @@
+"""
+Mede o tempo de partida da CLI: cada comando é executado em um processo novo,
+como faz a integração com editores, e vale o melhor tempo de parede entre as
+repetições. Uma execução extra com `python -X importtime` mostra os módulos
+que mais pesam na importação e se o rich foi carregado.
+
+Os comandos simples de contagem (lines, comments, docstrings, classes,
+functions e methods) têm orçamento de 100 ms: a suíte termina com código 1 se
+algum deles passar do orçamento (`--budget-ms`). `--version` dá o piso (o
+interpretador e o typer); indent e all entram só para comparação, já que
+renderizam tabelas com o rich.
+
+Os .pyc do analyzer são gerados antes das medições, como numa instalação com
+pip (com PYTHONDONTWRITEBYTECODE, o Python compilaria os fontes a cada
+execução).
+
+Uso:
+    python -m benchmarks.bench_startup [--file examples/sample.py] [--repeat 10]
+    python -m benchmarks.bench_startup --budget-ms 100 --output partida.json
+"""
+import argparse
+import compileall
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import analyzer
+
+# Mesmo ponto de entrada do script `analyzer` instalado
+ENTRY_POINT = "from analyzer.main import cli_main; cli_main()"
+
+SIMPLE_COMMANDS = ["lines", "comments", "docstrings", "classes", "functions", "methods"]
+OTHER_COMMANDS = ["indent", "all"]
+DEFAULT_BUDGET_MS = 100
+DEFAULT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "sample.py")
+
+
+def run_cli(args: List[str], importtime: bool = False) -> Tuple[float, str]:
+    """Executa a CLI em um processo novo; retorna (segundos, stderr)."""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", ENTRY_POINT] + args
+    start = time.perf_counter()
+    process = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0 and not importtime:
+        raise RuntimeError(f"{' '.join(args)} terminou com código {process.returncode}: {process.stderr[-500:]}")
+    return elapsed, process.stderr
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Tempo acumulado (µs) de cada import de primeiro nível na saída do -X importtime."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def measure(command: str, file: str, repeat: int) -> Dict:
+    args = [command] if command.startswith("-") else [command, file]
+    best = min(run_cli(args)[0] for _ in range(repeat))
+    _, stderr = run_cli(args, importtime=True)
+    imports = parse_importtime(stderr)
+    heaviest = sorted(imports.items(), key=lambda item: -item[1])[:5]
+    return {
+        "ms": round(best * 1000, 1),
+        "import_ms": round(sum(imports.values()) / 1000, 1),
+        "rich_loaded": any(name == "rich" or name.startswith("rich.") for name in imports),
+        "heaviest_imports": {name: round(us / 1000, 1) for name, us in heaviest},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de partida da CLI do analyzer.")
+    parser.add_argument("--file", default=DEFAULT_FILE, help="Arquivo Python analisado pelos comandos")
+    parser.add_argument("--repeat", type=int, default=10, help="Execuções de cada comando (vale a melhor)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Orçamento dos comandos simples (ms)")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    args = parser.parse_args(argv)
+
+    compileall.compile_dir(os.path.dirname(analyzer.__file__), quiet=1)
+
+    results = {}
+    for command in ["--version"] + SIMPLE_COMMANDS + OTHER_COMMANDS:
+        results[command] = measure(command, args.file, args.repeat)
+
+    print(f"{'Comando':12} {'tempo (ms)':>10} {'imports (ms)':>12} {'rich':>5}  imports mais pesados")
+    over_budget = []
+    for command, result in results.items():
+        label = f"{result['ms']:10.1f}"
+        if command in SIMPLE_COMMANDS and result["ms"] > args.budget_ms:
+            over_budget.append(command)
+            label += " ❌"
+        heaviest = ", ".join(f"{name} {ms}" for name, ms in result["heaviest_imports"].items())
+        print(f"{command:12} {label:>10} {result['import_ms']:12.1f} {'sim' if result['rich_loaded'] else 'não':>5}  {heaviest}")
+
+    if args.output:
+        report = {"python": sys.version.split()[0], "budget_ms": args.budget_ms, "results": results}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"✅ Resultados salvos em: {args.output}")
+
+    if over_budget:
+        print(f"❌ Acima do orçamento de {args.budget_ms:g} ms: {', '.join(over_budget)}")
+        return 1
+    print(f"✅ Comandos simples dentro do orçamento de {args.budget_ms:g} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
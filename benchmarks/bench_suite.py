@@ -0,0 +1,78 @@
+"""
+Suíte de benchmarks: gera o corpus sintético, mede cada analisador público e
+os comandos `all`/`all-dir`, e grava o resultado em JSON.
+
+Com `--compare`, o resultado é comparado a uma linha de base salva antes
+(por exemplo, do branch principal): a suíte termina com código 1 se o
+throughput de alguma medição cair mais que `--threshold` (padrão: 20%).
+
+Uso:
+    python -m benchmarks.bench_suite [--scale 1.0] [--repeat 3] [--output resultado.json]
+    python -m benchmarks.bench_suite --output base.json
+    python -m benchmarks.bench_suite --compare base.json [--threshold 0.2]
+"""
+import argparse
+import json
+import sys
+import tempfile
+
+from analyzer.benchmark import (
+    BENCHMARKS, DEFAULT_REPEAT, DEFAULT_THRESHOLD, compare_reports, load_report, run_benchmarks
+)
+from benchmarks.corpus import generate_corpus
+
+
+def print_report(report, comparison=None):
+    changes = {item["benchmark"]: item for item in comparison or []}
+    print(f"{report['files']} arquivos, {report['bytes'] / 1_000_000:.1f} MB, melhor de {report['repeat']}")
+    print(f"{'Medição':26} {'tempo (s)':>10} {'arq/s':>10} {'MB/s':>8} {'variação':>9}")
+    for name, result in report["results"].items():
+        change = changes.get(name)
+        label = f"{change['change']:+.0%}" if change else "-"
+        if change and change["regression"]:
+            label += " ❌"
+        print(f"{name:26} {result['seconds']:10.3f} {result['files_per_s']:>10} {result['mb_per_s']:>8} {label:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do analyzer.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Escala do corpus sintético")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador")
+    parser.add_argument("--corpus", help="Diretório do corpus (padrão: temporário, gerado a cada execução)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Repetições de cada medição")
+    parser.add_argument("--jobs", type=int, default=1, help="Processos do all-dir e do analyze_repository")
+    parser.add_argument("--only", action="append", choices=BENCHMARKS, help="Mede só o analisador informado (pode repetir)")
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    parser.add_argument("--compare", help="Relatório JSON da linha de base")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Queda máxima de throughput aceita")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temporary:
+        corpus = args.corpus or temporary
+        generate_corpus(corpus, args.scale, args.seed)
+        report = run_benchmarks(corpus, repeat=args.repeat, jobs=args.jobs, only=args.only)
+    report["corpus"] = {"scale": args.scale, "seed": args.seed}
+
+    comparison = None
+    if args.compare:
+        baseline = load_report(args.compare)
+        if baseline.get("corpus") != report["corpus"]:
+            print(f"⚠️ A linha de base usou outro corpus ({baseline.get('corpus')}): a comparação não é equivalente")
+        comparison = compare_reports(report, baseline, args.threshold)
+        report["comparison"] = comparison
+    print_report(report, comparison)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4, ensure_ascii=False)
+        print(f"✅ Resultados salvos em: {args.output}")
+
+    regressions = [item["benchmark"] for item in comparison or [] if item["regression"]]
+    if regressions:
+        print(f"❌ Regressão de throughput acima de {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Gerador determinístico de corpora Python sintéticos para os benchmarks.
+
+A mesma semente e a mesma escala produzem sempre os mesmos arquivos, byte a
+byte. O corpus mistura os casos que pesam em cada analisador:
+
+- small/: muitos módulos pequenos (classes, métodos, comentários, imports);
+- huge/: poucos módulos enormes, abaixo do limiar de streaming;
+- nested/: código profundamente aninhado (laços, ifs e funções internas);
+- duplicates/: módulos com muitas funções copiadas entre si.
+
+Uso:
+    python -m benchmarks.corpus <diretório> [escala] [semente]
+"""
+import os
+import random
+import sys
+from typing import Dict, List
+
+STDLIB_IMPORTS = ["os", "sys", "json", "re", "itertools", "collections", "typing"]
+THIRD_PARTY_IMPORTS = ["requests", "numpy", "yaml", "rich", "typer"]
+
+
+def small_module(rng: random.Random, index: int) -> str:
+    """Módulo pequeno com imports, uma classe, funções e comentários."""
+    lines = [f'"""Módulo {index} gerado para benchmark."""']
+    for name in rng.sample(STDLIB_IMPORTS, 2) + rng.sample(THIRD_PARTY_IMPORTS, 1):
+        lines.append(f"import {name}")
+    lines.append(f"from small.mod{(index + 1) % 997} import funcao_0 as externa")
+    lines.append("")
+    lines.append(f"class Servico{index}:")
+    lines.append('    """Serviço com métodos públicos e privados."""')
+    for m in range(rng.randint(2, 6)):
+        name = f"_interno{m}" if m % 3 == 2 else f"metodo{m}"
+        lines.append(f"    def {name}(self, x):")
+        lines.append(f"        # passo {m}")
+        lines.append(f"        return x * {rng.randint(1, 9)} + len('#{m}')")
+        lines.append("")
+    for f in range(rng.randint(2, 8)):
+        lines.append(f"def funcao_{f}(dados):")
+        lines.append(f'    """Soma os itens válidos ({f})."""')
+        lines.append("    total = 0")
+        lines.append("    for item in dados:")
+        lines.append(f"        if item > {rng.randint(0, 50)}:  # filtro")
+        lines.append("            total += item")
+        lines.append("    return total")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def huge_module(rng: random.Random, target_bytes: int) -> str:
+    """Módulo enorme: muitas classes e funções variadas até `target_bytes`."""
+    parts: List[str] = ["import os\nimport json\n\n"]
+    size = 0
+    n = 0
+    while size < target_bytes:
+        body = (
+            f"class Registro{n}:\n"
+            f"    \"\"\"Registro {n}.\"\"\"\n"
+            f"    campos = {[rng.randint(0, 999) for _ in range(5)]}\n\n"
+            f"    def validar(self, valor):\n"
+            f"        # valida o registro {n}\n"
+            f"        while valor > {rng.randint(1, 9)}:\n"
+            f"            valor -= 1\n"
+            f"        return valor in self.campos\n\n"
+            f"def carregar_{n}(caminho):\n"
+            f"    with open(caminho) as f:\n"
+            f"        return json.load(f).get('{n}', Registro{n}())\n\n"
+        )
+        parts.append(body)
+        size += len(body)
+        n += 1
+    return "".join(parts)
+
+
+def nested_module(rng: random.Random, depth: int) -> str:
+    """Funções com `depth` níveis de aninhamento (laços, ifs e funções internas)."""
+    lines = []
+    for f in range(10):
+        lines.append(f"def profunda_{f}(dados):")
+        indent = "    "
+        loops = 0
+        for level in range(depth):
+            choice = rng.random()
+            # O Python limita a 20 os blocos de laço aninhados estaticamente
+            if choice < 0.4 and loops < 18:
+                lines.append(f"{indent}for v{level} in dados:")
+                loops += 1
+            elif choice < 0.8:
+                lines.append(f"{indent}if len(dados) > {level}:  # nível {level}")
+            else:
+                lines.append(f"{indent}def interna_{level}(dados=dados):")
+                loops = 0
+            indent += "    "
+        lines.append(f"{indent}pass")
+        lines.append("    return dados")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def duplicate_module(rng: random.Random, templates: List[str], index: int) -> str:
+    """Módulo montado quase só com cópias das mesmas funções."""
+    parts = []
+    for n in range(40):
+        if rng.random() < 0.8:
+            parts.append(rng.choice(templates).format(n=f"{index}_{n}"))
+        else:
+            parts.append(f"def unica_{index}_{n}(x):\n    return x ** {n}\n\n")
+    return "".join(parts)
+
+
+def duplicate_templates(rng: random.Random) -> List[str]:
+    templates = []
+    for t in range(8):
+        body = "".join(f"    v{i} = calcular_{t}(x, {i})\n" for i in range(rng.randint(5, 30)))
+        templates.append(f"def copia_{t}_{{n}}(x):\n{body}    return x\n\n")
+    return templates
+
+
+def generate_corpus(root: str, scale: float = 1.0, seed: int = 0) -> Dict[str, int]:
+    """
+    Escreve o corpus sintético em `root` e retorna {subdiretório: arquivos}.
+
+    `scale` multiplica a quantidade de arquivos pequenos e o tamanho dos enormes.
+    """
+    rng = random.Random(seed)
+    counts = {}
+
+    def write(folder: str, name: str, code: str):
+        directory = os.path.join(root, folder)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, name), "w", encoding="utf-8", newline="\n") as f:
+            f.write(code)
+        counts[folder] = counts.get(folder, 0) + 1
+
+    write("small", "__init__.py", "")
+    for i in range(max(1, int(300 * scale))):
+        write("small", f"mod{i}.py", small_module(rng, i))
+    for i in range(2):
+        write("huge", f"gerado{i}.py", huge_module(rng, max(10_000, int(2_000_000 * scale))))
+    for i in range(5):
+        write("nested", f"aninhado{i}.py", nested_module(rng, depth=30 + 5 * i))
+    templates = duplicate_templates(rng)
+    for i in range(max(1, int(20 * scale))):
+        write("duplicates", f"copias{i}.py", duplicate_module(rng, templates, i))
+    return counts
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    for folder, count in generate_corpus(sys.argv[1], scale, seed).items():
+        print(f"{folder}: {count} arquivos")
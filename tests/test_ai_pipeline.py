@@ -0,0 +1,154 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from typer.testing import CliRunner
+
+from analyzer.ai_pipeline import AIRequestPipeline, TokenBucket, backoff_delay
+from analyzer.analyze_bugs_ai import BugPredictorAI
+from analyzer.main import app
+
+class ServidorFalso(BaseHTTPRequestHandler):
+    """API de chat completions compatível com a OpenAI, com falhas conforme o código enviado."""
+
+    def do_POST(self):
+        estado = self.server.estado
+        corpo = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = corpo["messages"][-1]["content"]
+        with estado["lock"]:
+            estado["chamadas"] += 1
+            estado["em_andamento"] += 1
+            estado["pico"] = max(estado["pico"], estado["em_andamento"])
+            tentativa = estado["tentativas"][prompt] = estado["tentativas"].get(prompt, 0) + 1
+        try:
+            time.sleep(0.3 if "lento" in prompt else 0.05)
+            if "limite" in prompt and tentativa == 1:
+                return self.responder(429, {"error": "rate limit"}, {"Retry-After": "0"})
+            if "instavel" in prompt and tentativa < 3:
+                return self.responder(503, {"error": "indisponível"})
+            if "proibido" in prompt:
+                return self.responder(400, {"error": "requisição inválida"})
+            analise = {"problems": [{"severity": "high", "description": "x"}], "summary": {"total_problems": 1}}
+            self.responder(200, {"choices": [{"message": {"content": json.dumps(analise)}}]})
+        finally:
+            with estado["lock"]:
+                estado["em_andamento"] -= 1
+
+    def responder(self, status, dados, cabecalhos=None):
+        corpo = json.dumps(dados).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def servidor():
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorFalso)
+    servidor.estado = {"lock": threading.Lock(), "chamadas": 0, "em_andamento": 0, "pico": 0, "tentativas": {}}
+    thread = threading.Thread(target=servidor.serve_forever, daemon=True)
+    thread.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+def url(servidor):
+    return f"http://127.0.0.1:{servidor.server_address[1]}/v1/chat/completions"
+
+@pytest.fixture
+def projeto(tmp_path):
+    projeto = tmp_path / "projeto"
+    projeto.mkdir()
+    for nome in ["lento", "limite", "instavel", "proibido", "a", "b", "c"]:
+        (projeto / f"{nome}.py").write_text(f"# {nome}\nx = 1\n", encoding="utf-8")
+    return projeto
+
+async def analisar_async(pipeline, caminhos):
+    return [registro async for registro in pipeline.run(caminhos)]
+
+def analisar(pipeline, caminhos):
+    return asyncio.run(analisar_async(pipeline, caminhos))
+
+def test_pipeline_retries_and_bounds_concurrency(servidor, projeto, tmp_path):
+    predictor = BugPredictorAI(api_key="teste", api_url=url(servidor), cache_dir=str(tmp_path / "cache"))
+    pipeline = AIRequestPipeline(predictor, concurrency=3, max_retries=3, use_cache=False, backoff_base=0.01)
+    caminhos = sorted(str(caminho) for caminho in projeto.iterdir())
+    registros = {registro["file"].rsplit("/", 1)[-1]: registro for registro in analisar(pipeline, caminhos)}
+
+    assert len(registros) == 7
+    assert (registros["limite.py"]["attempts"], registros["instavel.py"]["attempts"]) == (2, 3)
+    assert registros["proibido.py"]["attempts"] == 1 and "HTTP 400" in registros["proibido.py"]["error"]
+    assert all(registros[nome]["problems"] for nome in ["a.py", "lento.py", "limite.py", "instavel.py"])
+    assert 2 <= servidor.estado["pico"] <= 3
+    assert pipeline.stats == {"files": 7, "cached": 0, "requests": 10, "retries": 3, "errors": 1}
+
+def test_results_stream_in_completion_order(servidor, projeto, tmp_path):
+    predictor = BugPredictorAI(api_key="teste", api_url=url(servidor), cache_dir=str(tmp_path / "cache"))
+    pipeline = AIRequestPipeline(predictor, concurrency=2, use_cache=False)
+    caminhos = [str(projeto / nome) for nome in ["lento.py", "a.py", "b.py", "c.py"]]
+    ordem = [registro["file"] for registro in analisar(pipeline, caminhos)]
+    assert ordem[-1] == caminhos[0] and sorted(ordem) == sorted(caminhos)
+
+    # Com o cache, a segunda execução não faz requisições
+    pipeline = AIRequestPipeline(predictor, concurrency=2)
+    analisar(pipeline, caminhos)
+    chamadas = servidor.estado["chamadas"]
+    pipeline = AIRequestPipeline(predictor, concurrency=2)
+    assert all(registro["cached"] for registro in analisar(pipeline, caminhos))
+    assert servidor.estado["chamadas"] == chamadas and pipeline.stats["cached"] == 4
+
+def test_unexpected_error_becomes_a_record(projeto, tmp_path):
+    class PredictorQuebrado(BugPredictorAI):
+        def _build_request(self, code, language):
+            if code.startswith("# a\n"):
+                raise ValueError("falha ao montar a requisição")
+            return super()._build_request(code, language)
+
+    predictor = PredictorQuebrado(api_key="teste", api_url="http://127.0.0.1:9/", cache_dir=str(tmp_path / "cache"))
+    pipeline = AIRequestPipeline(predictor, concurrency=2, max_retries=0, use_cache=False)
+    caminhos = [str(projeto / nome) for nome in ["a.py", "b.py"]]
+
+    # Antes, a exceção matava o worker e run() esperava para sempre
+    resultado = asyncio.run(asyncio.wait_for(analisar_async(pipeline, caminhos), 10))
+    registros = {registro["file"]: registro for registro in resultado}
+    assert registros[caminhos[0]]["error"] == "Erro inesperado: falha ao montar a requisição"
+    assert "Erro na requisição" in registros[caminhos[1]]["error"]
+    assert pipeline.stats["errors"] == 2
+
+def test_token_bucket_reserves_in_order():
+    agora = [0.0]
+    balde = TokenBucket(60, clock=lambda: agora[0])
+    assert [balde.reserve() for _ in range(60)] == [0.0] * 60
+    assert balde.reserve() == pytest.approx(1.0)
+    assert balde.reserve() == pytest.approx(2.0)
+    agora[0] = 10.0
+    assert balde.reserve() == 0.0
+    # Pedidos maiores que o balde esperam o balde cheio, não para sempre
+    tokens = TokenBucket(1000, clock=lambda: agora[0])
+    assert tokens.reserve(5000) == 0.0 and tokens.reserve(500) == pytest.approx(30.0)
+
+def test_backoff_delay_has_jitter_and_honors_retry_after():
+    atrasos = {backoff_delay(3, 1.0, 60.0) for _ in range(20)}
+    assert len(atrasos) > 1 and all(0 <= atraso <= 8 for atraso in atrasos)
+    assert backoff_delay(10, 1.0, 5.0) <= 5.0
+    assert backoff_delay(0, 0.01, 1.0, "2") == 2.0
+
+def test_cli_dir_streams_ndjson(servidor, projeto, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    for nome in ["proibido.py", "instavel.py"]:
+        (projeto / nome).unlink()
+    resultado = CliRunner().invoke(app, ["bugs-ai", "--dir", str(projeto), "--api-key", "teste", "--api-url",
+                                         url(servidor), "--format", "ndjson", "--no-cache", "-c", "4"])
+    assert resultado.exit_code == 0, resultado.output
+    linhas = [json.loads(linha) for linha in resultado.output.splitlines()]
+    assert [linha["type"] for linha in linhas] == ["file"] * 5 + ["summary"]
+    assert sorted(linha["file"] for linha in linhas[:-1]) == ["a.py", "b.py", "c.py", "lento.py", "limite.py"]
+    assert linhas[-1]["severities"]["high"] == 5 and linhas[-1]["errors"] == 0
@@ -0,0 +1,57 @@
+import ast
+from analyzer.ast_clones import SubtreeHasher, find_ast_clones
+
+def test_identifiers_and_constants_are_abstracted():
+    hasher = SubtreeHasher()
+    a = [sid for n, _, sid, _ in hasher.hash_tree(ast.parse("total = a + 1")) if isinstance(n, ast.stmt)]
+    b = [sid for n, _, sid, _ in hasher.hash_tree(ast.parse("soma = b + 2")) if isinstance(n, ast.stmt)]
+    c = [sid for n, _, sid, _ in hasher.hash_tree(ast.parse("soma = b - 2")) if isinstance(n, ast.stmt)]
+    assert a == b
+    assert a != c
+
+def test_renamed_function_is_a_clone():
+    code = """
+def media(valores):
+    total = 0
+    for v in valores:
+        if v > 0:
+            total += v
+    return total / len(valores)
+
+def calcula(itens):
+    soma = 10
+    for item in itens:
+        if item > 5:
+            soma += item
+    return soma / len(itens)
+
+def outra(x):
+    return x
+"""
+    groups, errors = find_ast_clones([("a.py", code)], min_nodes=10)
+    assert errors == []
+    assert len(groups) == 1
+    assert groups[0]["kind"] == "FunctionDef"
+    assert groups[0]["occurrences"] == [("a.py", 2, 7, "media"), ("a.py", 9, 14, "calcula")]
+
+def test_nested_clones_reported_only_in_parent_group():
+    funcao = """
+def f{n}(dados):
+    for d in dados:
+        if d:
+            print(d, d + 1, d * 2)
+"""
+    code = funcao.format(n=1) + funcao.format(n=2)
+    groups, _ = find_ast_clones([("a.py", code)], min_nodes=5)
+    assert [g["kind"] for g in groups] == ["FunctionDef"]
+
+def test_clones_across_files():
+    code_a = "def f(x):\n    return [i * x for i in range(10) if i % 2]\n"
+    code_b = "import os\n\ndef g(y):\n    return [j * y for j in range(3) if j % 5]\n"
+    groups, _ = find_ast_clones([("a.py", code_a), ("b.py", code_b)], min_nodes=10)
+    assert groups[0]["occurrences"] == [("a.py", 1, 2, "f"), ("b.py", 3, 4, "g")]
+
+def test_syntax_error_reported():
+    groups, errors = find_ast_clones([("a.py", "def f(:\n")])
+    assert groups == []
+    assert errors[0][0] == "a.py"
@@ -0,0 +1,36 @@
+import filecmp
+
+from analyzer.benchmark import BENCHMARKS, FILE_ANALYZERS, compare_reports, run_benchmarks
+from analyzer.defaults import FILE_BENCHMARKS
+from benchmarks.corpus import generate_corpus
+
+def test_corpus_is_deterministic(tmp_path):
+    first, second = tmp_path / "a", tmp_path / "b"
+    counts = generate_corpus(str(first), scale=0.02, seed=3)
+    generate_corpus(str(second), scale=0.02, seed=3)
+    assert set(counts) == {"small", "huge", "nested", "duplicates"}
+    comparison = filecmp.dircmp(first, second)
+    assert not comparison.diff_files and not comparison.left_only and not comparison.right_only
+    for folder in counts:
+        assert not filecmp.dircmp(first / folder, second / folder).diff_files
+
+def test_run_benchmarks_reports_throughput(tmp_path):
+    generate_corpus(str(tmp_path), scale=0.02)
+    report = run_benchmarks(str(tmp_path), repeat=1, only=["count_lines", "analyze_dead_code", "all-dir"])
+    assert list(report["results"]) == ["count_lines", "analyze_dead_code", "all-dir"]
+    assert report["files"] == sum(1 for _ in tmp_path.rglob("*.py"))
+    for result in report["results"].values():
+        assert result["errors"] == 0
+        assert result["mb_per_s"] > 0
+
+def test_compare_flags_regressions():
+    baseline = {"results": {name: {"mb_per_s": 10.0} for name in BENCHMARKS}}
+    current = {"results": {"count_lines": {"mb_per_s": 7.0}, "all": {"mb_per_s": 9.5}, "novo": {"mb_per_s": 1.0}}}
+    comparison = {item["benchmark"]: item for item in compare_reports(current, baseline, threshold=0.2)}
+    assert set(comparison) == {"count_lines", "all"}
+    assert comparison["count_lines"]["regression"] and comparison["count_lines"]["change"] == -0.3
+    assert not comparison["all"]["regression"]
+
+def test_cli_benchmark_names_match_analyzers():
+    assert list(FILE_ANALYZERS) == FILE_BENCHMARKS
+    assert BENCHMARKS[:len(FILE_BENCHMARKS)] == FILE_BENCHMARKS
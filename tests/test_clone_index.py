@@ -0,0 +1,70 @@
+from analyzer.clone_index import CloneIndex, find_cross_file_clones, fingerprint_code, winnow
+
+CORPO = "\n".join(f"    total_{i} = calcula(valores[{i}], limite={i})" for i in range(15))
+
+def criar_arquivo(tmp_path, nome, conteudo):
+    path = tmp_path / nome
+    path.write_text(conteudo, encoding="utf-8")
+    return str(path)
+
+def test_winnow_selects_rightmost_minimum():
+    assert winnow([5, 3, 4, 3, 9, 8], 3) == [(1, 3), (3, 3)]
+    assert winnow([7, 2], 4) == [(1, 2)]
+    assert winnow([], 4) == []
+
+def test_fingerprints_ignore_comments_and_indentation():
+    original = "def f(x):\n" + CORPO + "\n"
+    reformatado = "def f(x):\n    # comentário\n" + CORPO.replace("    ", "        ") + "\n"
+    assert [h for h, *_ in fingerprint_code(original)] == [h for h, *_ in fingerprint_code(reformatado)]
+
+def test_cross_file_clone_class(tmp_path):
+    paths = [
+        criar_arquivo(tmp_path, "a.py", "import os\n\ndef a(valores, limite):\n" + CORPO + "\n"),
+        criar_arquivo(tmp_path, "b.py", "def b(valores, limite):\n" + CORPO + "\n    return 1\n"),
+        criar_arquivo(tmp_path, "c.py", "x = 1\n"),
+    ]
+    classes, errors, _ = find_cross_file_clones(paths, cache_dir=None)
+    assert errors == []
+    assert len(classes) == 1
+    fragmentos = classes[0]["fragments"]
+    assert [f[0] for f in fragmentos] == paths[:2]
+    assert fragmentos[0][1] >= 3 and fragmentos[0][2] <= 18
+    assert fragmentos[1][1] >= 1 and fragmentos[1][2] <= 16
+
+def test_clone_copied_to_many_files_forms_one_class(tmp_path):
+    paths = [criar_arquivo(tmp_path, f"m{i}.py", f"def f{i}(valores, limite):\n" + CORPO + "\n")
+             for i in range(5)]
+    classes, _, _ = find_cross_file_clones(paths, cache_dir=None)
+    assert len(classes) == 1
+    assert len(classes[0]["fragments"]) == 5
+
+def test_index_only_fingerprints_changed_files(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    a = criar_arquivo(tmp_path, "a.py", "def a():\n" + CORPO + "\n")
+    b = criar_arquivo(tmp_path, "b.py", "def b():\n" + CORPO + "\n")
+    assert find_cross_file_clones([a, b], cache_dir=cache_dir)[2] == 2
+
+    classes, _, fingerprinted = find_cross_file_clones([a, b], cache_dir=cache_dir)
+    assert fingerprinted == 0
+    assert len(classes) == 1
+
+    criar_arquivo(tmp_path, "b.py", "def b():\n    return 0\n")
+    classes, _, fingerprinted = find_cross_file_clones([a, b], cache_dir=cache_dir)
+    assert fingerprinted == 1
+    assert classes == []
+
+def test_index_drops_removed_files_under_root(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    a = criar_arquivo(tmp_path, "a.py", "def a():\n" + CORPO + "\n")
+    b = criar_arquivo(tmp_path, "b.py", "def b():\n" + CORPO + "\n")
+    find_cross_file_clones([a, b], root=str(tmp_path), cache_dir=cache_dir)
+    find_cross_file_clones([a], root=str(tmp_path), cache_dir=cache_dir)
+    index = CloneIndex(cache_dir)
+    assert [p for (p,) in index.conn.execute("SELECT path FROM files")] == [a]
+    index.close()
+
+def test_tokenize_error_is_reported(tmp_path):
+    a = criar_arquivo(tmp_path, "a.py", "x = (1,\n")
+    classes, errors, _ = find_cross_file_clones([a], cache_dir=None)
+    assert classes == []
+    assert errors[0][0] == a
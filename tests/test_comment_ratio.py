@@ -1,6 +1,9 @@
 import unittest
 import tempfile
 import os
+import ast
+import io
+import tokenize
 from analyzer.analyze_comment_ratio import ProporcaoComentarioCodigo
 
 class TestProporcaoComentarioCodigo(unittest.TestCase):
@@ -95,6 +98,29 @@ class Vazia:
         self.assertEqual(resultado[0]['nome'], 'Classe: Vazia')
         self.assertGreaterEqual(resultado[0]['comentarios'], 1)
 
+    def test_unidade_termina_no_fim_do_bloco_aninhado(self):
+        code = '''\
+def externa():
+    if True:
+        x = 1
+        # comentário dentro do if
+        return x
+'''
+        resultado = ProporcaoComentarioCodigo(source=code).analisar()
+        self.assertEqual(resultado[0]['linhas_totais'], 5)
+        self.assertEqual(resultado[0]['comentarios'], 1)
+        self.assertEqual(resultado[0]['percentual'], 20.0)
+
+    def test_aceita_codigo_tokens_e_arvore(self):
+        code = "class A:\n    # c1\n    def f(self):\n        # c2\n        return 1\n"
+        tokens = list(tokenize.generate_tokens(io.StringIO(code).readline))
+        tree = ast.parse(code)
+        analisador = ProporcaoComentarioCodigo("nao/existe.py", source=code, tokens=tokens, tree=tree)
+        self.assertIs(analisador.tree, tree)
+        resultado = analisador.analisar()
+        self.assertEqual([(r['nome'], r['comentarios']) for r in resultado],
+                         [('Classe: A', 2), ('Função: f', 1)])
+
     def test_arquivo_inexistente(self):
         with self.assertRaises(FileNotFoundError):
             ProporcaoComentarioCodigo("caminho/que/nao/existe.py")
@@ -9,3 +9,7 @@ def test_count_comments():
 
     mixed_code = "# Primeiro\nprint('Code')\n  # Indentado\n# Final\n"
     assert count_comments(mixed_code) == 3
+
+def test_hash_inside_string_is_not_comment():
+    code = 'url = "http://x/#ancora"\ncor = \'#fff\'  # cor padrão\n"""\n# docstring\n"""\n'
+    assert count_comments(code) == 1
@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+from typer.testing import CliRunner
+
+from analyzer import daemon, daemon_client
+from analyzer.daemon import ReportCache
+from analyzer.file_report import file_report
+from analyzer.main import app
+
+CODIGO = "import requests\n\nclass A:\n    def m(self):\n        # comentário\n        return 1\n"
+
+def iniciar_daemon(tmp_path, **opcoes):
+    caminho = str(tmp_path / "d.sock")
+    pronto = threading.Event()
+    thread = threading.Thread(target=daemon.serve, args=(caminho,),
+                              kwargs={"on_ready": lambda server: pronto.set(), **opcoes}, daemon=True)
+    thread.start()
+    assert pronto.wait(5)
+    return caminho, thread
+
+def test_cache_is_keyed_by_mtime_and_size(tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text(CODIGO, encoding="utf-8")
+    cache = ReportCache(max_entries=1)
+    assert cache.get(str(arquivo)) == cache.get(str(arquivo))
+    arquivo.write_text(CODIGO + "x = 1\n", encoding="utf-8")
+    assert '"lines": 7' in cache.get(str(arquivo))
+    outro = tmp_path / "outro.py"
+    outro.write_text("y = 2\n", encoding="utf-8")
+    cache.get(str(outro))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 1)
+    assert stats["hit_rate"] == 25.0
+
+def test_daemon_serves_reports_concurrently(tmp_path):
+    caminho, thread = iniciar_daemon(tmp_path, idle_timeout=0)
+    arquivos = []
+    for n in range(8):
+        arquivo = tmp_path / f"mod{n}.py"
+        arquivo.write_text(CODIGO * (n + 1), encoding="utf-8")
+        arquivos.append(str(arquivo))
+    respostas = {}
+
+    def pedir(arquivo):
+        respostas[arquivo] = daemon_client.fetch_report(arquivo, caminho)
+
+    threads = [threading.Thread(target=pedir, args=(arquivo,)) for arquivo in arquivos * 2]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for arquivo in arquivos:
+        assert respostas[arquivo] == json.loads(json.dumps(file_report(arquivo)))
+    status = daemon_client.request({"op": "status"}, caminho)["status"]
+    assert status["cache"]["entries"] == 8
+    assert status["cache"]["hits"] + status["cache"]["misses"] == 16
+
+    assert daemon_client.fetch_report(str(tmp_path / "nao_existe.py"), caminho) is None
+    assert daemon_client.request({"op": "stop"}, caminho) == {"ok": True}
+    thread.join(5)
+    assert not os.path.exists(caminho)
+
+def test_daemon_stops_when_idle(tmp_path):
+    caminho, thread = iniciar_daemon(tmp_path, idle_timeout=0.2)
+    time.sleep(0.1)
+    assert daemon_client.request({"op": "status"}, caminho) is not None
+    thread.join(5)
+    assert not thread.is_alive()
+    assert daemon_client.request({"op": "status"}, caminho) is None
+
+def test_cli_uses_daemon_and_falls_back(tmp_path, monkeypatch):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text(CODIGO, encoding="utf-8")
+    runner = CliRunner()
+    sem_daemon = runner.invoke(app, ["classes", str(arquivo)])
+    assert sem_daemon.exit_code == 0 and "Classes: 1" in sem_daemon.output
+
+    caminho, thread = iniciar_daemon(tmp_path, idle_timeout=0)
+    monkeypatch.setenv(daemon_client.SOCKET_ENV, caminho)
+    for comando in ["classes", "methods", "lines"]:
+        assert runner.invoke(app, [comando, str(arquivo)]).output == runner.invoke(app, ["--no-daemon", comando, str(arquivo)]).output
+    status = runner.invoke(app, ["status", "--format", "json"])
+    assert status.exit_code == 0 and '"hits": 2' in status.output
+    assert runner.invoke(app, ["serve", "--stop"]).exit_code == 0
+    thread.join(5)
+    assert runner.invoke(app, ["status"]).exit_code == 1
@@ -2,7 +2,8 @@ import unittest
 import tempfile
 import os
 from collections import defaultdict
-from analyzer.dependency_analyzer import get_external_imports, analyze_repository
+from analyzer.dependency_analyzer import analyze_repository, get_external_imports
+from analyzer.import_origin import _FALLBACK_STDLIB, first_party_modules, is_standard_lib
 
 class TestDependencyAnalyzer(unittest.TestCase):
 
@@ -70,5 +71,38 @@ class TestDependencyAnalyzer(unittest.TestCase):
         self.assertEqual(result['requests'], 1)
         self.assertNotIn('os', result)
 
+    def test_full_standard_library_is_recognized(self):
+        for name in ("asyncio", "dataclasses", "ast", "hashlib", "sqlite3", "__future__"):
+            self.assertTrue(is_standard_lib(name), name)
+            self.assertIn(name, _FALLBACK_STDLIB)
+        self.assertFalse(is_standard_lib("numpy"))
+
+    def test_first_party_modules_from_root_scan(self):
+        os.makedirs(os.path.join(self.test_path, "pacote", "sub"))
+        self.create_temp_file("", filename=os.path.join("pacote", "__init__.py"))
+        self.create_temp_file("", filename=os.path.join("pacote", "sub", "__init__.py"))
+        os.makedirs(os.path.join(self.test_path, "dados"))
+        self.create_temp_file("x = 1", filename="util.py")
+        self.assertEqual(first_party_modules(self.test_path), frozenset({"pacote", "util"}))
+        # A partir de um arquivo dentro do pacote, a raiz é o diretório acima dele
+        inner = os.path.join(self.test_path, "pacote", "sub", "__init__.py")
+        self.assertEqual(first_party_modules(inner), frozenset({"pacote", "util"}))
+
+    def test_analyze_repository_per_file_and_first_party(self):
+        os.makedirs(os.path.join(self.test_path, "app"))
+        self.create_temp_file("from . import modelos\nimport numpy", filename=os.path.join("app", "__init__.py"))
+        self.create_temp_file("import app\nimport numpy\nimport numpy.linalg\nimport asyncio", filename="main.py")
+        self.create_temp_file("import requests\nfrom util import x", filename="util.py")
+        self.create_temp_file("def f(:", filename="quebrado.py")
+
+        files, total = analyze_repository(self.test_path, per_file=True)
+        self.assertEqual(files, {
+            "app/__init__.py": {"numpy": 1},
+            "main.py": {"numpy": 2},
+            "util.py": {"requests": 1},
+        })
+        self.assertEqual(total, {"numpy": 3, "requests": 1})
+        self.assertEqual(analyze_repository(self.test_path, jobs=2), total)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,43 @@
+import os
+from analyzer.directory_analysis import (
+    add_to_summary, analyze_files, finalize_summary, new_summary, ordered_results, plan_chunks
+)
+
+def criar_arquivos(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"mod{i}.py"
+        body = "\n".join(f"def f{j}():\n    return {j}\n" for j in range(i * 20 + 1))
+        path.write_text(f"class C{i}:\n    def m(self):\n        pass\n{body}", encoding="utf-8")
+        paths.append(str(path))
+    (tmp_path / "quebrado.py").write_text("def (:\n", encoding="utf-8")
+    paths.append(str(tmp_path / "quebrado.py"))
+    return paths
+
+def test_plan_chunks_largest_first(tmp_path):
+    paths = criar_arquivos(tmp_path)
+    chunks = plan_chunks(paths, jobs=2)
+    flat = [p for chunk in chunks for p in chunk]
+    assert sorted(flat) == sorted(paths)
+    assert flat[0] == str(tmp_path / "mod5.py")
+    sizes = [os.path.getsize(p) for p in flat]
+    assert sizes == sorted(sizes, reverse=True)
+
+def test_parallel_matches_serial(tmp_path):
+    paths = criar_arquivos(tmp_path)
+    serial = ordered_results(paths, analyze_files(paths, jobs=1))
+    parallel = ordered_results(paths, analyze_files(paths, jobs=3))
+    assert serial == parallel
+    assert [r[0] for r in parallel] == paths
+    assert parallel[-1][1] is None and parallel[-1][2]
+
+def test_summary_accumulation(tmp_path):
+    paths = criar_arquivos(tmp_path)
+    summary = new_summary(len(paths))
+    for _, file_metrics, error in analyze_files(paths, jobs=1):
+        if error is None:
+            add_to_summary(summary, file_metrics)
+    finalize_summary(summary)
+    assert summary["total_classes"] == 6
+    assert summary["total_methods"]["public"] == 6
+    assert summary["methods_ratio"] == {"public": 100.0, "private": 0.0}
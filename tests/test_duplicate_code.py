@@ -1,4 +1,6 @@
-from analyzer.analyze_duplicate_code import find_duplicate_blocks, hash_block
+from analyzer.analyze_duplicate_code import (
+    find_all_duplicates, find_duplicate_blocks, find_maximal_clones, hash_block, normalize_lines
+)
 
 def test_hash_block():
     """Testa a geração de hash para blocos de código."""
@@ -85,4 +87,65 @@ def funcao2():
     
     # Bloco de 2 linhas
     duplicates_2 = find_duplicate_blocks(code, block_size=2)
-    assert len(duplicates_2) >= 2 
\ No newline at end of file
+    assert len(duplicates_2) >= 2 
+
+def test_find_all_duplicates_reports_maximal_clone_once():
+    """Um clone de 12 linhas aparece uma única vez, sem sub-blocos."""
+    corpo = [f"    v{i} = {i} * x" for i in range(12)]
+    code = "\n".join(["def a(x):"] + corpo + ["", "# separador", "def b(x):"] + corpo)
+    duplicates = find_all_duplicates(code)
+    assert list(duplicates) == [12]
+    assert [(inicio, fim) for inicio, fim, _ in duplicates[12]] == [(2, 13), (17, 28)]
+
+def test_find_all_duplicates_ignores_comments_inside_clone():
+    code = """def a():
+    x = 1
+    # comentário
+    y = 2
+    return x + y
+
+def b():
+    x = 1
+
+    y = 2
+    return x + y"""
+    duplicates = find_all_duplicates(code)
+    assert [(inicio, fim) for inicio, fim, _ in duplicates[3]] == [(2, 5), (8, 11)]
+
+def test_find_maximal_clones_no_overlap():
+    """Repetições periódicas não geram trechos sobrepostos a si mesmos."""
+    ids, _, _ = normalize_lines("a = 1\nb = 2\n" * 4)
+    for first, second, length in find_maximal_clones(ids):
+        assert first + length <= second
+    assert find_maximal_clones(ids) == [(0, 2, 2), (2, 4, 2), (4, 6, 2)]
+
+def test_find_all_duplicates_no_duplicates():
+    assert find_all_duplicates("x = 1\ny = 2\nz = 3\n") == {}
+
+def test_find_all_duplicates_identical_lines():
+    """Linhas idênticas seguidas viram cópias consecutivas, sem sobreposição."""
+    duplicates = find_all_duplicates("x = 1\n" * 6)
+    assert list(duplicates) == [2]
+    assert [(inicio, fim) for inicio, fim, _ in duplicates[2]] == [(1, 2), (3, 4), (5, 6)]
+
+def test_find_all_duplicates_periodic_block():
+    """Um bloco repetido três vezes seguidas aparece nas três cópias."""
+    bloco = "a = f(x)\nb = g(a)\nc = h(b)\n"
+    duplicates = find_all_duplicates(bloco * 3)
+    assert list(duplicates) == [3]
+    assert [(inicio, fim) for inicio, fim, _ in duplicates[3]] == [(1, 3), (4, 6), (7, 9)]
+
+def test_find_maximal_clones_periodic_input_is_linear():
+    """Cada diagonal é percorrida uma vez: entradas periódicas grandes não ficam quadráticas."""
+    ids, _, _ = normalize_lines("x = 1\n" * 20000)
+    clones = find_maximal_clones(ids)
+    assert len(clones) == 9999
+    assert all(second - first == length == 2 for first, second, length in clones)
+
+def test_find_maximal_clones_skips_overlapping_links():
+    """A janela em 5 se sobrepõe à seguinte (6), mas a cópia em 6 ainda é pareada com a de 1."""
+    ids = [0, 2, 2, 0, 1, 2, 2, 2]
+    clones = find_maximal_clones(ids)
+    assert clones == [(1, 5, 2), (1, 6, 2)]
+    cobertas = {linha for a, b, n in clones for inicio in (a, b) for linha in range(inicio, inicio + n)}
+    assert cobertas == {1, 2, 5, 6, 7}
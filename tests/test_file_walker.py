@@ -0,0 +1,63 @@
+import os
+import pytest
+from analyzer.file_walker import GitIgnore, is_path_included, iter_python_files
+
+def criar_arvore(root):
+    arquivos = [
+        "a.py", "b.txt", "pkg/__init__.py", "pkg/mod.py", "pkg/sub/deep.py",
+        "pkg/gerado_pb2.py", ".git/hooks/x.py", "venv/lib/site.py",
+        "node_modules/lib.py", "build/out.py", "logs/debug.py", "pkg/keep.py",
+        "pkg/env/settings.py", "ambiente/pyvenv.cfg", "ambiente/lib/site.py",
+    ]
+    for rel in arquivos:
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("x = 1\n", encoding="utf-8")
+
+def relativos(root, paths):
+    return [os.path.relpath(p, root).replace(os.sep, "/") for p in paths]
+
+def test_walk_recursive_and_prunes_default_dirs(tmp_path):
+    criar_arvore(tmp_path)
+    found = relativos(tmp_path, iter_python_files(str(tmp_path)))
+    # build/ e env/ podem ser pacotes do projeto; virtualenvs saem pelo pyvenv.cfg
+    assert found == [
+        "a.py", "build/out.py", "logs/debug.py", "pkg/__init__.py", "pkg/gerado_pb2.py",
+        "pkg/keep.py", "pkg/mod.py", "pkg/env/settings.py", "pkg/sub/deep.py",
+    ]
+    assert not is_path_included(str(tmp_path), str(tmp_path / "ambiente" / "lib" / "site.py"))
+    assert is_path_included(str(tmp_path), str(tmp_path / "pkg" / "env" / "settings.py"))
+
+def test_walk_honours_gitignore(tmp_path):
+    criar_arvore(tmp_path)
+    (tmp_path / ".gitignore").write_text("logs/\nbuild/\n*_pb2.py\n", encoding="utf-8")
+    (tmp_path / "pkg" / ".gitignore").write_text("*.py\n!keep.py\n", encoding="utf-8")
+    found = relativos(tmp_path, iter_python_files(str(tmp_path)))
+    assert found == ["a.py", "pkg/keep.py"]
+
+def test_walk_include_exclude(tmp_path):
+    criar_arvore(tmp_path)
+    found = relativos(tmp_path, iter_python_files(str(tmp_path), exclude=["pkg/sub", "*_pb2.py"]))
+    assert "pkg/sub/deep.py" not in found
+    assert "pkg/gerado_pb2.py" not in found
+    found = relativos(tmp_path, iter_python_files(str(tmp_path), include=["*.txt"]))
+    assert found == ["b.txt"]
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks indisponíveis")
+def test_walk_skips_symlink_loops(tmp_path):
+    criar_arvore(tmp_path)
+    try:
+        os.symlink(tmp_path / "pkg", tmp_path / "pkg" / "sub" / "loop")
+    except OSError:
+        pytest.skip("sem permissão para criar symlinks")
+    found = relativos(tmp_path, iter_python_files(str(tmp_path)))
+    assert len(found) == len(set(os.path.realpath(tmp_path / p) for p in found))
+
+def test_gitignore_patterns():
+    rules = GitIgnore(["# comentário", "/root_only.py", "docs/**/*.py", "tmp/", "!important.py"])
+    assert rules.match("root_only.py", False) is True
+    assert rules.match("pkg/root_only.py", False) is None
+    assert rules.match("docs/a/b/c.py", False) is True
+    assert rules.match("tmp", True) is True
+    assert rules.match("tmp", False) is None
+    assert rules.match("important.py", False) is False
@@ -0,0 +1,67 @@
+import json
+import subprocess
+
+import pytest
+from typer.testing import CliRunner
+
+from analyzer.git_changes import changed_files, changed_python_files
+from analyzer.main import app
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "pkg").mkdir(parents=True)
+    (repo / "pkg" / "a.py").write_text("def f():\n    return 1\n", encoding="utf-8")
+    (repo / "pkg" / "b.py").write_text("class B:\n    def m(self):\n        pass\n", encoding="utf-8")
+    (repo / "c.py").write_text("x = 1\n", encoding="utf-8")
+    (repo / "velho.py").write_text("y = 2\n", encoding="utf-8")
+    (repo / "notas.txt").write_text("texto\n", encoding="utf-8")
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "dev@exemplo.com")
+    git(repo, "config", "user.name", "dev")
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", "inicial")
+    git(repo, "checkout", "-qb", "feature")
+    # Commit na branch, arquivo removido e alteração local ainda não commitada
+    (repo / "pkg" / "a.py").write_text("def f():\n    return 2\n\ndef g():\n    pass\n", encoding="utf-8")
+    (repo / "notas.txt").write_text("outro\n", encoding="utf-8")
+    git(repo, "rm", "-q", "velho.py")
+    git(repo, "commit", "-qam", "mudanca")
+    (repo / "c.py").write_text("x = 1  # local\n", encoding="utf-8")
+    return repo
+
+def test_changed_since_includes_commits_and_local_edits(repo):
+    nomes = [p.replace(str(repo.resolve()), "").lstrip("/") for p in changed_files(str(repo), "main")]
+    assert nomes == ["c.py", "notas.txt", "pkg/a.py"]
+    assert changed_python_files(str(repo), "main") == [str(repo / "c.py"), str(repo / "pkg" / "a.py")]
+    assert changed_python_files(str(repo / "pkg"), "main") == [str(repo / "pkg" / "a.py")]
+    assert changed_python_files(str(repo), "main", exclude=["pkg/*"]) == [str(repo / "c.py")]
+
+def test_staged_only_sees_the_index(repo):
+    assert changed_python_files(str(repo), staged=True) == []
+    git(repo, "add", "c.py")
+    assert changed_python_files(str(repo), staged=True) == [str(repo / "c.py")]
+
+def test_all_dir_changed_since_with_cached_totals(repo, tmp_path):
+    runner = CliRunner()
+    cache = ["--cache-dir", str(tmp_path / "cache")]
+    completo = runner.invoke(app, ["all-dir", str(repo), "--format", "json", *cache])
+    alterados = runner.invoke(app, ["all-dir", str(repo), "--changed-since", "main", "--format", "json", *cache])
+    metricas = json.loads(alterados.output)["metrics"]
+    assert list(metricas["files"]) == ["c.py", "pkg/a.py"]
+    assert metricas["changes"] == {"since": "main", "staged": False, "changed_files": 2}
+    assert metricas["summary"]["total_files"] == 2
+
+    mesclado = runner.invoke(app, ["all-dir", str(repo), "--changed-since", "main", "--merge-cached",
+                                   "--format", "json", *cache])
+    metricas = json.loads(mesclado.output)["metrics"]
+    assert metricas["summary"] == json.loads(completo.output)["metrics"]["summary"]
+    assert (metricas["changes"]["merged_files"], metricas["changes"]["uncached_files"]) == (1, 0)
+
+def test_all_dir_reports_git_errors(repo):
+    resultado = CliRunner().invoke(app, ["all-dir", str(repo), "--changed-since", "nao-existe", "--no-cache"])
+    assert resultado.exit_code == 1 and "nao-existe" in resultado.output
+    assert CliRunner().invoke(app, ["all-dir", str(repo), "--merge-cached"]).exit_code == 1
@@ -0,0 +1,94 @@
+import json
+import subprocess
+
+import pytest
+from typer.testing import CliRunner
+
+import analyzer.history as history
+from analyzer.main import app
+
+def git(repo, *args):
+    return subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True, text=True).stdout
+
+def commit(repo, mensagem, arquivos):
+    for nome, conteudo in arquivos.items():
+        caminho = repo / nome
+        if conteudo is None:
+            git(repo, "rm", "-q", nome)
+            continue
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_bytes(conteudo.encode("utf-8"))
+    git(repo, "add", ".")
+    git(repo, "commit", "-qm", mensagem)
+    return git(repo, "rev-parse", "HEAD").strip()
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    git(repo, "config", "user.email", "dev@exemplo.com")
+    git(repo, "config", "user.name", "dev")
+    commits = [
+        commit(repo, "inicial", {
+            "pkg/a.py": "def f():\n    return 1\n",
+            "pkg/b.py": "class B:\n    def m(self):\n        pass\n\n    def _p(self):\n        pass\n",
+            "c.py": "x = 1\r\ny = 2\r\n",
+            "notas.txt": "texto\n",
+        }),
+        commit(repo, "nova funcao", {"pkg/a.py": "def f():\n    return 1\n\n# comentário\ndef g():\n    pass\n"}),
+        commit(repo, "modulo quebrado", {"d.py": "def (:\n", "pkg/sub/e.py": "class E:\n    pass\n"}),
+        commit(repo, "remove c", {"c.py": None, "d.py": None}),
+    ]
+    return repo, commits
+
+def test_each_commit_matches_all_dir_on_a_checkout(repo, tmp_path):
+    repo, commits = repo
+    runner = CliRunner()
+    resultado = runner.invoke(app, ["history", str(repo), "--rev-range", f"{commits[0]}..main",
+                                    "--format", "json", "--jobs", "2"])
+    assert resultado.exit_code == 0, resultado.output
+    # Um intervalo A..B exclui A, como no git log
+    metricas = json.loads(resultado.output)["metrics"]
+    assert [c["commit"] for c in metricas["commits"]] == commits[1:]
+    assert [c["subject"] for c in metricas["commits"]] == ["nova funcao", "modulo quebrado", "remove c"]
+
+    for registro in metricas["commits"]:
+        git(repo, "checkout", "-q", registro["commit"])
+        all_dir = runner.invoke(app, ["all-dir", str(repo), "--format", "json", "--no-cache"])
+        # O all-dir avisa no terminal sobre o módulo quebrado antes do JSON
+        saida = all_dir.output[all_dir.output.index("{"):]
+        assert registro["summary"] == json.loads(saida)["metrics"]["summary"]
+    assert [c["failed_files"] for c in metricas["commits"]] == [0, 1, 0]
+
+def test_each_blob_is_analyzed_once(repo, monkeypatch):
+    repo, commits = repo
+    analisados = []
+    analyze_source = history.analyze_source
+    monkeypatch.setattr(history, "analyze_source", lambda code, sha, metrics: analisados.append(sha) or
+                        analyze_source(code, sha, metrics))
+    resultado = CliRunner().invoke(app, ["history", str(repo), "--rev-range", "main", "--format", "json",
+                                         "--jobs", "1", "--metrics", "lines,methods"])
+    metricas = json.loads(resultado.output)["metrics"]
+    assert len(analisados) == len(set(analisados)) == metricas["blobs"]["distinct"] == 6
+    assert metricas["blobs"]["file_versions"] == 3 + 3 + 5 + 3
+    assert metricas["commits"][0]["summary"] == {
+        "total_files": 3, "total_lines": 10, "total_methods": {"public": 1, "private": 1, "total": 2},
+        "methods_ratio": {"public": 50.0, "private": 50.0}
+    }
+
+def test_subdirectory_scope_and_filters(repo):
+    repo, commits = repo
+    runner = CliRunner()
+    resultado = runner.invoke(app, ["history", str(repo / "pkg"), "--rev-range", "main", "--format", "json",
+                                    "--exclude", "sub/*", "--jobs", "1", "-m", "functions"])
+    totais = [(c["summary"]["total_files"], c["summary"]["total_functions"])
+              for c in json.loads(resultado.output)["metrics"]["commits"]]
+    assert totais == [(2, 3), (2, 4), (2, 4), (2, 4)]
+
+def test_history_rejects_unsupported_metrics_and_bad_ranges(repo):
+    repo, _ = repo
+    runner = CliRunner()
+    resultado = runner.invoke(app, ["history", str(repo), "--rev-range", "main", "-m", "lines,dependencies"])
+    assert resultado.exit_code == 1 and "dependencies" in resultado.output
+    assert runner.invoke(app, ["history", str(repo), "--rev-range", "nao-existe..main"]).exit_code == 1
@@ -0,0 +1,112 @@
+import analyzer.import_graph as import_graph
+from analyzer.import_graph import (
+    ImportGraph, build_import_graph, extract_imports, module_name, strongly_connected_components
+)
+from analyzer.result_cache import ResultCache
+
+def criar(tmp_path, relativo, conteudo=""):
+    path = tmp_path / relativo
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(conteudo, encoding="utf-8")
+
+def test_module_name():
+    assert module_name("pkg/sub/mod.py") == "pkg.sub.mod"
+    assert module_name("pkg/__init__.py") == "pkg"
+    assert module_name("src/pkg/mod.py") == "pkg.mod"
+
+def test_extract_imports_includes_relative_and_nested():
+    code = "import os.path\nfrom . import irmao\n\ndef f():\n    from ..pai import x\n"
+    assert extract_imports(code) == [("os.path", [], 0), (None, ["irmao"], 1), ("pai", ["x"], 2)]
+
+def test_resolves_relative_and_absolute_imports():
+    modules = {
+        "pkg": "pkg/__init__.py",
+        "pkg.a": "pkg/a.py",
+        "pkg.b": "pkg/b.py",
+        "pkg.sub": "pkg/sub/__init__.py",
+        "pkg.sub.c": "pkg/sub/c.py",
+    }
+    imports = {
+        "pkg.a": [(None, ["b"], 1), ("os", [], 0), ("requests", ["get"], 0)],
+        "pkg.sub.c": [("a", ["f"], 2), ("pkg.b", [], 0)],
+        "pkg": [(None, ["sub"], 1)],
+    }
+    graph = ImportGraph(modules, imports)
+    assert graph.edges["pkg.a"] == {"pkg.b"}
+    assert graph.edges["pkg.sub.c"] == {"pkg.a", "pkg.b"}
+    assert graph.edges["pkg"] == {"pkg.sub"}
+    assert graph.stdlib["pkg.a"] == {"os": 1}
+    assert graph.third_party["pkg.a"] == {"requests": 1}
+    assert graph.fan_in("pkg.b") == 2
+    assert graph.fan_out("pkg.sub.c") == 2
+
+def test_tarjan_finds_cycles():
+    edges = {"a": {"b"}, "b": {"c"}, "c": {"a"}, "d": {"a"}, "e": set()}
+    components = strongly_connected_components(edges)
+    assert ["a", "b", "c"] in components
+    assert ["d"] in components and ["e"] in components
+
+def test_impact_is_transitive(tmp_path):
+    criar(tmp_path, "pkg/__init__.py")
+    criar(tmp_path, "pkg/base.py", "X = 1\n")
+    criar(tmp_path, "pkg/meio.py", "from .base import X\n")
+    criar(tmp_path, "pkg/topo.py", "from pkg import meio\n")
+    criar(tmp_path, "pkg/isolado.py", "import json\n")
+    criar(tmp_path, "tests/test_topo.py", "import pkg.topo\n")
+    graph, errors = build_import_graph(str(tmp_path))
+    assert errors == []
+    assert graph.impact(["pkg/base.py"]) == [
+        "pkg/base.py", "pkg/meio.py", "pkg/topo.py", "tests/test_topo.py"
+    ]
+    assert graph.impact(["pkg/isolado.py"]) == ["pkg/isolado.py"]
+    assert graph.cycles() == []
+
+def test_cycle_between_files(tmp_path):
+    criar(tmp_path, "a.py", "import b\n")
+    criar(tmp_path, "b.py", "from a import x\n")
+    graph, _ = build_import_graph(str(tmp_path))
+    assert graph.cycles() == [["a", "b"]]
+
+def test_graph_uses_cache(tmp_path):
+    criar(tmp_path, "a.py", "import b\n")
+    criar(tmp_path, "b.py", "")
+    cache_dir = str(tmp_path / ".cache")
+    cache = ResultCache(cache_dir, analyzer="imports")
+    build_import_graph(str(tmp_path), cache=cache)
+    cache.close()
+    cache = ResultCache(cache_dir, analyzer="imports")
+    graph, _ = build_import_graph(str(tmp_path), cache=cache)
+    # Nenhum arquivo mudou: o grafo inteiro vem do cache, sem consultar os imports por arquivo
+    # (a consulta do grafo não entra nas estatísticas por arquivo)
+    assert cache.stats() == {"hits": 0, "misses": 0}
+    cache.close()
+    assert graph.impact(["b.py"]) == ["a.py", "b.py"]
+
+def test_cached_graph_skips_resolution_until_files_change(tmp_path, monkeypatch):
+    criar(tmp_path, "a.py", "import b\nimport requests\n")
+    criar(tmp_path, "b.py", "import a\n")
+    criar(tmp_path, "quebrado.py", "def (:\n")
+    cache_dir = str(tmp_path / ".cache")
+
+    def montar():
+        cache = ResultCache(cache_dir, analyzer="imports")
+        try:
+            return build_import_graph(str(tmp_path), cache=cache)
+        finally:
+            cache.close()
+
+    original, erros = montar()
+    tarjan = []
+    scc = import_graph.strongly_connected_components
+    monkeypatch.setattr(import_graph, "strongly_connected_components", lambda edges: tarjan.append(1) or scc(edges))
+
+    graph, erros_cache = montar()
+    assert tarjan == [] and erros_cache == erros and [caminho for caminho, _ in erros] == ["quebrado.py"]
+    assert graph.to_dict() == original.to_dict() and graph.cycles() == [["a", "b"]]
+    assert graph.third_party["a"] == {"requests": 1} and graph.impact(["a.py"]) == ["a.py", "b.py"]
+
+    # Um arquivo novo muda o conjunto: o grafo é refeito com ele
+    criar(tmp_path, "c.py", "import a\n")
+    graph, _ = montar()
+    assert graph.cycles() == [["a", "b"]] and tarjan == [1]
+    assert graph.impact(["a.py"]) == ["a.py", "b.py", "c.py"]
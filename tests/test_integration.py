@@ -73,4 +73,19 @@ def test_bugs_ai_simple_command():
     # Teste do comando simplificado de bugs com IA
     result = runner.invoke(app, ["bugs-ai-simple", "examples/sample.py"])
     assert result.exit_code == 0
-    assert "API key não configurada" in result.stdout 
\ No newline at end of file
+    assert "API key não configurada" in result.stdout
+
+
+def test_analyze_all_dir_ndjson():
+    # Uma linha por arquivo e uma linha final com o resumo
+    result = runner.invoke(app, ["all-dir", "examples/", "--format", "ndjson", "--no-cache", "--jobs", "1"])
+    assert result.exit_code == 0
+
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert records[-1]["type"] == "summary"
+    files = [r for r in records if r["type"] == "file"]
+    assert len(files) == records[-1]["summary"]["total_files"]
+    assert sum(r["metrics"]["lines"] for r in files) == records[-1]["summary"]["total_lines"]
+
+    full = json.loads(runner.invoke(app, ["all-dir", "examples/", "--format", "json", "--no-cache"]).stdout)
+    assert full["metrics"]["summary"] == records[-1]["summary"]
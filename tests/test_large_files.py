@@ -0,0 +1,60 @@
+from analyzer.directory_analysis import analyze_dir_file
+from analyzer.large_files import (
+    AST_MEMORY_FACTOR, MB, DuplicateWindows, large_file_threshold, peak_rss_mb, stream_file_metrics
+)
+from analyzer.metrics_engine import SourceAnalysis
+
+REPETIDO = "a = 1\nb = 2\nc = 3\nd = 4\ne = 5\nf = 6\ng = 7\n"
+
+def criar_arquivo(tmp_path):
+    body = "".join(
+        f"def f{n}(x):\n    # comentário {n}\n    s = '''\n# não é comentário\n'''\n\n    return x + {n}  # fim\n"
+        for n in range(50)
+    )
+    path = tmp_path / "gerado.py"
+    path.write_text(body + REPETIDO + "\n# separador\n" + REPETIDO, encoding="utf-8")
+    return path
+
+def test_threshold_from_memory_budget():
+    assert large_file_threshold(max_memory_mb=1024) == 1024 * MB // AST_MEMORY_FACTOR
+    assert large_file_threshold(2.5) == int(2.5 * MB)
+
+def test_streaming_matches_full_analysis(tmp_path):
+    path = criar_arquivo(tmp_path)
+    analysis = SourceAnalysis(path.read_text(encoding="utf-8"))
+    metrics = stream_file_metrics(str(path))
+    assert metrics["lines"] == analysis.lines
+    assert metrics["comments"] == analysis.comments
+    assert metrics["indentation"] == analysis.indentation
+    assert metrics["code_lines"] + metrics["comment_lines"] + metrics["blank_lines"] == analysis.lines
+
+def test_streaming_duplicates(tmp_path):
+    metrics = stream_file_metrics(str(criar_arquivo(tmp_path)))
+    duplicates = metrics["duplicates"]
+    assert duplicates["duplicated_blocks"] == 1
+    assert duplicates["duplicated_lines"] == 7
+    example = duplicates["examples"][0]
+    assert example["line"] - example["first_line"] == 9  # 7 linhas, uma em branco e um comentário
+
+def test_duplicate_index_is_bounded():
+    windows = DuplicateWindows(window=2, max_entries=3)
+    for number in range(1, 11):
+        windows.add(number, number)
+    for number in range(11, 13):
+        windows.add(number, 1 if number == 11 else 2)
+    result = windows.result()
+    assert result["truncated"] is True
+    assert len(windows._index) == 3
+    assert result["duplicated_blocks"] == 1
+
+def test_large_dir_file_is_marked(tmp_path):
+    path = criar_arquivo(tmp_path)
+    metrics = analyze_dir_file(str(path), large_file_bytes=1)
+    assert metrics["large_file"]["mode"] == "streaming"
+    assert metrics["metrics"]["functions"] == 0
+    assert metrics["metrics"]["lines"] == SourceAnalysis(path.read_text(encoding="utf-8")).lines
+    assert "large_file" not in analyze_dir_file(str(path))
+
+def test_peak_rss_is_reported():
+    peak = peak_rss_mb()
+    assert peak is None or peak > 0
@@ -0,0 +1,87 @@
+import io
+import pathlib
+import tokenize
+
+from collections import Counter
+
+from analyzer.lexical import BLANK, CODE, COMMENT, LexicalScan, StreamingLexicalScan
+from analyzer.metrics_engine import indentation_stats, indentation_summary
+
+CODIGO = '''\
+# cabeçalho
+def f(x):
+    """Docstring com # dentro.
+
+    Fim da docstring.
+    """
+    y = "#nao" + '#' + x  # comentário real
+
+\treturn y
+s = \'\'\'
+# dentro de string tripla
+\'\'\'
+'''
+
+def test_classifies_each_line():
+    scan = LexicalScan(CODIGO)
+    assert list(scan.kinds) == [
+        COMMENT, CODE, CODE, BLANK, CODE, CODE, CODE | COMMENT, BLANK, CODE, CODE, CODE, CODE,
+    ]
+    assert scan.line_count == 12
+    assert scan.comment_count == 2
+    assert scan.comment_text == {1: "# cabeçalho", 7: "# comentário real"}
+
+def test_matches_tokenize_comments():
+    tokens = list(tokenize.generate_tokens(io.StringIO(CODIGO).readline))
+    rows = {token.start[0] for token in tokens if token.type == tokenize.COMMENT}
+    assert set(LexicalScan(CODIGO).comment_text) == rows
+    from_tokens = LexicalScan(CODIGO, tokens)
+    assert from_tokens.kinds == LexicalScan(CODIGO).kinds
+
+def test_matches_tokenize_on_the_analyzer_sources():
+    """O tokenize é a referência: mesmos comentários, nas mesmas linhas, em código real."""
+    import analyzer
+    for caminho in sorted(pathlib.Path(analyzer.__file__).parent.glob("*.py")):
+        codigo = caminho.read_text(encoding="utf-8")
+        tokens = list(tokenize.generate_tokens(io.StringIO(codigo).readline))
+        comentarios = {token.start[0]: token.string.strip() for token in tokens if token.type == tokenize.COMMENT}
+        assert LexicalScan(codigo).comment_text == comentarios, caminho.name
+        assert LexicalScan(codigo).kinds == LexicalScan(codigo, tokens).kinds, caminho.name
+
+def test_prefix_sums_start_at_zero():
+    scan = LexicalScan("")
+    assert scan.nonblank_prefix() == scan.comment_prefix() == [0]
+
+def test_indentation_matches_line_based_stats():
+    scan = LexicalScan(CODIGO)
+    assert indentation_summary(scan.indent_levels()) == indentation_stats(CODIGO.split("\n"))
+    assert scan.indents[8] == 4  # 1 tab = 4 espaços
+
+def test_prefix_sums():
+    scan = LexicalScan(CODIGO)
+    nonblank = scan.nonblank_prefix()
+    comments = scan.comment_prefix()
+    assert nonblank[-1] == 10 and nonblank[3] - nonblank[1] == 2
+    assert comments[6] == 1 and comments[-1] == 2
+
+def test_unterminated_string_does_not_hide_following_lines():
+    scan = LexicalScan("x = 'aberta\n# comentário\n")
+    assert scan.comment_count == 1
+    assert LexicalScan("").line_count == 0
+
+def feed_in_pieces(code, size):
+    scan = StreamingLexicalScan()
+    stream = io.StringIO(code, newline="")
+    for piece in iter(lambda: stream.readline(size), ""):
+        scan.feed(piece)
+    scan.finish()
+    return scan
+
+def test_streaming_matches_full_scan_for_any_piece_size():
+    codigo = CODIGO + "t = 'a\\\n# ainda string'\nu = '''\\'''\n# fora'''\n    x  # sem quebra final"
+    full = LexicalScan(codigo)
+    for size in (1, 2, 3, 7, 1 << 20):
+        scan = feed_in_pieces(codigo, size)
+        assert scan.kind_counts == [full.count(kind) for kind in range(4)], size
+        assert scan.indent_counts == Counter(full.indent_levels()), size
+        assert scan.comment_count == full.comment_count
@@ -0,0 +1,107 @@
+import ast
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from analyzer.directory_analysis import analyze_dir_file
+from analyzer.file_report import file_report
+from analyzer.main import app
+from analyzer.metric_registry import METRICS, SUM, TEXT, TOKENS, Metric, register, required_inputs, select_metrics
+
+CODIGO = "import requests\n\nclass A:\n    def m(self):\n        # comentário\n        return 1\n\ndef f():\n    pass\n"
+
+def test_select_metrics_keeps_registry_order():
+    assert [m.name for m in select_metrics("functions, lines")] == ["lines", "functions"]
+    assert [m.name for m in select_metrics(None)] == list(METRICS)
+    assert required_inputs(select_metrics("lines,comments")) == {TOKENS}
+    with pytest.raises(ValueError, match="desconhecida: nada"):
+        select_metrics("lines,nada")
+
+def test_textual_metrics_skip_the_parse(monkeypatch, tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text(CODIGO, encoding="utf-8")
+    chamadas = []
+    parse_original = ast.parse
+    monkeypatch.setattr(ast, "parse", lambda *args, **kwargs: chamadas.append(1) or parse_original(*args, **kwargs))
+
+    assert file_report(str(arquivo), metrics=["lines", "comments"]) == {"lines": 9, "comments": 1}
+    assert analyze_dir_file(str(arquivo), metrics=["lines"]) == {"metrics": {"lines": 9}}
+    assert chamadas == []
+    assert file_report(str(arquivo), metrics=["functions", "methods"]) == {
+        "functions": 2, "public_methods": 1, "private_methods": 0, "total_methods": 1
+    }
+    assert chamadas == [1]
+
+def test_declared_inputs_limit_the_passes(tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text(CODIGO, encoding="utf-8")
+    # Declarar só o texto e usar a AST é erro: a passada não declarada não roda escondida
+    register(Metric("funcoes_texto", [TEXT], lambda analysis, file: analysis.functions))
+    try:
+        with pytest.raises(RuntimeError, match="'ast' não declarada"):
+            file_report(str(arquivo), metrics=["funcoes_texto"])
+        with pytest.raises(RuntimeError, match="'ast' não declarada"):
+            analyze_dir_file(str(arquivo), metrics=["lines", "funcoes_texto"])
+    finally:
+        METRICS.pop("funcoes_texto")
+
+def test_full_report_matches_selection(tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text(CODIGO, encoding="utf-8")
+    completo = file_report(str(arquivo))
+    parcial = file_report(str(arquivo), metrics="complexity,dependencies")
+    assert parcial == {key: completo[key] for key in ("external_dependencies", "complexity_analysis")}
+
+def test_large_file_skips_only_selected_ast_metrics(tmp_path):
+    arquivo = tmp_path / "grande.py"
+    arquivo.write_text(CODIGO * 20, encoding="utf-8")
+    resultado = analyze_dir_file(str(arquivo), large_file_bytes=1, metrics=["lines", "functions", "complexity"])
+    assert resultado["metrics"] == {"lines": 180, "functions": 0, "complexity_analysis": []}
+    assert resultado["large_file"]["skipped_metrics"] == ["functions", "complexity"]
+
+def test_registered_metric_reaches_all_dir(tmp_path):
+    (tmp_path / "a.py").write_text(CODIGO, encoding="utf-8")
+    (tmp_path / "b.py").write_text("x = 1\n", encoding="utf-8")
+    register(Metric("characters", [TEXT], lambda analysis, file: len(analysis.code),
+                    label="Caracteres", aggregate=SUM, column="Caracteres"))
+    try:
+        runner = CliRunner()
+        resultado = runner.invoke(app, ["all-dir", str(tmp_path), "--metrics", "lines,characters",
+                                        "--format", "json", "--no-cache"])
+        assert resultado.exit_code == 0
+        metricas = json.loads(resultado.output)["metrics"]
+        assert metricas["files"]["b.py"] == {"metrics": {"lines": 1, "characters": 6}}
+        assert metricas["summary"] == {"total_files": 2, "total_lines": 10, "total_characters": len(CODIGO) + 6}
+
+        tabela = runner.invoke(app, ["all-dir", str(tmp_path), "-m", "characters", "--no-cache"])
+        assert "Total de Caracteres" in tabela.output and "Linhas" not in tabela.output
+    finally:
+        METRICS.pop("characters")
+
+def test_cli_rejects_unknown_metric(tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text(CODIGO, encoding="utf-8")
+    resultado = CliRunner().invoke(app, ["--no-daemon", "all", str(arquivo), "--metrics", "linhas"])
+    assert resultado.exit_code == 1
+
+def test_dependencies_cache_follows_first_party_modules(tmp_path, monkeypatch):
+    import analyzer.metric_registry as metric_registry
+
+    projeto = tmp_path / "projeto"
+    projeto.mkdir()
+    (projeto / "app.py").write_text("import util\nimport requests\n", encoding="utf-8")
+    (projeto / "util.py").write_text("x = 1\n", encoding="utf-8")
+    # Os módulos do projeto são descobertos uma vez pelo all-dir, não por arquivo
+    monkeypatch.setattr(metric_registry, "first_party_modules", lambda file: pytest.fail("varredura por arquivo"))
+
+    def dependencias(*opcoes):
+        resultado = CliRunner().invoke(app, ["all-dir", str(projeto), "-m", "dependencies", "--format", "json",
+                                             "--cache-dir", str(tmp_path / "cache"), *opcoes])
+        assert resultado.exit_code == 0, resultado.output
+        return json.loads(resultado.output)["metrics"]["summary"]["external_dependencies"]
+
+    assert dependencias() == {"requests": 1}
+    # Sem o módulo vizinho, util passa a ser externo mesmo com o conteúdo de app.py no cache
+    (projeto / "util.py").unlink()
+    assert dependencias() == dependencias("--no-cache") == {"requests": 1, "util": 1}
@@ -0,0 +1,122 @@
+import ast
+import contextlib
+import io
+from analyzer.metrics_engine import SourceAnalysis, get_analysis, string_value
+from analyzer.main import analyze_all
+
+CODE = '''\
+import os
+import numpy as np
+from requests import get
+
+class Exemplo:
+    """Docstring da classe."""
+    # comentário
+    def publico(self):
+        for i in range(10):
+            for j in range(10):
+                print(i, j)
+
+    def _privado(self):
+        return Exemplo()
+
+def externa():
+    def interna():
+        while True:
+            break
+    return interna
+'''
+
+def test_source_analysis_metrics():
+    analysis = SourceAnalysis(CODE)
+    assert analysis.lines == 20
+    assert analysis.comments == 1
+    assert analysis.docstrings == 1
+    assert analysis.classes == 1
+    assert analysis.functions == 4
+    assert analysis.methods == (1, 1)
+    assert analysis.imports == ["os", "numpy", "requests"]
+
+def test_string_value_only_for_string_constants():
+    # No Python 3.7 as strings vêm como ast.Str; a partir do 3.8, como ast.Constant
+    valores = [string_value(node.value) for node in ast.parse('"doc"\n1\nb"x"\nNone\nf"{x}"\n').body]
+    assert valores == ["doc", None, None, None, None]
+
+def test_complexity_keeps_walk_order():
+    analysis = SourceAnalysis(CODE)
+    assert analysis.complexity == [
+        {"function": "externa", "complexity": "O(n)", "cyclomatic": 1},
+        {"function": "publico", "complexity": "O(n^2)", "cyclomatic": 3},
+        {"function": "_privado", "complexity": "O(1)", "cyclomatic": 1},
+        {"function": "interna", "complexity": "O(n)", "cyclomatic": 2},
+    ]
+
+def test_complexity_async_and_comprehensions():
+    code = """
+async def baixar(urls, ativo):
+    async for u in urls:
+        if u and ativo:
+            pass
+    return [(a, b) for a in urls for b in urls if a != b]
+"""
+    assert SourceAnalysis(code).complexity == [
+        {"function": "baixar", "complexity": "O(n^2)", "cyclomatic": 7},
+    ]
+
+def test_complexity_deep_nesting_without_recursion():
+    import sys
+    depth = 90
+    code = "def f(x):\n" + "".join("    " * (i + 1) + f"for i{i} in x:\n" for i in range(depth))
+    code += "    " * (depth + 1) + "pass\n"
+    analysis = SourceAnalysis(code)
+    analysis.tree  # o parse em si pode usar recursão
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(80)
+    try:
+        result = analysis.complexity
+    finally:
+        sys.setrecursionlimit(limit)
+    assert result == [{"function": "f", "complexity": f"O(n^{depth})", "cyclomatic": depth + 1}]
+
+def test_dead_code():
+    result = SourceAnalysis(CODE).dead_code
+    assert result["dead_functions"] == ["_privado", "externa", "interna", "publico"]
+    assert result["dead_classes"] == []
+
+def test_text_metrics_do_not_parse():
+    analysis = SourceAnalysis("isto não é python válido :(\n")
+    assert analysis.lines == 1
+    assert analysis.indentation["max_indent"] == 0
+
+def test_count_functions_share_parse(monkeypatch):
+    calls = []
+    original_parse = ast.parse
+
+    def counting_parse(*args, **kwargs):
+        calls.append(1)
+        return original_parse(*args, **kwargs)
+
+    monkeypatch.setattr(ast, "parse", counting_parse)
+    get_analysis.cache_clear()
+    from analyzer.analyze_classes import count_classes
+    from analyzer.analyze_functions import count_functions
+    from analyzer.analyze_docstrings import count_docstrings
+    count_classes(CODE)
+    count_functions(CODE)
+    count_docstrings(CODE)
+    assert len(calls) == 1
+
+def test_analyze_all_parses_once(monkeypatch, tmp_path):
+    path = tmp_path / "exemplo.py"
+    path.write_text(CODE, encoding="utf-8")
+    calls = []
+    original_parse = ast.parse
+
+    def counting_parse(*args, **kwargs):
+        calls.append(1)
+        return original_parse(*args, **kwargs)
+
+    monkeypatch.setattr(ast, "parse", counting_parse)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyze_all(str(path), format="json", output=None, compact=False, metrics=None, large_file_mb=None, max_memory_mb=1024)
+    assert len(calls) == 1
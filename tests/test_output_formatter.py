@@ -0,0 +1,65 @@
+import gzip
+import json
+
+from typer.testing import CliRunner
+
+from analyzer.main import app
+from analyzer.messagepack import packb, unpackb
+from analyzer.output_formatter import NDJSONWriter, format_output, load_output
+
+METRICAS = {
+    "files": {"a.py": {"lines": 10, "ratio": 0.25, "dead_code": {"dead_functions": ["f"], "dead_classes": []}}},
+    "indentation": {4: 12, 8: 3},
+    "texto": "ação ✅",
+    "vazio": None,
+    "ok": True,
+}
+
+def test_messagepack_matches_the_spec_and_round_trips():
+    assert packb({"a": 1}) == b"\x81\xa1a\x01"
+    assert packb([None, True, False, -1, 1.5]) == b"\x95\xc0\xc3\xc2\xff\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00"
+    valores = [0, 127, 128, 255, 256, 65535, 65536, 2**32, 2**64 - 1, -32, -33, -128, -129, -32768, -32769,
+               -2**31 - 1, -2**63, 3.14, "", "x" * 31, "x" * 32, "y" * 300, "z" * 70000, b"\x00\x01",
+               list(range(20)), list(range(70000)), {str(n): n for n in range(20)}]
+    for valor in valores:
+        assert unpackb(packb(valor)) == valor
+    # Chaves que não são strings viram strings, como no JSON
+    assert unpackb(packb(METRICAS)) == json.loads(json.dumps(METRICAS))
+
+def test_format_output_compact_and_gzip(tmp_path):
+    indentado = format_output(METRICAS, "json")
+    compacto = format_output(METRICAS, "json", compact=True)
+    assert "\n" not in compacto and len(compacto) < len(indentado)
+    assert json.loads(compacto)["metrics"] == json.loads(indentado)["metrics"]
+
+    arquivo = tmp_path / "saida" / "relatorio.json.gz"
+    assert format_output(METRICAS, "json", str(arquivo), compact=True) == f"✅ Resultados salvos em: {arquivo}"
+    with gzip.open(arquivo, "rt", encoding="utf-8") as f:
+        assert json.load(f)["metrics"] == json.loads(compacto)["metrics"]
+
+def test_load_output_reads_every_format(tmp_path):
+    esperado = json.loads(json.dumps(METRICAS))
+    for nome, formato, compacto in [("a.json", "json", False), ("b.json", "json", True), ("c.json.gz", "json", False),
+                                     ("d.msgpack", "msgpack", False), ("e.msgpack.gz", "msgpack", False)]:
+        format_output(METRICAS, formato, str(tmp_path / nome), compact=compacto)
+        assert load_output(str(tmp_path / nome))["metrics"] == esperado
+
+def test_ndjson_writer_gzip(tmp_path):
+    arquivo = tmp_path / "linhas.ndjson.gz"
+    with NDJSONWriter(str(arquivo)) as writer:
+        writer.write({"type": "file", "file": "a.py"})
+        writer.write({"type": "summary"})
+    with gzip.open(arquivo, "rt", encoding="utf-8") as f:
+        assert [json.loads(linha)["type"] for linha in f] == ["file", "summary"]
+
+def test_cli_msgpack_requires_output(tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text("class A:\n    def m(self):\n        return 1\n", encoding="utf-8")
+    runner = CliRunner()
+    assert runner.invoke(app, ["--no-daemon", "all", str(arquivo), "--format", "msgpack"]).exit_code == 1
+
+    saida = tmp_path / "r.msgpack"
+    resultado = runner.invoke(app, ["--no-daemon", "all", str(arquivo), "--format", "msgpack", "--output", str(saida)])
+    assert resultado.exit_code == 0
+    json_compacto = runner.invoke(app, ["--no-daemon", "all", str(arquivo), "--format", "json", "--compact"])
+    assert load_output(str(saida))["metrics"] == json.loads(json_compacto.output)["metrics"]
@@ -0,0 +1,53 @@
+import json
+import time
+
+from typer.testing import CliRunner
+
+from analyzer import profiling
+from analyzer.directory_analysis import analyze_files
+from analyzer.main import app
+
+def test_stage_is_noop_when_disabled():
+    profiling.disable()
+    assert not profiling.enabled()
+    with profiling.stage("parse"):
+        pass
+    assert profiling.report() == {}
+
+def test_nested_stages_are_exclusive():
+    profiler = profiling.Profiler()
+    with profiler.file("a.py"):
+        with profiler.stage("externa"):
+            with profiler.stage("interna"):
+                time.sleep(0.02)
+    assert profiler.stages["interna"][0] >= 0.02
+    assert profiler.stages["externa"][0] < 0.01
+    assert set(profiler.files["a.py"]) == {"externa", "interna"}
+
+def test_worker_profiles_are_merged(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"mod{i}.py"
+        path.write_text("def f():\n    return 1\n" * (i + 1), encoding="utf-8")
+        paths.append(str(path))
+    profiling.enable()
+    try:
+        list(analyze_files(paths, jobs=2))
+        report = profiling.report()
+    finally:
+        profiling.disable()
+    stages = {entry["stage"]: entry for entry in report["stages"]}
+    assert stages["parse"]["calls"] == 4
+    assert set(report["files"]) == set(paths)
+
+def test_profile_block_in_json_and_pstats_dump(tmp_path):
+    (tmp_path / "mod.py").write_text("class A:\n    def m(self):\n        return 1\n", encoding="utf-8")
+    stats = tmp_path / "run.pstats"
+    result = CliRunner().invoke(app, ["--profile-output", str(stats), "all-dir", str(tmp_path),
+                                      "--format", "json", "--no-cache", "--jobs", "1"])
+    assert result.exit_code == 0
+    data = json.loads(result.stdout[result.stdout.index("{"):result.stdout.rindex("}") + 1])
+    stages = [entry["stage"] for entry in data["metrics"]["profile"]["stages"]]
+    assert "parse" in stages and "ast_metrics" in stages
+    assert stats.exists()
+    assert not profiling.enabled()
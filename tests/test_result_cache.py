@@ -0,0 +1,106 @@
+import os
+from analyzer.directory_analysis import analyze_files_cached
+from analyzer.result_cache import ResultCache
+
+def criar_arquivo(tmp_path, nome, conteudo):
+    path = tmp_path / nome
+    path.write_text(conteudo, encoding="utf-8")
+    return str(path)
+
+def test_cache_hit_and_miss(tmp_path):
+    path = criar_arquivo(tmp_path, "a.py", "def f():\n    pass\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get(path) is None
+    cache.put(path, {"valor": 1})
+    cache.close()
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get(path) == {"valor": 1}
+    assert cache.stats() == {"hits": 1, "misses": 0}
+    cache.close()
+
+def test_cache_invalidated_by_content(tmp_path):
+    path = criar_arquivo(tmp_path, "a.py", "x = 1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.get(path)
+    cache.put(path, {"valor": 1})
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("x = 2222\n")
+    assert cache.get(path) is None
+    cache.close()
+
+def test_cache_key_includes_options(tmp_path):
+    path = criar_arquivo(tmp_path, "a.py", "x = 1\n")
+    cache = ResultCache(str(tmp_path / "cache"), options={"metrics": ["lines"]})
+    cache.put(path, {"valor": 1})
+    cache.close()
+    cache = ResultCache(str(tmp_path / "cache"), options={"metrics": ["classes"]})
+    assert cache.get(path) is None
+    cache.close()
+
+def test_cache_skips_hash_when_stat_unchanged(tmp_path, monkeypatch):
+    path = criar_arquivo(tmp_path, "a.py", "x = 1\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.get(path)
+    cache.put(path, {"valor": 1})
+    cache.close()
+
+    import builtins
+    opened = []
+    original_open = builtins.open
+    monkeypatch.setattr(builtins, "open", lambda p, *a, **k: opened.append(p) or original_open(p, *a, **k))
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get(path) == {"valor": 1}
+    assert os.path.abspath(path) not in opened
+    cache.close()
+
+def test_cache_lru_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"), max_size_mb=0)
+    cache.max_size = 60
+    paths = [criar_arquivo(tmp_path, f"m{i}.py", f"x = {i}\n") for i in range(3)]
+    for i, path in enumerate(paths):
+        cache.get(path)
+        cache.put(path, {"dados": "x" * 20, "i": i})
+    cache.get(paths[0])  # torna o primeiro o mais recente
+    cache.close()
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get(paths[0]) is not None
+    assert cache.get(paths[1]) is None
+    cache.close()
+
+def test_analyze_files_cached(tmp_path):
+    paths = [criar_arquivo(tmp_path, f"m{i}.py", f"class C{i}:\n    pass\n") for i in range(4)]
+    cache = ResultCache(str(tmp_path / "cache"))
+    cold = sorted(analyze_files_cached(paths, jobs=1, cache=cache))
+    cache.close()
+    cache = ResultCache(str(tmp_path / "cache"))
+    warm = sorted(analyze_files_cached(paths, jobs=1, cache=cache))
+    assert warm == cold
+    assert cache.stats() == {"hits": 4, "misses": 0}
+    cache.close()
+
+def test_cache_prunes_deleted_files(tmp_path):
+    mantido = criar_arquivo(tmp_path, "a.py", "x = 1\n")
+    removido = criar_arquivo(tmp_path, "b.py", "x = 2\n")
+    cache = ResultCache(str(tmp_path / "cache"))
+    for path in (mantido, removido):
+        cache.get(path)
+        cache.put(path, {"valor": 1})
+    cache.close()
+
+    os.remove(removido)
+    cache = ResultCache(str(tmp_path / "cache"))
+    cache.close()
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert set(cache._files) == {os.path.abspath(mantido)}
+    cache.close()
+
+def test_hash_lookups_not_counted_as_file_stats(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.get_by_hash("grafo") is None
+    cache.put_by_hash("grafo", {"valor": 1})
+    assert cache.get_by_hash("grafo") == {"valor": 1}
+    assert cache.stats() == {"hits": 0, "misses": 0}
+    cache.close()
@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+
+# Módulos que não devem ser carregados na partida dos comandos simples
+PESADOS = ["rich", "sqlite3", "concurrent.futures", "cProfile", "socketserver",
+           "analyzer.directory_analysis", "analyzer.benchmark", "analyzer.dependency_analyzer"]
+
+def modulos_carregados(codigo):
+    script = codigo + "\nimport sys, json\nprint(json.dumps(sorted(sys.modules)))"
+    saida = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    return set(json.loads(saida.splitlines()[-1]))
+
+def test_main_import_is_light():
+    carregados = modulos_carregados("import analyzer.main")
+    assert not [nome for nome in PESADOS if nome in carregados]
+
+def test_simple_command_loads_only_what_it_uses(tmp_path):
+    arquivo = tmp_path / "mod.py"
+    arquivo.write_text("class A:\n    pass\n", encoding="utf-8")
+    carregados = modulos_carregados(
+        "import sys\nfrom analyzer.main import app\n"
+        f"try:\n    app(['classes', {str(arquivo)!r}])\nexcept SystemExit:\n    pass"
+    )
+    assert "analyzer.analyze_classes" in carregados
+    assert not [nome for nome in PESADOS if nome in carregados]
@@ -0,0 +1,109 @@
+from analyzer.result_cache import ResultCache
+from analyzer.symbol_index import SymbolIndex, build_symbol_index, extract_symbols
+
+def test_extract_symbols_definitions_and_references():
+    code = """
+__all__ = ["exportada"]
+
+def exportada():
+    pass
+
+def recursiva(n):
+    return recursiva(n - 1)
+
+class Modelo:
+    def __init__(self):
+        self.valor = auxiliar()
+
+    def salvar(self):
+        pass
+
+@app.command()
+def comando():
+    pass
+"""
+    symbols = extract_symbols(code)
+    assert [(n, k, e) for n, k, _, e in symbols["definitions"]] == [
+        ("exportada", "function", False),
+        ("recursiva", "function", False),
+        ("Modelo", "class", False),
+        ("salvar", "method", False),
+        ("comando", "function", True),
+    ]
+    refs = symbols["references"]
+    assert refs["exportada"] == 1  # apenas pelo __all__
+    assert "recursiva" not in refs  # chamada a si mesma não conta
+    assert refs["auxiliar"] == 1
+    assert refs["valor"] == 1
+
+def test_only_direct_recursion_is_ignored():
+    code = """
+class Cache:
+    def get(self, k):
+        return self._d.get(k)
+
+    def copia(self):
+        return Cache()
+
+    def limpar(self):
+        self.limpar()
+
+def fatorial(n):
+    def fatorial_interno(m):
+        return fatorial(m)
+    return fatorial_interno(n)
+"""
+    refs = extract_symbols(code)["references"]
+    assert refs["get"] == 1  # delegação para outro objeto
+    assert refs["Cache"] == 1  # a classe instanciada nos próprios métodos
+    assert "limpar" not in refs  # self.limpar() em limpar é recursão
+    assert refs["fatorial"] == 1  # chamada pela função interna, que é outra função
+    assert refs["fatorial_interno"] == 1
+
+def test_delegating_method_keeps_other_definitions_alive(tmp_path):
+    (tmp_path / "lib.py").write_text("def get(k):\n    return k\n", encoding="utf-8")
+    (tmp_path / "app.py").write_text(
+        "import lib\n\nclass Proxy:\n    def get(self, k):\n        return lib.get(k)\n\nProxy()\n",
+        encoding="utf-8")
+    index, _ = build_symbol_index(str(tmp_path))
+    assert index.unused() == []
+
+def test_use_before_definition_counts():
+    symbols = extract_symbols("def f():\n    return Depois()\n\nclass Depois:\n    pass\n")
+    assert symbols["references"]["Depois"] == 1
+
+def test_cross_module_references(tmp_path):
+    (tmp_path / "lib.py").write_text(
+        "def usada():\n    pass\n\ndef morta():\n    pass\n\nclass Servico:\n    def rodar(self):\n        pass\n",
+        encoding="utf-8")
+    (tmp_path / "app.py").write_text(
+        "from lib import usada, Servico\n\nusada()\nServico().rodar()\n", encoding="utf-8")
+    (tmp_path / "test_lib.py").write_text("def test_algo():\n    pass\n", encoding="utf-8")
+    index, errors = build_symbol_index(str(tmp_path))
+    assert errors == []
+    assert index.unused() == [("lib.py", "morta", "function", 4)]
+
+def test_incremental_update():
+    index = SymbolIndex()
+    index.add("a.py", extract_symbols("def f():\n    pass\n"))
+    index.add("b.py", extract_symbols("f()\n"))
+    assert index.unused() == []
+    index.add("b.py", extract_symbols("x = 1\n"))
+    assert index.unused() == [("a.py", "f", "function", 1)]
+    index.remove("a.py")
+    assert index.unused() == []
+
+def test_symbols_cached_between_runs(tmp_path):
+    (tmp_path / "a.py").write_text("def f():\n    pass\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("f()\n", encoding="utf-8")
+    cache_dir = str(tmp_path / ".cache")
+
+    cache = ResultCache(cache_dir, analyzer="symbols")
+    first, _ = build_symbol_index(str(tmp_path), cache=cache)
+    cache.close()
+
+    cache = ResultCache(cache_dir, analyzer="symbols")
+    second, _ = build_symbol_index(str(tmp_path), cache=cache)
+    assert cache.stats() == {"hits": 2, "misses": 0}
+    cache.close()
+    assert second.unused() == first.unused() == []
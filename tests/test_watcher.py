@@ -0,0 +1,56 @@
+import os
+from analyzer.directory_analysis import add_to_summary, analyze_files, finalize_summary, new_summary
+from analyzer.file_walker import iter_python_files
+from analyzer.watcher import PollingBackend, WatchState
+
+def resumo_completo(root):
+    paths = list(iter_python_files(root))
+    summary = new_summary(len(paths))
+    for _, file_metrics, error in analyze_files(paths):
+        if error is None:
+            add_to_summary(summary, file_metrics)
+    finalize_summary(summary)
+    return summary
+
+def test_incremental_summary_matches_full_run(tmp_path):
+    (tmp_path / "a.py").write_text("class A:\n    def f(self): pass\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("def g():\n    pass\n", encoding="utf-8")
+    state = WatchState(str(tmp_path))
+    ready = state.initial_scan()
+    assert ready["summary"] == resumo_completo(str(tmp_path))
+
+    (tmp_path / "a.py").write_text("class A:\n    def _f(self): pass\n    def g(self): pass\n", encoding="utf-8")
+    (tmp_path / "c.py").write_text("# novo\nx = 1\n", encoding="utf-8")
+    os.remove(tmp_path / "b.py")
+    events = state.refresh({str(tmp_path / n) for n in ("a.py", "b.py", "c.py")})
+
+    assert [e["event"] for e in events] == ["update", "delete", "add"]
+    assert events[-1]["summary"] == resumo_completo(str(tmp_path))
+    assert events[0]["summary"]["total_files"] == 2
+
+def test_refresh_ignores_excluded_files(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n", encoding="utf-8")
+    (tmp_path / "notas.txt").write_text("texto\n", encoding="utf-8")
+    state = WatchState(str(tmp_path))
+    state.initial_scan()
+    assert state.refresh({str(tmp_path / "notas.txt")}) == []
+
+def test_syntax_error_removes_contribution(tmp_path):
+    (tmp_path / "a.py").write_text("def f():\n    pass\n", encoding="utf-8")
+    state = WatchState(str(tmp_path))
+    state.initial_scan()
+    (tmp_path / "a.py").write_text("def f(:\n", encoding="utf-8")
+    events = state.refresh({str(tmp_path / "a.py")})
+    assert events[0]["event"] == "error"
+    assert events[0]["summary"]["total_functions"] == 0
+    assert events[0]["summary"]["total_files"] == 1
+
+def test_polling_backend_detects_changes(tmp_path):
+    path = tmp_path / "a.py"
+    path.write_text("x = 1\n", encoding="utf-8")
+    backend = PollingBackend(str(tmp_path), interval=0)
+    path.write_text("x = 12345\n", encoding="utf-8")
+    (tmp_path / "b.py").write_text("y = 2\n", encoding="utf-8")
+    changed = sorted(p for p, _ in backend.read(timeout=0))
+    assert changed == [str(path), str(tmp_path / "b.py")]
+    assert backend.read(timeout=0) == []